@@ -0,0 +1,14 @@
+@echo off
+echo ====================================================
+echo    📡 RECEPTOR DE AVISOS SIN VENTANA
+echo ====================================================
+echo.
+echo Recibe avisos sin interfaz grafica.
+echo Log: receptor_avisos.log
+echo Presiona Ctrl+C para detener.
+echo.
+
+cd /d "%~dp0"
+python src\cli_avisos.py serve %*
+
+pause
\ No newline at end of file
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Sistema de Avisos - Línea de comandos sin interfaz gráfica
+
+Uso:
+    python src/cli_avisos.py serve [--puerto 8888] [--log receptor.log] [--sumidero log]
+    python src/cli_avisos.py send [--destinos ARCHIVO | --grupo NOMBRE | --ip IP ...] [--mensaje TEXTO ...]
+
+Sumideros disponibles para los avisos recibidos:
+    log                  Escribe cada aviso en el archivo de log (por defecto)
+    jsonl:RUTA           Agrega cada aviso como una línea JSON en RUTA
+    relay:IP[:PUERTO]    Reenvía cada aviso a otro receptor
+    modulo:funcion       Llama a funcion(aviso, direccion) del módulo indicado
+
+El comando send envía cada mensaje (de --mensaje o, si no se indica, una línea
+de la entrada estándar por mensaje) a todos los destinos a la vez, y escribe
+en la salida estándar una línea JSON por destino y otra con el resumen de cada
+mensaje. Sin destinos explícitos usa las 'computadoras' de la configuración.
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import queue
+import signal
+import sys
+import threading
+from datetime import datetime
+
+from servidor_async import ServidorAvisosAsync
+from protocolo import PUERTO_DEFECTO, solicitar, nuevo_id, GRUPO_MULTICAST_DEFECTO, PUERTO_MULTICAST_DEFECTO
+from cliente_avisos import GestorSesiones, MAX_POR_HOST_DEFECTO
+from envio_masivo import enviar_masivo, ips_de_destino, CONCURRENCIA_DEFECTO, TIMEOUT_HOST_DEFECTO, TIMEOUT_GLOBAL_DEFECTO
+from estado_pcs import CacheEstadoPCs, TIMEOUT_SONDEO_DEFECTO
+from registro_entregas import RegistroEntregas
+
+ARCHIVOS_CONFIGURACION = ('config_unificado.json', 'config_login.json')
+
+log = logging.getLogger('avisos')
+
+
+def cargar_configuracion(ruta=None):
+    """Lee la configuración indicada o la primera que exista de las aplicaciones"""
+    rutas = [ruta] if ruta else ARCHIVOS_CONFIGURACION
+    for candidata in rutas:
+        if candidata and os.path.exists(candidata):
+            with open(candidata, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    if ruta:
+        raise FileNotFoundError(f"No existe el archivo de configuración: {ruta}")
+    return {}
+
+
+def configurar_log(ruta, verbose=False):
+    """Envía el log a un archivo y, opcionalmente, también a la consola"""
+    formato = logging.Formatter('[%(asctime)s] %(levelname)s %(message)s', '%Y-%m-%d %H:%M:%S')
+    manejador = logging.FileHandler(ruta, encoding='utf-8')
+    manejador.setFormatter(formato)
+    log.addHandler(manejador)
+    if verbose:
+        consola = logging.StreamHandler()
+        consola.setFormatter(formato)
+        log.addHandler(consola)
+    log.setLevel(logging.INFO)
+
+
+# === SUMIDEROS DE AVISOS ===
+
+def sumidero_log(aviso, direccion):
+    """Escribe el aviso recibido en el log"""
+    log.info(f"📨 Aviso de {direccion[0]}: {aviso.get('mensaje', 'Sin mensaje')}")
+
+
+def crear_sumidero_jsonl(ruta):
+    """Agrega cada aviso como una línea JSON al archivo indicado"""
+    lock = threading.Lock()
+    
+    def sumidero(aviso, direccion):
+        registro = {'recibido': datetime.now().isoformat(), 'origen': direccion[0], 'aviso': aviso}
+        linea = json.dumps(registro, ensure_ascii=False)
+        with lock, open(ruta, 'a', encoding='utf-8') as f:
+            f.write(linea + '\n')
+    
+    return sumidero
+
+
+def crear_sumidero_relay(destino):
+    """Reenvía cada aviso a otro receptor"""
+    ip, _, puerto = destino.partition(':')
+    puerto = int(puerto) if puerto else PUERTO_DEFECTO
+    
+    def sumidero(aviso, direccion):
+        respuesta = solicitar(ip, aviso, puerto, timeout=5) or {}
+        if respuesta.get('status') != 'ok':
+            log.warning(f"⚠️ Reenvío a {ip}:{puerto} no confirmado: {respuesta}")
+    
+    return sumidero
+
+
+def crear_sumidero(especificacion):
+    """Construye el sumidero a partir de su especificación en la línea de comandos"""
+    tipo, _, argumento = especificacion.partition(':')
+    if tipo == 'log':
+        return sumidero_log
+    if tipo == 'jsonl' and argumento:
+        return crear_sumidero_jsonl(argumento)
+    if tipo == 'relay' and argumento:
+        return crear_sumidero_relay(argumento)
+    if argumento:
+        modulo = importlib.import_module(tipo)
+        return getattr(modulo, argumento)
+    raise ValueError(f"Sumidero no reconocido: {especificacion}")
+
+
+# === DESTINOS Y MENSAJES ===
+
+def leer_destinos(ruta):
+    """IPs de un archivo, una por línea; se ignoran las líneas vacías y los comentarios #"""
+    ips = []
+    with open(ruta, 'r', encoding='utf-8') as f:
+        for linea in f:
+            linea = linea.split('#', 1)[0].replace(',', ' ').split()
+            if linea:
+                ips.append(linea[0])
+    return ips
+
+
+def resolver_destinos(args, config):
+    """Lista de IPs destino según las opciones, sin repetidas y en orden"""
+    if args.destinos or args.ip:
+        destino = (leer_destinos(args.destinos) if args.destinos else []) + (args.ip or [])
+    else:
+        destino = args.grupo or 'todas'
+    return ips_de_destino(destino, config.get('computadoras', []), config.get('grupos', {}))
+
+
+def leer_mensajes(args, entrada):
+    """Avisos a enviar: los de --mensaje o uno por línea de la entrada.
+    
+    Una línea que es un objeto JSON se toma como los campos del aviso; si su
+    'mensaje' no es un texto se lanza ValueError.
+    """
+    lineas = args.mensaje if args.mensaje else entrada
+    for linea in lineas:
+        linea = linea.strip()
+        if not linea:
+            continue
+        campos = {'mensaje': linea}
+        if linea.startswith('{'):
+            try:
+                campos = json.loads(linea)
+            except ValueError:
+                pass
+            if not isinstance(campos.get('mensaje', ''), str):
+                raise ValueError(f"El campo 'mensaje' debe ser un texto: {linea[:80]}")
+        aviso = {
+            'id': nuevo_id(),
+            'mensaje': '',
+            'timestamp': datetime.now().isoformat(),
+            'tipo': args.tipo,
+            'auto_cerrar': args.auto_cerrar
+        }
+        aviso.update(campos)
+        yield aviso
+
+
+def escribir_json(salida, registro):
+    """Escribe un registro como una línea JSON y la envía enseguida"""
+    salida.write(json.dumps(registro, ensure_ascii=False) + '\n')
+    salida.flush()
+
+
+# === COMANDOS ===
+
+def comando_serve(args):
+    """Ejecuta el receptor de avisos sin interfaz gráfica"""
+    configurar_log(args.log, args.verbose)
+    config = cargar_configuracion(args.config)
+    sumidero = crear_sumidero(args.sumidero)
+    
+    cola_eventos = queue.Queue()
+    servidor = ServidorAvisosAsync.desde_configuracion(
+        config.get('servidor', {}),
+        puerto=args.puerto,
+        host=args.host,
+        cola_eventos=cola_eventos,
+        sumidero=sumidero
+    )
+    try:
+        servidor.iniciar()
+    except OSError as e:
+        # Puerto ocupado, sin permisos o --host que no es una dirección local
+        print(f"❌ No se puede escuchar en {args.host}:{args.puerto}: {e}", file=sys.stderr)
+        return 2
+    
+    detener = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: detener.set())
+    signal.signal(signal.SIGTERM, lambda *_: detener.set())
+    
+    # El hilo principal sólo vuelca al log los mensajes del servidor
+    while not detener.is_set():
+        try:
+            evento = cola_eventos.get(timeout=0.5)
+        except queue.Empty:
+            continue
+        if evento[0] == 'log':
+            log.info(evento[1])
+    
+    servidor.detener()
+    log.info(f"🛑 Receptor detenido: {servidor.obtener_estadisticas()}")
+    return 0
+
+
+def comando_send(args, entrada=None, salida=None):
+    """Envía avisos a varios destinos sin interfaz gráfica; 0 si todos llegaron"""
+    entrada = entrada if entrada is not None else sys.stdin
+    salida = salida if salida is not None else sys.stdout
+    try:
+        config = cargar_configuracion(args.config)
+        ips = resolver_destinos(args, config)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    if not ips:
+        print("❌ No hay destinos: indica --destinos, --grupo o --ip, o registra computadoras", file=sys.stderr)
+        return 2
+    
+    envio = config.get('envio', {})
+    opciones = {
+        'puerto': args.puerto,
+        'concurrencia': (args.concurrencia if args.concurrencia is not None
+                         else envio.get('concurrencia', CONCURRENCIA_DEFECTO)),
+        'timeout_host': (args.timeout_host if args.timeout_host is not None
+                         else envio.get('timeout_host', TIMEOUT_HOST_DEFECTO)),
+        'timeout_global': (args.timeout_global if args.timeout_global is not None
+                           else envio.get('timeout_global', TIMEOUT_GLOBAL_DEFECTO)),
+        'timeout_sondeo': envio.get('timeout_sondeo', TIMEOUT_SONDEO_DEFECTO),
+        # Vale para todos los mensajes de esta ejecución: las PCs caídas pasan al carril diferido
+        'estados': CacheEstadoPCs()
+    }
+    if args.multicast:
+        opciones['multicast'] = {
+            'grupo': envio.get('grupo_multicast', GRUPO_MULTICAST_DEFECTO),
+            'puerto': envio.get('puerto_multicast', PUERTO_MULTICAST_DEFECTO),
+            'espera': envio.get('espera_multicast', 1.0)
+        }
+    
+    sesiones = GestorSesiones(activo=True, max_por_host=envio.get('pool_max_por_host', MAX_POR_HOST_DEFECTO))
+    registro = RegistroEntregas(args.registro) if args.registro else None
+    todos_entregados = True
+    try:
+        for aviso in leer_mensajes(args, entrada):
+            informe = enviar_masivo(
+                aviso, ips, sesiones.solicitar,
+                al_resultado=lambda r, id_aviso=aviso['id']: escribir_json(
+                    salida, dict(r, evento='destino', aviso=id_aviso)),
+                **opciones
+            )
+            resumen = informe.como_dict()
+            del resumen['resultados']
+            escribir_json(salida, dict(resumen, evento='resumen', mensaje=aviso['mensaje']))
+            todos_entregados = todos_entregados and not informe.fallidos
+            if registro:
+                registro.registrar_informe(aviso, informe)
+    except ValueError as e:
+        # Línea de la entrada con un aviso inválido: los anteriores ya se enviaron
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    finally:
+        sesiones.cerrar_todas()
+        if registro:
+            registro.guardar()
+    return 0 if todos_entregados else 1
+
+
+def crear_parser():
+    """Define los comandos y opciones de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Sistema de Avisos sin interfaz gráfica")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    
+    serve = subcomandos.add_parser('serve', help="Recibir avisos sin interfaz gráfica")
+    serve.add_argument('--puerto', type=int, default=PUERTO_DEFECTO, help="Puerto de escucha")
+    serve.add_argument('--host', default='0.0.0.0', help="Dirección de escucha")
+    serve.add_argument('--config', help="Archivo de configuración (sección 'servidor')")
+    serve.add_argument('--log', default='receptor_avisos.log', help="Archivo de log")
+    serve.add_argument('--sumidero', default='log', help="log | jsonl:RUTA | relay:IP[:PUERTO] | modulo:funcion")
+    serve.add_argument('-v', '--verbose', action='store_true', help="Mostrar el log también en consola")
+    serve.set_defaults(funcion=comando_serve)
+    
+    send = subcomandos.add_parser('send', help="Enviar avisos a varias PCs sin interfaz gráfica")
+    destinos = send.add_mutually_exclusive_group()
+    destinos.add_argument('--destinos', help="Archivo con una IP por línea")
+    destinos.add_argument('--grupo', help="Grupo de la configuración ('grupos' o campo 'grupo' de las PCs)")
+    send.add_argument('--ip', action='append',
+                      help="IP destino (se puede repetir; se suma a --destinos, no se combina con --grupo)")
+    send.add_argument('--config', help="Archivo de configuración ('computadoras', 'grupos' y sección 'envio')")
+    send.add_argument('--mensaje', action='append',
+                      help="Mensaje a enviar (se puede repetir); sin esta opción se lee de la entrada estándar")
+    send.add_argument('--tipo', default='aviso_cli', help="Tipo de aviso")
+    send.add_argument('--auto-cerrar', action='store_true', help="El aviso se cierra solo en el receptor")
+    send.add_argument('--puerto', type=int, default=PUERTO_DEFECTO, help="Puerto de los receptores")
+    send.add_argument('--concurrencia', type=int, help="Envíos simultáneos como máximo")
+    send.add_argument('--timeout-host', type=float, help="Segundos de espera por cada PC")
+    send.add_argument('--timeout-global', type=float, help="Segundos máximos por mensaje")
+    send.add_argument('--multicast', action='store_true', help="Enviar primero por multicast")
+    send.add_argument('--registro', help="Agregar las entregas a este archivo JSONL (p. ej. entregas_avisos.jsonl)")
+    send.set_defaults(funcion=comando_send)
+    
+    return parser
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    # --ip se puede sumar a --destinos, pero con --grupo el grupo se perdería
+    if getattr(args, 'grupo', None) and getattr(args, 'ip', None):
+        parser.error("send: --ip no se puede combinar con --grupo")
+    for opcion in ('concurrencia', 'timeout_host', 'timeout_global'):
+        valor = getattr(args, opcion, None)
+        if valor is not None and valor <= 0:
+            parser.error(f"send: --{opcion.replace('_', '-')} debe ser mayor que 0")
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Cliente del sistema de avisos - Sesiones persistentes con varios avisos por conexión TCP
+y envío a todo el grupo por multicast UDP
+"""
+
+import select
+import socket
+import threading
+import time
+
+from protocolo import (
+    PUERTO_DEFECTO, GRUPO_MULTICAST_DEFECTO, PUERTO_MULTICAST_DEFECTO, MAX_DATAGRAMA,
+    ErrorProtocolo, LectorMensajes, codificar, decodificar_datagrama, enviar_mensaje,
+    solicitar, solicitar_legacy
+)
+
+# Debe ser menor que el tiempo de inactividad con el que el receptor cierra la sesión
+INACTIVIDAD_MAXIMA = 45
+MAX_POR_HOST_DEFECTO = 4
+# Tras este tiempo se vuelve a probar con tramas un receptor que respondió como legacy
+TTL_LEGACY = 300
+
+
+class SesionAvisos:
+    """Conexión abierta con un receptor por la que se envían avisos y se leen sus confirmaciones"""
+    
+    def __init__(self, ip, puerto=PUERTO_DEFECTO, timeout=10):
+        self.ip = ip
+        self.puerto = puerto
+        self.timeout = timeout
+        self.sock = None
+        self.lector = None
+        self.legacy = False
+        self.ultimo_uso = 0
+        self.lock = threading.Lock()
+    
+    def _conectar(self, tiempos=None):
+        """Abre la conexión TCP con el receptor"""
+        inicio = time.perf_counter()
+        self.sock = socket.create_connection((self.ip, self.puerto), timeout=self.timeout)
+        if tiempos is not None:
+            tiempos['conexion'] = time.perf_counter() - inicio
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.lector = LectorMensajes(self.sock)
+    
+    def cerrar(self):
+        """Cierra la conexión si está abierta"""
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.lector = None
+    
+    def sana(self):
+        """Valida una conexión libre: el receptor no la cerró ni dejó datos sin leer"""
+        if self.sock is None:
+            return False
+        try:
+            legible, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not legible
+    
+    def solicitar(self, mensaje, timeout=None, tiempos=None):
+        """Envía un mensaje por la sesión y devuelve la confirmación del receptor.
+        
+        Si se pasa el dict tiempos, se anota en tiempos['conexion'] lo que tardó
+        en abrirse la conexión (0 si se reutilizó una abierta).
+        """
+        with self.lock:
+            if self.legacy:
+                return solicitar_legacy(self.ip, mensaje, self.puerto, timeout or self.timeout)
+            
+            # Una sesión inactiva demasiado tiempo puede haber sido cerrada por el receptor
+            if self.sock and time.monotonic() - self.ultimo_uso > INACTIVIDAD_MAXIMA:
+                self.cerrar()
+            
+            for _ in range(2):
+                reutilizada = self.sock is not None
+                if reutilizada:
+                    if tiempos is not None:
+                        tiempos['conexion'] = 0
+                else:
+                    self._conectar(tiempos)
+                
+                try:
+                    self.sock.settimeout(timeout or self.timeout)
+                    enviar_mensaje(self.sock, mensaje)
+                    respuesta, _ = self.lector.recibir()
+                except socket.timeout:
+                    self.cerrar()
+                    raise
+                except OSError:
+                    self.cerrar()
+                    if reutilizada:
+                        continue
+                    raise
+                
+                if respuesta is None:
+                    self.cerrar()
+                    if reutilizada:
+                        continue
+                    # Receptor antiguo: no entiende tramas ni sesiones
+                    self.legacy = True
+                    return solicitar_legacy(self.ip, mensaje, self.puerto, timeout or self.timeout)
+                
+                self.ultimo_uso = time.monotonic()
+                return respuesta
+            
+            raise ConnectionError(f"No se pudo reutilizar la sesión con {self.ip}")
+
+
+class GestorSesiones:
+    """Pool de conexiones por destino; si está desactivado cada aviso usa su propia conexión.
+    
+    Las conexiones libres se reutilizan si pasan una validación rápida (el
+    receptor no las cerró ni envió datos inesperados) y se descartan tras
+    inactividad segundos sin uso. Nunca hay más de max_por_host conexiones
+    abiertas con un mismo destino; si están todas ocupadas se espera turno.
+    Los receptores que sólo responden en formato legacy se recuerdan durante
+    ttl_legacy segundos; pasado ese tiempo se vuelve a probar con tramas, por
+    si se actualizaron.
+    """
+    
+    def __init__(self, activo=False, max_por_host=MAX_POR_HOST_DEFECTO, inactividad=INACTIVIDAD_MAXIMA,
+                 ttl_legacy=TTL_LEGACY):
+        self.activo = activo
+        self.max_por_host = max(1, max_por_host)
+        self.inactividad = inactividad
+        self.ttl_legacy = ttl_legacy
+        self.libres = {}
+        self.cupos = {}
+        # (ip, puerto) -> time.monotonic() en que vence la marca de legacy
+        self.hosts_legacy = {}
+        self.lock = threading.Lock()
+        self.estadisticas = {'aciertos': 0, 'fallos': 0, 'descartadas': 0, 'legacy': 0}
+    
+    def _cupo(self, clave):
+        """Semáforo que limita las conexiones abiertas con un destino"""
+        with self.lock:
+            if clave not in self.cupos:
+                self.cupos[clave] = threading.BoundedSemaphore(self.max_por_host)
+            return self.cupos[clave]
+    
+    def _tomar(self, ip, puerto, timeout):
+        """Saca una conexión libre y sana del pool o crea una sesión nueva"""
+        descartadas = []
+        with self.lock:
+            self._purgar(time.monotonic(), descartadas)
+            libres = self.libres.get((ip, puerto), [])
+            sesion = None
+            while libres:
+                candidata = libres.pop()  # La más reciente es la que menos riesgo tiene de estar cerrada
+                if candidata.sana():
+                    sesion = candidata
+                    break
+                descartadas.append(candidata)
+            
+            self.estadisticas['descartadas'] += len(descartadas)
+            self.estadisticas['aciertos' if sesion else 'fallos'] += 1
+        
+        for candidata in descartadas:
+            candidata.cerrar()
+        return sesion or SesionAvisos(ip, puerto, timeout)
+    
+    def _devolver(self, sesion):
+        """Deja la sesión libre para reutilizarla, o la cierra si no sirve"""
+        if sesion.sock is None or sesion.legacy or not self.activo:
+            sesion.cerrar()
+            return
+        with self.lock:
+            self.libres.setdefault((sesion.ip, sesion.puerto), []).append(sesion)
+    
+    def _purgar(self, ahora, descartadas):
+        """Quita del pool las conexiones inactivas demasiado tiempo (con el lock tomado)"""
+        for clave, libres in list(self.libres.items()):
+            vigentes = [s for s in libres if ahora - s.ultimo_uso <= self.inactividad]
+            descartadas.extend(s for s in libres if ahora - s.ultimo_uso > self.inactividad)
+            if vigentes:
+                self.libres[clave] = vigentes
+            else:
+                del self.libres[clave]
+    
+    def solicitar(self, ip, mensaje, puerto=PUERTO_DEFECTO, timeout=10, tiempos=None):
+        """Envía un mensaje al destino y devuelve la respuesta del receptor (tiempos: ver SesionAvisos)"""
+        if not self.activo:
+            return solicitar(ip, mensaje, puerto, timeout)
+        if self._es_legacy((ip, puerto)):
+            with self.lock:
+                self.estadisticas['legacy'] += 1
+            return solicitar_legacy(ip, mensaje, puerto, timeout)
+        
+        cupo = self._cupo((ip, puerto))
+        if not cupo.acquire(timeout=timeout):
+            raise socket.timeout(f"Sin conexiones libres hacia {ip}")
+        try:
+            sesion = self._tomar(ip, puerto, timeout)
+            try:
+                return sesion.solicitar(mensaje, timeout, tiempos)
+            finally:
+                if sesion.legacy:
+                    with self.lock:
+                        self.hosts_legacy[(ip, puerto)] = time.monotonic() + self.ttl_legacy
+                self._devolver(sesion)
+        finally:
+            cupo.release()
+    
+    def _es_legacy(self, clave):
+        """Indica si el destino respondió como legacy hace menos de ttl_legacy segundos"""
+        with self.lock:
+            vence = self.hosts_legacy.get(clave)
+            if vence is not None and vence <= time.monotonic():
+                del self.hosts_legacy[clave]
+                vence = None
+            return vence is not None
+    
+    def obtener_estadisticas(self):
+        """Aciertos y fallos del pool y conexiones libres en este momento"""
+        with self.lock:
+            estadisticas = dict(self.estadisticas)
+            estadisticas['libres'] = sum(len(libres) for libres in self.libres.values())
+            estadisticas['destinos'] = len(self.libres)
+        return estadisticas
+    
+    def cerrar_todas(self):
+        """Cierra todas las conexiones libres del pool"""
+        with self.lock:
+            sesiones = [s for libres in self.libres.values() for s in libres]
+            self.libres.clear()
+        for sesion in sesiones:
+            with sesion.lock:
+                sesion.cerrar()
+
+
+def enviar_multicast(aviso, destinos, grupo=GRUPO_MULTICAST_DEFECTO, puerto=PUERTO_MULTICAST_DEFECTO,
+                     espera=1.0, envios=2, ttl=1):
+    """Envía el aviso al grupo multicast y recoge las confirmaciones unicast de los receptores.
+    
+    El datagrama se repite envios veces dentro de la espera por si se pierde
+    alguno (el receptor descarta los repetidos por el id del aviso). Devuelve
+    {ip: respuesta} de los receptores que confirmaron, con los segundos hasta
+    la confirmación en respuesta['latencia']; los destinos sin confirmación
+    'ok' deben reintentarse por TCP con el mismo aviso.
+    """
+    datagrama = codificar(aviso)
+    if len(datagrama) > MAX_DATAGRAMA:
+        return {}  # No cabe en un datagrama: todo por TCP
+    
+    pendientes = set(destinos)
+    confirmados = {}
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as sock:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+        inicio = time.monotonic()
+        limite = inicio + espera
+        proximo_envio = 0
+        enviados = 0
+        
+        while pendientes:
+            ahora = time.monotonic()
+            if ahora >= limite:
+                break
+            if enviados < envios and ahora >= proximo_envio:
+                sock.sendto(datagrama, (grupo, puerto))
+                enviados += 1
+                proximo_envio = ahora + espera / envios
+            
+            siguiente = proximo_envio if enviados < envios else limite
+            sock.settimeout(max(0.001, min(siguiente, limite) - ahora))
+            try:
+                datos, direccion = sock.recvfrom(MAX_DATAGRAMA)
+                respuesta = decodificar_datagrama(datos)
+            except socket.timeout:
+                continue
+            except ErrorProtocolo:
+                continue
+            
+            if respuesta.get('id') != aviso.get('id'):
+                continue
+            if confirmados.get(direccion[0], {}).get('status') != 'ok':
+                respuesta['latencia'] = time.monotonic() - inicio
+                confirmados[direccion[0]] = respuesta
+            if respuesta.get('status') == 'ok':
+                pendientes.discard(direccion[0])
+    
+    return confirmados
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Descubrimiento de receptores - Barrido de una red buscando PCs que responden al ping del protocolo
+"""
+
+import ipaddress
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+from protocolo import PUERTO_DEFECTO, solicitar
+from estado_pcs import verificar_pcs, CONCURRENCIA_VERIFICACION_DEFECTO
+
+# En una red local una PC encendida acepta la conexión en pocos milisegundos, pero
+# el plazo deja margen para una retransmisión del SYN (1 s) si se pierde el primero
+TIMEOUT_DESCUBRIMIENTO = 1.5
+TIMEOUT_PING = 2
+CONCURRENCIA_PING = 32
+MAX_DIRECCIONES = 4096
+PREFIJO_RED_LOCAL = 24
+
+
+def red_local(prefijo=PREFIJO_RED_LOCAL):
+    """Red de la IP local con el prefijo indicado, por ejemplo '192.168.1.0/24'"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.connect(("8.8.8.8", 80))
+        ip = sock.getsockname()[0]
+    return str(ipaddress.ip_network(f"{ip}/{prefijo}", strict=False))
+
+
+def hosts_de_red(cidr):
+    """IPs de hosts de una red IPv4 en notación CIDR; ValueError si no es válida o es demasiado grande"""
+    red = ipaddress.ip_network(cidr.strip(), strict=False)
+    if red.version != 4:
+        raise ValueError("Sólo se admiten redes IPv4")
+    if red.num_addresses > MAX_DIRECCIONES:
+        raise ValueError(f"La red {red} tiene {red.num_addresses} direcciones (máximo {MAX_DIRECCIONES})")
+    return [str(ip) for ip in red.hosts()] or [str(red.network_address)]
+
+
+class DescubridorPCs:
+    """Busca receptores de avisos en una red y recuerda los encontrados.
+    
+    Primero sondea todas las IPs con verificar_pcs (conexiones no bloqueantes)
+    y luego envía un ping del protocolo sólo a las que aceptaron la conexión,
+    para confirmar que son receptores y conocer su nombre. Al repetir la
+    búsqueda, las PCs ya encontradas que siguen respondiendo no se vuelven a
+    consultar: sólo se consultan las nuevas y se dan de baja las que faltan.
+    """
+    
+    def __init__(self, puerto=PUERTO_DEFECTO, timeout=TIMEOUT_DESCUBRIMIENTO,
+                 concurrencia=CONCURRENCIA_VERIFICACION_DEFECTO):
+        self.puerto = puerto
+        self.timeout = timeout
+        self.concurrencia = concurrencia
+        # ip -> {'ip', 'hostname', 'version', 'cola_pendientes'}
+        self.encontradas = {}
+    
+    def _consultar(self, ip):
+        """Ping del protocolo; devuelve los datos del receptor o None si no es uno"""
+        try:
+            respuesta = solicitar(ip, {'tipo': 'ping'}, self.puerto, TIMEOUT_PING, legacy=False) or {}
+        except Exception:
+            return None
+        if respuesta.get('tipo') != 'pong':
+            return None
+        hostname = respuesta.get('hostname')
+        if not hostname:
+            # Receptores anteriores no informan su nombre en el pong
+            try:
+                hostname = socket.gethostbyaddr(ip)[0]
+            except OSError:
+                hostname = None
+        return {'ip': ip, 'hostname': hostname, 'version': respuesta.get('version'),
+                'cola_pendientes': respuesta.get('cola_pendientes')}
+    
+    def descubrir(self, cidr):
+        """Barre la red y devuelve {'encontradas': [datos], 'nuevas': [ips], 'perdidas': [ips]}"""
+        ips = hosts_de_red(cidr)
+        rondas = len(ips) // max(1, self.concurrencia) + 1
+        abiertas = {ip for ip, online in verificar_pcs(ips, self.puerto, timeout=self.timeout,
+                                                      concurrencia=self.concurrencia,
+                                                      plazo=self.timeout * rondas).items() if online}
+        
+        en_red = set(ips)
+        perdidas = sorted((ip for ip in self.encontradas if ip in en_red and ip not in abiertas),
+                          key=ipaddress.ip_address)
+        for ip in perdidas:
+            del self.encontradas[ip]
+        
+        a_consultar = [ip for ip in ips if ip in abiertas and ip not in self.encontradas]
+        nuevas = []
+        if a_consultar:
+            with ThreadPoolExecutor(max_workers=min(CONCURRENCIA_PING, len(a_consultar))) as ejecutor:
+                for ip, datos in zip(a_consultar, ejecutor.map(self._consultar, a_consultar)):
+                    if datos:
+                        self.encontradas[ip] = datos
+                        nuevas.append(ip)
+        
+        encontradas = [self.encontradas[ip] for ip in ips if ip in self.encontradas]
+        return {'encontradas': encontradas, 'nuevas': nuevas, 'perdidas': perdidas}
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Cola de despacho de avisos salientes - Prioridades compartidas por todos los envíos
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from registro_entregas import percentil
+
+PRIORIDAD_URGENTE = 0
+PRIORIDAD_NORMAL = 1
+PRIORIDAD_MASIVA = 2
+NOMBRES_PRIORIDAD = {PRIORIDAD_URGENTE: 'urgente', PRIORIDAD_NORMAL: 'normal', PRIORIDAD_MASIVA: 'masiva'}
+
+TRABAJADORES_DEFECTO = 32
+MUESTRAS_ESPERA = 1000
+
+
+def prioridad_de_envio(aviso, masivo=False):
+    """Prioridad de despacho: urgente si el aviso lo indica, si no normal o masiva"""
+    if aviso.get('prioridad') == 'urgente':
+        return PRIORIDAD_URGENTE
+    return PRIORIDAD_MASIVA if masivo else PRIORIDAD_NORMAL
+
+
+class _CarrilDespacho:
+    """Vista de la cola con una prioridad fija y la interfaz de un ThreadPoolExecutor"""
+    
+    def __init__(self, despacho, prioridad):
+        self.despacho = despacho
+        self.prioridad = prioridad
+        self.futuros = []
+    
+    def submit(self, funcion, *args):
+        futuro = self.despacho.enviar(self.prioridad, funcion, *args)
+        self.futuros.append(futuro)
+        return futuro
+    
+    def shutdown(self, wait=True, cancel_futures=False):
+        if cancel_futures:
+            for futuro in self.futuros:
+                futuro.cancel()
+
+
+class ColaDespacho:
+    """Envíos pendientes ordenados por prioridad y atendidos por un grupo fijo de hilos.
+    
+    Cada tarea es un envío a un destino, así que un aviso urgente encolado
+    después de un envío masivo sale antes que los destinos de éste que aún no
+    empezaron. Dentro de una misma prioridad se respeta el orden de llegada.
+    Se mide cuánto espera en la cola cada tarea según su prioridad.
+    """
+    
+    def __init__(self, trabajadores=TRABAJADORES_DEFECTO):
+        self.trabajadores = trabajadores
+        self.heap = []
+        self.secuencia = itertools.count()
+        self.condicion = threading.Condition()
+        self.hilos = []
+        self.libres = 0
+        self.activo = True
+        self.esperas = {prioridad: deque(maxlen=MUESTRAS_ESPERA) for prioridad in NOMBRES_PRIORIDAD}
+        self.atendidas = dict.fromkeys(NOMBRES_PRIORIDAD, 0)
+    
+    def enviar(self, prioridad, funcion, *args):
+        """Encola funcion(*args) y devuelve un Future con su resultado"""
+        futuro = Future()
+        with self.condicion:
+            if not self.activo:
+                raise RuntimeError("La cola de despacho está detenida")
+            heapq.heappush(self.heap, (prioridad, next(self.secuencia), time.perf_counter(), futuro, funcion, args))
+            # Los hilos se crean a medida que hacen falta, hasta el máximo
+            if self.libres < len(self.heap) and len(self.hilos) < self.trabajadores:
+                hilo = threading.Thread(target=self._trabajar, daemon=True, name='despacho-avisos')
+                self.hilos.append(hilo)
+                hilo.start()
+            self.condicion.notify()
+        return futuro
+    
+    def carril(self, prioridad=PRIORIDAD_NORMAL):
+        """Ejecutor con la prioridad indicada, para enviar_masivo"""
+        return _CarrilDespacho(self, prioridad)
+    
+    def _trabajar(self):
+        while True:
+            with self.condicion:
+                self.libres += 1
+                while self.activo and not self.heap:
+                    self.condicion.wait()
+                self.libres -= 1
+                if not self.activo:
+                    return
+                prioridad, _, encolado, futuro, funcion, args = heapq.heappop(self.heap)
+            
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            with self.condicion:
+                self.esperas[prioridad].append((time.perf_counter() - encolado) * 1000)
+                self.atendidas[prioridad] += 1
+            try:
+                futuro.set_result(funcion(*args))
+            except BaseException as e:
+                futuro.set_exception(e)
+    
+    def obtener_estadisticas(self):
+        """Por prioridad: tareas pendientes, atendidas y espera en cola (p50, p95 y máximo en ms)"""
+        with self.condicion:
+            pendientes = dict.fromkeys(NOMBRES_PRIORIDAD, 0)
+            for entrada in self.heap:
+                if not entrada[3].cancelled():
+                    pendientes[entrada[0]] += 1
+            return {
+                nombre: {
+                    'pendientes': pendientes[prioridad],
+                    'atendidas': self.atendidas[prioridad],
+                    'espera_p50': percentil(self.esperas[prioridad], 50),
+                    'espera_p95': percentil(self.esperas[prioridad], 95),
+                    'espera_max': max(self.esperas[prioridad], default=None)
+                }
+                for prioridad, nombre in NOMBRES_PRIORIDAD.items()
+            }
+    
+    def texto_resumen(self):
+        """Espera en cola por prioridad en una línea, para la interfaz"""
+        partes = []
+        for nombre, stats in self.obtener_estadisticas().items():
+            espera = '-' if stats['espera_p95'] is None else f"{stats['espera_p95']:.0f} ms"
+            partes.append(f"{nombre}: {stats['pendientes']} en cola, p95 {espera}")
+        return " | ".join(partes)
+    
+    def detener(self):
+        """Cancela lo pendiente y deja terminar a los hilos"""
+        with self.condicion:
+            self.activo = False
+            for entrada in self.heap:
+                entrada[3].cancel()
+            self.heap.clear()
+            self.condicion.notify_all()
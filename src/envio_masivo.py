@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Envío masivo de avisos - Concurrencia acotada, plazos por PC y global, e informe de entrega
+"""
+
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as TiempoAgotado
+
+from protocolo import PUERTO_DEFECTO, ErrorProtocolo
+from cliente_avisos import enviar_multicast
+from estado_pcs import sondear, TIMEOUT_SONDEO_DEFECTO
+
+CONCURRENCIA_DEFECTO = 32
+TIMEOUT_HOST_DEFECTO = 3
+TIMEOUT_GLOBAL_DEFECTO = 30
+
+# Clases de error del informe
+ERROR_TIMEOUT = 'timeout'
+ERROR_RECHAZADA = 'rechazada'
+ERROR_ACK_INVALIDO = 'ack_invalido'
+ERROR_OCUPADO = 'ocupado'
+ERROR_LIMITADO = 'limitado'
+ERROR_RED = 'red'
+ERROR_SIN_TIEMPO = 'sin_tiempo'
+
+
+def clasificar_error(error):
+    """Clase de error del informe para una excepción del envío"""
+    if isinstance(error, socket.timeout):
+        return ERROR_TIMEOUT
+    if isinstance(error, ConnectionRefusedError):
+        return ERROR_RECHAZADA
+    if isinstance(error, (ErrorProtocolo, ValueError)):
+        return ERROR_ACK_INVALIDO
+    if isinstance(error, OSError):
+        return ERROR_RED
+    return type(error).__name__
+
+
+def clasificar_respuesta(respuesta):
+    """Clase de error de la confirmación del receptor, o None si la aceptó"""
+    estado = (respuesta or {}).get('status')
+    if estado == 'ok':
+        return None
+    if estado == 'busy':
+        return ERROR_OCUPADO
+    if estado == 'rate_limited':
+        return ERROR_LIMITADO
+    return ERROR_ACK_INVALIDO
+
+
+def ips_de_destino(destino, computadoras, grupos=None):
+    """IPs de un destino: 'todas', el nombre de un grupo o una lista de IPs.
+    
+    Un grupo es una lista de nombres de PC o IPs en grupos, o las computadoras
+    cuyo campo 'grupo' coincide con el nombre.
+    """
+    if isinstance(destino, list):
+        return list(dict.fromkeys(destino))
+    if destino == 'todas':
+        return list(dict.fromkeys(pc['ip'] for pc in computadoras))
+    por_nombre = {pc.get('nombre'): pc['ip'] for pc in computadoras}
+    miembros = (grupos or {}).get(destino)
+    if miembros is not None:
+        ips = [por_nombre.get(miembro, miembro) for miembro in miembros]
+    else:
+        ips = [pc['ip'] for pc in computadoras if pc.get('grupo') == destino]
+    if not ips:
+        raise ValueError(f"El grupo '{destino}' no existe o no tiene PCs")
+    return list(dict.fromkeys(ips))
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 1) if segundos is not None else None
+
+
+class InformeEnvio:
+    """Resultado de un envío masivo: un registro por PC con estado, latencia y clase de error"""
+    
+    def __init__(self, aviso, puerto=PUERTO_DEFECTO):
+        self.id = aviso.get('id')
+        # Puerto al que se envió, para reintentar en el mismo
+        self.puerto = puerto
+        self.resultados = []
+        self.inicio = time.monotonic()
+        self.duracion = 0
+        # PCs enviadas sin sondeo, con sondeo previo y en el carril diferido
+        self.carriles = {'online': 0, 'sondeo': 0, 'diferido': 0}
+    
+    def agregar(self, ip, error=None, latencia=None, canal='tcp', conexion=None, fin=None):
+        """Registra el resultado de una PC y lo devuelve.
+        
+        latencia es lo que tardó el envío a esa PC, conexion lo que tardó en
+        abrirse su conexión y ack_ms el tiempo desde que empezó el envío masivo
+        hasta la confirmación (fin, en time.monotonic(); por defecto ahora).
+        """
+        fin = fin if fin is not None else time.monotonic()
+        registro = {
+            'ip': ip,
+            'estado': 'ok' if error is None else 'fallo',
+            'error': error,
+            'latencia_ms': _ms(latencia),
+            'conexion_ms': _ms(conexion),
+            'ack_ms': _ms(fin - self.inicio) if error is None else None,
+            'canal': canal
+        }
+        self.resultados.append(registro)
+        return registro
+    
+    def finalizar(self):
+        """Cierra el informe anotando la duración total"""
+        self.duracion = time.monotonic() - self.inicio
+    
+    @property
+    def exitosos(self):
+        return [r for r in self.resultados if r['estado'] == 'ok']
+    
+    @property
+    def fallidos(self):
+        return [r for r in self.resultados if r['estado'] != 'ok']
+    
+    def errores_por_clase(self):
+        """Cantidad de PCs fallidas por clase de error"""
+        clases = {}
+        for registro in self.fallidos:
+            clases[registro['error']] = clases.get(registro['error'], 0) + 1
+        return clases
+    
+    def como_dict(self):
+        """Informe completo serializable a JSON"""
+        return {
+            'id': self.id,
+            'total': len(self.resultados),
+            'exitosos': len(self.exitosos),
+            'fallidos': len(self.fallidos),
+            'errores': self.errores_por_clase(),
+            'duracion_s': round(self.duracion, 3),
+            'carriles': self.carriles,
+            'resultados': self.resultados
+        }
+    
+    def texto_resumen(self):
+        """Resumen de una línea para el log"""
+        texto = f"✅ {len(self.exitosos)}/{len(self.resultados)} PCs en {self.duracion:.1f} s"
+        for clase, cantidad in sorted(self.errores_por_clase().items()):
+            texto += f" | {clase}: {cantidad}"
+        return texto
+
+
+def enviar_masivo(aviso, ips, solicitar, puerto=PUERTO_DEFECTO, concurrencia=CONCURRENCIA_DEFECTO,
+                  timeout_host=TIMEOUT_HOST_DEFECTO, timeout_global=TIMEOUT_GLOBAL_DEFECTO,
+                  multicast=None, al_resultado=None, estados=None, timeout_sondeo=TIMEOUT_SONDEO_DEFECTO,
+                  despacho=None, prioridad=None):
+    """Envía el mismo aviso a todas las IPs y devuelve un InformeEnvio.
+    
+    solicitar(ip, aviso, puerto, timeout, tiempos) es la función de envío (por
+    ejemplo GestorSesiones.solicitar). Como mucho hay concurrencia envíos a la vez,
+    cada uno con timeout_host segundos, y ninguno empieza ni espera más allá de
+    timeout_global. Si multicast es un dict con opciones de enviar_multicast,
+    primero se envía un datagrama al grupo y sólo van por TCP las PCs que no
+    confirmaron. al_resultado(registro) se llama a medida que llegan resultados.
+    
+    Con estados (CacheEstadoPCs) el envío se ordena por el estado conocido de
+    cada PC: primero las online vigentes; las de estado vencido o desconocido
+    se sondean antes con un plazo de conexión de timeout_sondeo segundos; y las
+    que se sabe offline se intentan al final, también con sondeo, en un carril
+    diferido que no retrasa a las demás. Cada resultado actualiza estados.
+    
+    Con despacho (ColaDespacho) los envíos a cada PC se encolan allí con la
+    prioridad indicada, compartiendo hilos con el resto de los envíos, en lugar
+    de usar un grupo de hilos propio de concurrencia hilos.
+    """
+    informe = InformeEnvio(aviso, puerto)
+    limite = time.monotonic() + timeout_global
+    
+    def registrar(ip, error=None, latencia=None, canal='tcp', conexion=None, fin=None):
+        registro = informe.agregar(ip, error, latencia, canal, conexion, fin)
+        if estados is not None:
+            estados.registrar_resultado(ip, error)
+        if al_resultado:
+            al_resultado(registro)
+    
+    if multicast is not None and ips:
+        opciones = dict(multicast)
+        opciones['espera'] = min(opciones.get('espera', 1.0), timeout_global)
+        inicio = time.perf_counter()
+        try:
+            confirmados = enviar_multicast(aviso, ips, **opciones)
+        except OSError:
+            confirmados = {}
+        latencia = time.perf_counter() - inicio
+        pendientes = []
+        for ip in ips:
+            if clasificar_respuesta(confirmados.get(ip)) is None:
+                latencia_ip = confirmados[ip].get('latencia', latencia)
+                registrar(ip, latencia=latencia_ip, canal='multicast', fin=informe.inicio + latencia_ip)
+            else:
+                pendientes.append(ip)
+        ips = pendientes
+    
+    def enviar_uno(ip, sondeo):
+        restante = limite - time.monotonic()
+        if restante <= 0:
+            return ip, ERROR_SIN_TIEMPO
+        tiempos = {}
+        inicio = time.perf_counter()
+        try:
+            if sondeo:
+                sondear(ip, puerto, min(timeout_sondeo, restante))
+                restante = limite - time.monotonic()
+            respuesta = solicitar(ip, aviso, puerto, max(0.001, min(timeout_host, restante)), tiempos)
+            error = clasificar_respuesta(respuesta)
+        except Exception as e:
+            error = clasificar_error(e)
+        return ip, error, time.perf_counter() - inicio, 'tcp', tiempos.get('conexion'), time.monotonic()
+    
+    def ejecutar(ips_sondeo, con_sondeo):
+        if despacho is not None:
+            ejecutor = despacho.carril(prioridad) if prioridad is not None else despacho.carril()
+        else:
+            ejecutor = ThreadPoolExecutor(max_workers=max(1, min(concurrencia, len(ips_sondeo))),
+                                          thread_name_prefix='envio-masivo')
+        # El orden de envío al ejecutor es el orden en que se atienden las PCs
+        futuros = {ejecutor.submit(enviar_uno, ip, sondeo): ip
+                   for ip, sondeo in zip(ips_sondeo, con_sondeo)}
+        terminados = set()
+        try:
+            for futuro in as_completed(futuros, timeout=max(0, limite - time.monotonic())):
+                terminados.add(futuro)
+                registrar(*futuro.result())
+        except TiempoAgotado:
+            pass
+        finally:
+            # Los envíos en curso terminan solos: su timeout no supera el plazo global
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+        
+        for futuro, ip in futuros.items():
+            if futuro not in terminados:
+                registrar(ip, ERROR_SIN_TIEMPO)
+    
+    if estados is not None:
+        online, dudosas, diferidas = estados.clasificar(ips)
+    else:
+        online, dudosas, diferidas = ips, [], []
+    informe.carriles = {'online': len(online), 'sondeo': len(dudosas), 'diferido': len(diferidas)}
+    
+    if online or dudosas:
+        ejecutar(online + dudosas, [False] * len(online) + [True] * len(dudosas))
+    if diferidas:
+        ejecutar(diferidas, [True] * len(diferidas))
+    
+    informe.finalizar()
+    return informe
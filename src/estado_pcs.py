@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Estado de las PCs destino - Último resultado conocido de cada PC con vencimiento
+"""
+
+import errno
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+
+ONLINE = 'online'
+OFFLINE = 'offline'
+DESCONOCIDO = 'desconocido'
+
+TTL_ONLINE_DEFECTO = 60
+TTL_OFFLINE_DEFECTO = 120
+TIMEOUT_SONDEO_DEFECTO = 0.5
+
+# Verificación de todas las PCs: sondeos simultáneos, espera por PC y plazo total
+CONCURRENCIA_VERIFICACION_DEFECTO = 256
+TIMEOUT_VERIFICACION_DEFECTO = 2
+PLAZO_VERIFICACION_DEFECTO = 10
+# Códigos de connect_ex no bloqueante para una conexión que sigue en curso (10035 es WSAEWOULDBLOCK)
+CONEXION_EN_CURSO = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035)
+
+# Clases de error de envío (envio_masivo) que indican que la PC no está
+# escuchando, y las que indican que el receptor respondió aunque no aceptara
+ERRORES_OFFLINE = ('timeout', 'rechazada', 'red')
+ERRORES_CON_RESPUESTA = ('ocupado', 'limitado', 'ack_invalido')
+
+
+def sondear(ip, puerto, timeout=TIMEOUT_SONDEO_DEFECTO):
+    """Comprueba que la PC acepta conexiones; lanza la excepción de conexión si no"""
+    socket.create_connection((ip, puerto), timeout=timeout).close()
+
+
+def verificar_pcs(ips, puerto, timeout=TIMEOUT_VERIFICACION_DEFECTO, concurrencia=CONCURRENCIA_VERIFICACION_DEFECTO,
+                  plazo=PLAZO_VERIFICACION_DEFECTO, al_resultado=None, historial=None):
+    """Sondea todas las PCs con conexiones no bloqueantes desde un solo hilo y devuelve {ip: online}.
+    
+    Hay como mucho concurrencia conexiones en curso; cada una se da por
+    fallida a los timeout segundos y ninguna pasa del plazo total. Se llama a
+    al_resultado(ip, online) a medida que cada PC responde o falla. Las PCs que
+    no se llegaron a sondear dentro del plazo no aparecen en el resultado.
+    Si se indica historial (HistorialRTT), se le anota el tiempo de conexión
+    de cada PC que responde.
+    """
+    pendientes = deque(dict.fromkeys(ips))
+    # Todas las conexiones usan el mismo timeout, así que vencen en el orden en que se abren
+    en_curso = deque()
+    resultados = {}
+    limite = time.monotonic() + plazo
+    
+    def terminar(selector, sock, ip, online, inicio):
+        if sock.fileno() != -1 and sock in selector.get_map():
+            selector.unregister(sock)
+        sock.close()
+        resultados[ip] = online
+        if online and historial is not None:
+            historial.registrar(ip, (time.perf_counter() - inicio) * 1000)
+        if al_resultado:
+            al_resultado(ip, online)
+    
+    with selectors.DefaultSelector() as selector:
+        while True:
+            ahora = time.monotonic()
+            while pendientes and len(selector.get_map()) < concurrencia and ahora < limite:
+                ip = pendientes.popleft()
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                inicio = time.perf_counter()
+                try:
+                    codigo = sock.connect_ex((ip, puerto))
+                except OSError:
+                    codigo = None  # IP inválida o nombre que no se resuelve
+                if codigo in CONEXION_EN_CURSO:
+                    selector.register(sock, selectors.EVENT_WRITE, (ip, inicio))
+                    en_curso.append((min(ahora + timeout, limite), sock, ip))
+                else:
+                    terminar(selector, sock, ip, codigo == 0, inicio)
+            
+            if not en_curso:
+                break
+            for clave, _ in selector.select(max(0, en_curso[0][0] - time.monotonic())):
+                error = clave.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                ip, inicio = clave.data
+                terminar(selector, clave.fileobj, ip, error == 0, inicio)
+            
+            ahora = time.monotonic()
+            while en_curso and (en_curso[0][1].fileno() == -1 or en_curso[0][0] <= ahora):
+                _, sock, ip = en_curso.popleft()
+                if sock.fileno() != -1:
+                    terminar(selector, sock, ip, False, None)
+    return resultados
+
+
+class CacheEstadoPCs:
+    """Estado online/offline de cada PC, válido durante un tiempo desde que se observó.
+    
+    Se actualiza con cada envío, ping y verificación. Pasado el vencimiento
+    de una entrada (ttl_online u ttl_offline segundos según el estado) la PC
+    vuelve a considerarse desconocida hasta que se observe otra vez.
+    """
+    
+    def __init__(self, ttl_online=TTL_ONLINE_DEFECTO, ttl_offline=TTL_OFFLINE_DEFECTO):
+        self.ttl_online = ttl_online
+        self.ttl_offline = ttl_offline
+        self.estados = {}
+        self.lock = threading.Lock()
+    
+    def marcar(self, ip, online):
+        """Registra que la PC acaba de responder (online=True) o de fallar"""
+        estado = ONLINE if online else OFFLINE
+        ttl = self.ttl_online if online else self.ttl_offline
+        with self.lock:
+            self.estados[ip] = (estado, time.monotonic() + ttl)
+    
+    def registrar_resultado(self, ip, error):
+        """Actualiza la PC según la clase de error de un envío (None si llegó)"""
+        if error is None or error in ERRORES_CON_RESPUESTA:
+            self.marcar(ip, True)
+        elif error in ERRORES_OFFLINE:
+            self.marcar(ip, False)
+    
+    def estado(self, ip):
+        """ONLINE u OFFLINE si la observación sigue vigente, si no DESCONOCIDO"""
+        with self.lock:
+            entrada = self.estados.get(ip)
+            if entrada is None:
+                return DESCONOCIDO
+            if entrada[1] <= time.monotonic():
+                del self.estados[ip]
+                return DESCONOCIDO
+            return entrada[0]
+    
+    def clasificar(self, ips):
+        """Reparte las IPs en (online vigentes, desconocidas, offline vigentes)"""
+        carriles = {ONLINE: [], DESCONOCIDO: [], OFFLINE: []}
+        for ip in ips:
+            carriles[self.estado(ip)].append(ip)
+        return carriles[ONLINE], carriles[DESCONOCIDO], carriles[OFFLINE]
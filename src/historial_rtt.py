@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Historial de RTT por PC - Últimos tiempos de sondeos y confirmaciones en buffers circulares compactos
+"""
+
+import threading
+from array import array
+
+from registro_entregas import percentil
+
+MUESTRAS_RTT_DEFECTO = 128
+ANCHO_SPARKLINE = 16
+BLOQUES_SPARKLINE = '▁▂▃▄▅▆▇█'
+
+
+def sparkline(valores, ancho=ANCHO_SPARKLINE):
+    """Las últimas ancho muestras como barras de texto, escaladas entre su mínimo y su máximo"""
+    valores = list(valores)[-ancho:]
+    if not valores:
+        return ''
+    minimo, maximo = min(valores), max(valores)
+    rango = maximo - minimo
+    niveles = len(BLOQUES_SPARKLINE) - 1
+    return ''.join(BLOQUES_SPARKLINE[round((v - minimo) / rango * niveles) if rango else 0] for v in valores)
+
+
+class AnilloRTT:
+    """Las últimas muestras de RTT (ms) de una PC en un array de floats de tamaño fijo.
+    
+    Cada muestra ocupa 4 bytes y al llenarse se sobrescribe la más antigua,
+    así que una PC nunca ocupa más de muestras * 4 bytes.
+    """
+    
+    __slots__ = ('valores', 'posicion', 'cantidad')
+    
+    def __init__(self, muestras=MUESTRAS_RTT_DEFECTO):
+        self.valores = array('f', bytes(4 * muestras))
+        self.posicion = 0
+        self.cantidad = 0
+    
+    def agregar(self, rtt_ms):
+        """Guarda una muestra, sobrescribiendo la más antigua si el anillo está lleno"""
+        self.valores[self.posicion] = rtt_ms
+        self.posicion = (self.posicion + 1) % len(self.valores)
+        self.cantidad = min(self.cantidad + 1, len(self.valores))
+    
+    def muestras(self):
+        """Las muestras guardadas de la más antigua a la más reciente"""
+        if self.cantidad < len(self.valores):
+            return self.valores[:self.cantidad].tolist()
+        return (self.valores[self.posicion:] + self.valores[:self.posicion]).tolist()
+
+
+class HistorialRTT:
+    """Un AnilloRTT por PC, compartido por los sondeos, el monitor y los envíos.
+    
+    registrar() se llama desde cualquier hilo; resumen() calcula actual,
+    mínimo, promedio y p95 de las muestras guardadas para la interfaz.
+    """
+    
+    def __init__(self, muestras=MUESTRAS_RTT_DEFECTO):
+        self.muestras = max(1, muestras)
+        self.anillos = {}
+        self.lock = threading.Lock()
+    
+    def registrar(self, ip, rtt_ms):
+        """Agrega una muestra de RTT en ms de esa PC"""
+        if rtt_ms is None:
+            return
+        with self.lock:
+            anillo = self.anillos.get(ip)
+            if anillo is None:
+                anillo = self.anillos[ip] = AnilloRTT(self.muestras)
+            anillo.agregar(rtt_ms)
+    
+    def resumen(self, ip):
+        """{'actual', 'minimo', 'promedio', 'p95', 'muestras', 'sparkline'} o None si no hay muestras"""
+        with self.lock:
+            anillo = self.anillos.get(ip)
+            valores = anillo.muestras() if anillo else []
+        if not valores:
+            return None
+        return {
+            'actual': round(valores[-1], 1),
+            'minimo': round(min(valores), 1),
+            'promedio': round(sum(valores) / len(valores), 1),
+            'p95': round(percentil(valores, 95), 1),
+            'muestras': len(valores),
+            'sparkline': sparkline(valores)
+        }
+    
+    def columnas(self, ip):
+        """Valores de las columnas de RTT de la lista de PCs ('-' si no hay muestras)"""
+        r = self.resumen(ip)
+        if r is None:
+            return ('-', '-', '-', '-', '')
+        return (r['actual'], r['minimo'], r['promedio'], r['p95'], r['sparkline'])
+    
+    def olvidar(self, ips_vigentes):
+        """Descarta el historial de las PCs que ya no están registradas"""
+        with self.lock:
+            for ip in list(self.anillos):
+                if ip not in ips_vigentes:
+                    del self.anillos[ip]
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Monitor de PCs en segundo plano - Sondeo periódico con intervalo adaptativo por PC
+"""
+
+import heapq
+import random
+import threading
+import time
+
+from protocolo import PUERTO_DEFECTO
+from estado_pcs import verificar_pcs, TIMEOUT_VERIFICACION_DEFECTO
+
+INTERVALO_MINIMO_DEFECTO = 5
+INTERVALO_MAXIMO_DEFECTO = 300
+SONDEOS_POR_SEGUNDO_DEFECTO = 50
+
+
+class MonitorPCs:
+    """Vuelve a sondear cada PC según lo estable que haya estado.
+    
+    Tras un cambio de estado (o al empezar a vigilarla) una PC se sondea cada
+    intervalo_minimo segundos; cada sondeo que confirma el mismo estado duplica
+    su intervalo hasta intervalo_maximo. Un único hilo saca del heap las PCs
+    vencidas en lotes de como mucho sondeos_por_segundo y los sondea con
+    verificar_pcs, así que nunca hay más de ese número de sondeos por segundo.
+    
+    Cada sondeo se anota en la cache de estados (si se indica) y al_cambiar(ip,
+    online) se llama, desde el hilo del monitor, sólo cuando cambia el estado;
+    si falla, el error se informa con log(texto) desde ese mismo hilo.
+    Las PCs para las que omitir(ip) es verdadero (por ejemplo, con un latido
+    vigente) se dan por online sin sondearlas. Si se indica historial
+    (HistorialRTT), cada sondeo que responde anota su RTT.
+    """
+    
+    def __init__(self, al_cambiar, estados=None, puerto=PUERTO_DEFECTO,
+                 intervalo_minimo=INTERVALO_MINIMO_DEFECTO, intervalo_maximo=INTERVALO_MAXIMO_DEFECTO,
+                 sondeos_por_segundo=SONDEOS_POR_SEGUNDO_DEFECTO, timeout=TIMEOUT_VERIFICACION_DEFECTO,
+                 omitir=None, historial=None, log=None):
+        self.al_cambiar = al_cambiar
+        self.estados = estados
+        self.puerto = puerto
+        self.intervalo_minimo = intervalo_minimo
+        self.intervalo_maximo = intervalo_maximo
+        self.sondeos_por_segundo = max(1, sondeos_por_segundo)
+        self.timeout = timeout
+        self.omitir = omitir
+        self.historial = historial
+        self.log = log
+        # ip -> {'online': último estado (None si no se conoce), 'intervalo': s, 'proximo': monotonic}
+        self.pcs = {}
+        self.heap = []
+        self.condicion = threading.Condition()
+        self.hilo = None
+        self.activo = False
+        self.sondeos = 0
+        self.cambios = 0
+    
+    def sincronizar(self, estados_actuales):
+        """Ajusta las PCs vigiladas a {ip: online o None}; las nuevas se sondean enseguida"""
+        with self.condicion:
+            for ip in list(self.pcs):
+                if ip not in estados_actuales:
+                    del self.pcs[ip]
+            for ip, online in estados_actuales.items():
+                if ip not in self.pcs:
+                    self.pcs[ip] = {'online': online, 'intervalo': self.intervalo_minimo}
+                    self._programar(ip, 0)
+            self.condicion.notify()
+    
+    def _programar(self, ip, espera):
+        pc = self.pcs[ip]
+        pc['proximo'] = time.monotonic() + espera
+        heapq.heappush(self.heap, (pc['proximo'], ip))
+    
+    def _vencidas(self):
+        """Saca del heap hasta sondeos_por_segundo PCs vencidas"""
+        ahora = time.monotonic()
+        lote = []
+        while self.heap and self.heap[0][0] <= ahora and len(lote) < self.sondeos_por_segundo:
+            momento, ip = heapq.heappop(self.heap)
+            # Entradas de PCs que ya no se vigilan o que se reprogramaron
+            pc = self.pcs.get(ip)
+            if pc is not None and pc['proximo'] == momento:
+                lote.append(ip)
+        return lote
+    
+    def _ejecutar(self):
+        while True:
+            with self.condicion:
+                while self.activo and (not self.heap or self.heap[0][0] > time.monotonic()):
+                    self.condicion.wait(self.heap[0][0] - time.monotonic() if self.heap else None)
+                if not self.activo:
+                    self.hilo = None
+                    return
+                lote = self._vencidas()
+            
+            inicio = time.monotonic()
+            presentes = [ip for ip in lote if self.omitir and self.omitir(ip)]
+            a_sondear = [ip for ip in lote if ip not in presentes] if presentes else lote
+            resultados = verificar_pcs(a_sondear, self.puerto, timeout=self.timeout, concurrencia=len(a_sondear),
+                                       plazo=self.timeout, historial=self.historial) if a_sondear else {}
+            resultados.update(dict.fromkeys(presentes, True))
+            cambios = []
+            with self.condicion:
+                for ip in lote:
+                    pc = self.pcs.get(ip)
+                    if pc is None:
+                        continue
+                    online = resultados.get(ip, False)
+                    if online == pc['online']:
+                        pc['intervalo'] = min(pc['intervalo'] * 2, self.intervalo_maximo)
+                    else:
+                        pc['online'] = online
+                        pc['intervalo'] = self.intervalo_minimo
+                        cambios.append((ip, online))
+                    # Un poco de azar para que las PCs no se sondeen siempre en el mismo lote
+                    self._programar(ip, pc['intervalo'] * random.uniform(0.9, 1.1))
+                self.sondeos += len(a_sondear)
+                self.cambios += len(cambios)
+            
+            if self.estados is not None:
+                for ip in lote:
+                    self.estados.marcar(ip, resultados.get(ip, False))
+            for ip, online in cambios:
+                try:
+                    self.al_cambiar(ip, online)
+                except Exception as e:
+                    if self.log:
+                        self.log(f"❌ Error actualizando el estado de {ip}: {e}")
+            
+            # Con un lote completo se espera a que pase el segundo antes del siguiente
+            if len(lote) >= self.sondeos_por_segundo:
+                with self.condicion:
+                    self.condicion.wait_for(lambda: not self.activo, max(0, inicio + 1 - time.monotonic()))
+    
+    def iniciar(self):
+        """Arranca el hilo del monitor"""
+        with self.condicion:
+            if self.activo:
+                return
+            self.activo = True
+            # Un hilo que aún termina su último lote sigue trabajando
+            if self.hilo is not None:
+                return
+            self.hilo = threading.Thread(target=self._ejecutar, daemon=True, name='monitor-pcs')
+            self.hilo.start()
+    
+    def detener(self):
+        """Detiene el hilo sin esperarlo; las PCs vigiladas se conservan para un nuevo inicio"""
+        with self.condicion:
+            self.activo = False
+            self.condicion.notify()
+    
+    def texto_resumen(self):
+        """PCs vigiladas y sondeos hechos en una línea, para la interfaz"""
+        with self.condicion:
+            estables = sum(1 for pc in self.pcs.values() if pc['intervalo'] >= self.intervalo_maximo)
+            return (f"{len(self.pcs)} PCs vigiladas ({estables} estables) | "
+                    f"{self.sondeos} sondeos | {self.cambios} cambios")
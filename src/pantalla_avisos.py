@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Cola de avisos pendientes de mostrar en pantalla - Una sola ventana para todos los avisos
+"""
+
+import time
+from collections import deque
+from datetime import datetime
+
+MAX_AVISOS_PANTALLA = 500
+
+
+class AvisoEnPantalla:
+    """Aviso pendiente de confirmar, con los orígenes y repeticiones fusionados"""
+    
+    def __init__(self, aviso, origen, leido=None):
+        self.aviso = aviso
+        self.origenes = [origen[0]]
+        self.repeticiones = 1
+        self.recibido = datetime.now()
+        # time.perf_counter() de la lectura del socket, para medir el tiempo hasta verse
+        self.leido = leido if leido is not None else time.perf_counter()
+    
+    @property
+    def clave(self):
+        """Dos avisos con el mismo texto y tipo se muestran como uno solo"""
+        return (self.aviso.get('mensaje'), self.aviso.get('tipo'))
+    
+    def fusionar(self, origen):
+        """Suma una repetición del mismo aviso"""
+        self.repeticiones += 1
+        if origen[0] not in self.origenes:
+            self.origenes.append(origen[0])
+
+
+class ColaAvisosPantalla:
+    """Avisos recibidos pendientes de confirmar, navegables de uno en uno.
+    
+    Los avisos idénticos que aún no se confirmaron se fusionan en una entrada,
+    y la cola descarta los más antiguos al superar max_avisos, así que el trabajo
+    de la interfaz no depende de cuántos avisos lleguen.
+    """
+    
+    def __init__(self, max_avisos=MAX_AVISOS_PANTALLA):
+        self.avisos = deque()
+        self.por_clave = {}
+        self.indice = 0
+        self.max_avisos = max_avisos
+        self.descartados = 0
+    
+    def __len__(self):
+        return len(self.avisos)
+    
+    def agregar(self, aviso, origen, leido=None):
+        """Agrega un aviso; devuelve True si se fusionó con uno pendiente igual"""
+        entrada = AvisoEnPantalla(aviso, origen, leido)
+        existente = self.por_clave.get(entrada.clave)
+        if existente:
+            existente.fusionar(origen)
+            return True
+        
+        self.avisos.append(entrada)
+        self.por_clave[entrada.clave] = entrada
+        while len(self.avisos) > self.max_avisos:
+            # Se descarta el más antiguo salvo que sea el que está en pantalla
+            posicion = 1 if self.indice == 0 else 0
+            self._quitar(posicion)
+            self.descartados += 1
+        return False
+    
+    def actual(self):
+        """Aviso que debe estar en pantalla, o None si no queda ninguno"""
+        return self.avisos[self.indice] if self.avisos else None
+    
+    def posicion(self):
+        """Posición del aviso actual (desde 1) y total de avisos en cola"""
+        return (self.indice + 1 if self.avisos else 0), len(self.avisos)
+    
+    def siguiente(self):
+        """Avanza al siguiente aviso si existe"""
+        if self.indice < len(self.avisos) - 1:
+            self.indice += 1
+        return self.actual()
+    
+    def anterior(self):
+        """Retrocede al aviso anterior si existe"""
+        if self.indice > 0:
+            self.indice -= 1
+        return self.actual()
+    
+    def confirmar_actual(self):
+        """Quita el aviso actual y devuelve el que pasa a mostrarse"""
+        if self.avisos:
+            self._quitar(self.indice)
+        return self.actual()
+    
+    def vaciar(self):
+        """Confirma todos los avisos pendientes"""
+        self.avisos.clear()
+        self.por_clave.clear()
+        self.indice = 0
+    
+    def _quitar(self, posicion):
+        """Elimina la entrada en la posición indicada manteniendo el índice válido"""
+        entrada = self.avisos[posicion]
+        del self.avisos[posicion]
+        if self.por_clave.get(entrada.clave) is entrada:
+            del self.por_clave[entrada.clave]
+        if posicion < self.indice or self.indice >= len(self.avisos):
+            self.indice = max(0, self.indice - 1)
+
+
+class TiemposPantalla:
+    """Últimas mediciones del tiempo entre la lectura del socket y el aviso visible"""
+    
+    def __init__(self, max_muestras=100):
+        self.muestras = deque(maxlen=max_muestras)
+    
+    def registrar(self, leido):
+        """Registra un aviso que acaba de verse; devuelve los milisegundos transcurridos"""
+        ms = (time.perf_counter() - leido) * 1000
+        self.muestras.append(ms)
+        return ms
+    
+    def resumen(self):
+        """Texto corto con la última medición, el promedio y el máximo"""
+        if not self.muestras:
+            return "sin datos"
+        promedio = sum(self.muestras) / len(self.muestras)
+        return f"últ {self.muestras[-1]:.0f} ms | prom {promedio:.0f} ms | máx {max(self.muestras):.0f} ms"
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Presencia de receptores - Latidos UDP que los receptores envían a la consola de administración
+"""
+
+import socket
+import threading
+import time
+
+from protocolo import PUERTO_LATIDOS_DEFECTO, MAX_DATAGRAMA, ErrorProtocolo, decodificar_datagrama
+
+# Una PC deja de estar presente tras perder este número de latidos seguidos
+LATIDOS_PERDIDOS = 3
+INTERVALO_LATIDO_SUPUESTO = 10
+
+
+class TablaPresencia:
+    """Último latido de cada PC; la entrada vence si pasan LATIDOS_PERDIDOS intervalos sin otro"""
+    
+    def __init__(self):
+        self.pcs = {}
+        self.lock = threading.Lock()
+    
+    def registrar(self, ip, latido):
+        """Anota un latido; devuelve True si la PC no estaba presente"""
+        intervalo = latido.get('intervalo')
+        # El intervalo llega de la red: cualquier valor que no sea un número positivo se ignora
+        if isinstance(intervalo, bool) or not isinstance(intervalo, (int, float)) or not 0 < intervalo < float('inf'):
+            intervalo = INTERVALO_LATIDO_SUPUESTO
+        entrada = {
+            'ip': ip,
+            'hostname': latido.get('hostname'),
+            'ip_informada': latido.get('ip'),
+            'version': latido.get('version'),
+            'cola_pendientes': latido.get('cola_pendientes'),
+            'recibido': time.time(),
+            'vence': time.monotonic() + intervalo * LATIDOS_PERDIDOS
+        }
+        with self.lock:
+            nueva = ip not in self.pcs
+            self.pcs[ip] = entrada
+        return nueva
+    
+    def vencidas(self):
+        """Quita y devuelve las IPs cuyo último latido ya venció"""
+        ahora = time.monotonic()
+        with self.lock:
+            vencidas = [ip for ip, entrada in self.pcs.items() if entrada['vence'] <= ahora]
+            for ip in vencidas:
+                del self.pcs[ip]
+        return vencidas
+    
+    def presente(self, ip):
+        """Indica si la PC envió un latido que sigue vigente"""
+        with self.lock:
+            entrada = self.pcs.get(ip)
+            return entrada is not None and entrada['vence'] > time.monotonic()
+    
+    def listar(self):
+        """Copia de las entradas vigentes ordenadas por IP"""
+        with self.lock:
+            return [dict(entrada) for _, entrada in sorted(self.pcs.items())]
+    
+    def __len__(self):
+        return len(self.pcs)
+
+
+class ReceptorLatidos:
+    """Escucha los latidos en un puerto UDP desde un hilo propio y mantiene la tabla de presencia.
+    
+    al_cambiar(ip, presente, latido) se llama desde ese hilo cuando una PC
+    empieza a enviar latidos (con el latido) o deja de hacerlo (latido None).
+    Cada latido también marca la PC como online en la cache de estados. Los
+    errores al atender un latido o en al_cambiar se informan con log(texto),
+    desde el mismo hilo, sin detener la escucha.
+    """
+    
+    def __init__(self, al_cambiar, puerto=PUERTO_LATIDOS_DEFECTO, estados=None, log=None):
+        self.al_cambiar = al_cambiar
+        self.puerto = puerto
+        self.estados = estados
+        self.log = log
+        self.tabla = TablaPresencia()
+        self.sock = None
+        self.hilo = None
+        self.activo = False
+        self.recibidos = 0
+    
+    def iniciar(self):
+        """Abre el puerto UDP (los errores llegan a quien llama) y arranca el hilo"""
+        if self.activo:
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # Al reiniciar la sesión el hilo anterior puede tener el puerto todavía un segundo
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(('0.0.0.0', self.puerto))
+            # El timeout marca cada cuánto se revisan los latidos vencidos
+            sock.settimeout(1)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+        self.activo = True
+        self.hilo = threading.Thread(target=self._ejecutar, args=(sock,), daemon=True, name='latidos-pcs')
+        self.hilo.start()
+    
+    def _ejecutar(self, sock):
+        revision = time.monotonic()
+        while self.activo:
+            try:
+                datos, direccion = sock.recvfrom(MAX_DATAGRAMA + 64)
+            except socket.timeout:
+                datos = None
+            except OSError:
+                break  # Socket cerrado al detener
+            if datos is not None:
+                try:
+                    self._atender(datos, direccion[0])
+                except Exception as e:
+                    # Un datagrama mal formado no debe detener la escucha
+                    self._informar(f"⚠️ Latido inválido de {direccion[0]}: {e}")
+            
+            if time.monotonic() >= revision:
+                revision = time.monotonic() + 1
+                for ip in self.tabla.vencidas():
+                    self._avisar(ip, False, None)
+        sock.close()
+    
+    def _atender(self, datos, ip):
+        try:
+            latido = decodificar_datagrama(datos)
+        except ErrorProtocolo:
+            return
+        if latido.get('tipo') != 'latido':
+            return
+        self.recibidos += 1
+        if self.estados is not None:
+            self.estados.marcar(ip, True)
+        if self.tabla.registrar(ip, latido):
+            self._avisar(ip, True, latido)
+    
+    def _avisar(self, ip, presente, latido):
+        try:
+            self.al_cambiar(ip, presente, latido)
+        except Exception as e:
+            self._informar(f"❌ Error actualizando la presencia de {ip}: {e}")
+    
+    def _informar(self, texto):
+        if self.log:
+            self.log(texto)
+    
+    def detener(self):
+        """Detiene el hilo; sale en menos de un segundo"""
+        self.activo = False
+        self.hilo = None
+    
+    def texto_resumen(self):
+        """PCs presentes y latidos recibidos en una línea, para la interfaz"""
+        if not self.activo:
+            return "sin escuchar"
+        return f"{len(self.tabla)} PCs presentes | {self.recibidos} latidos recibidos (UDP {self.puerto})"
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Avisos programados - Envíos únicos o recurrentes (expresión cron) atendidos por un solo hilo
+"""
+
+import heapq
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from protocolo import nuevo_id
+
+ARCHIVO_PROGRAMACIONES = 'programaciones_avisos.json'
+# Un aviso único que se debió enviar mientras la aplicación estaba cerrada se
+# envía al iniciar sólo si no pasó más de este tiempo; si no, se descarta
+TOLERANCIA_ATRASO = 300
+# Espera máxima del hilo entre comprobaciones, por si cambia la hora del sistema
+ESPERA_MAXIMA = 60
+
+DESTINO_TODAS = 'todas'
+
+# El día de la semana admite 0 y 7 para el domingo
+RANGOS_CRON = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _campo_cron(texto, minimo, maximo):
+    """Valores permitidos por un campo cron: *, */n, a, a-b, a-b/n y listas separadas por comas"""
+    valores = set()
+    for parte in texto.split(','):
+        rango, _, paso = parte.partition('/')
+        if rango == '*':
+            inicio, fin = minimo, maximo
+        elif '-' in rango:
+            inicio, fin = (int(v) for v in rango.split('-', 1))
+        else:
+            inicio = fin = int(rango)
+        paso = int(paso) if paso else 1
+        if not (minimo <= inicio <= maximo and minimo <= fin <= maximo) or inicio > fin or paso < 1:
+            raise ValueError(f"Campo cron fuera de rango: {parte}")
+        valores.update(range(inicio, fin + 1, paso))
+    return frozenset(valores)
+
+
+class ExpresionCron:
+    """Expresión cron de cinco campos: minuto hora día-del-mes mes día-de-la-semana (0 = domingo)"""
+    
+    def __init__(self, texto):
+        campos = texto.split()
+        if len(campos) != 5:
+            raise ValueError("La expresión cron debe tener 5 campos: minuto hora día mes día-semana")
+        self.texto = ' '.join(campos)
+        self.minutos, self.horas, self.dias, self.meses, dias_semana = (
+            _campo_cron(campo, *rango) for campo, rango in zip(campos, RANGOS_CRON)
+        )
+        self.dias_semana = frozenset(dia % 7 for dia in dias_semana)
+        # Como en cron, si se restringen el día del mes y el de la semana basta con uno
+        self.dia_o_semana = campos[2] != '*' and campos[4] != '*'
+    
+    def _dia_valido(self, fecha):
+        en_mes = fecha.day in self.dias
+        en_semana = (fecha.weekday() + 1) % 7 in self.dias_semana
+        return (en_mes or en_semana) if self.dia_o_semana else (en_mes and en_semana)
+    
+    def siguiente(self, desde):
+        """Primer minuto posterior a desde (datetime) que cumple la expresión"""
+        fecha = desde.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = fecha + timedelta(days=366 * 8)
+        while fecha < limite:
+            # Se salta de mes, día u hora completos en lugar de minuto a minuto
+            if fecha.month not in self.meses:
+                fecha = (fecha.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._dia_valido(fecha):
+                fecha = fecha.replace(hour=0, minute=0) + timedelta(days=1)
+            elif fecha.hour not in self.horas:
+                fecha = fecha.replace(minute=0) + timedelta(hours=1)
+            elif fecha.minute not in self.minutos:
+                fecha += timedelta(minutes=1)
+            else:
+                return fecha
+        raise ValueError(f"La expresión cron nunca se cumple: {self.texto}")
+
+
+def interpretar_fecha(texto, ahora=None):
+    """Fecha de un aviso único escrita como 'HH:MM' (hoy, o mañana si ya pasó) o 'AAAA-MM-DD HH:MM'"""
+    ahora = ahora or datetime.now()
+    texto = texto.strip()
+    try:
+        hora = datetime.strptime(texto, '%H:%M')
+    except ValueError:
+        return datetime.strptime(texto, '%Y-%m-%d %H:%M')
+    fecha = ahora.replace(hour=hora.hour, minute=hora.minute, second=0, microsecond=0)
+    return fecha if fecha > ahora else fecha + timedelta(days=1)
+
+
+def proxima_ejecucion(programacion, desde=None):
+    """Próxima fecha de una programación recurrente a partir de desde (por defecto ahora)"""
+    return ExpresionCron(programacion['cron']).siguiente(desde or datetime.now())
+
+
+class ProgramadorAvisos:
+    """Programaciones de avisos guardadas en disco y ejecutadas por un único hilo.
+    
+    Las próximas ejecuciones se ordenan en un heap; el hilo duerme hasta la
+    más cercana (o hasta que cambian las programaciones), así que el costo en
+    reposo no depende de cuántas haya. Al vencer una programación se llama a
+    al_vencer(programacion) desde ese hilo, que debe volver enseguida; si
+    falla, el error se informa con log(texto), también desde ese hilo.
+    
+    Cada programación es un dict con id, mensaje, destino ('todas', un grupo o
+    una lista de IPs), auto_cerrar, cron (None si es única) y proxima (ISO).
+    """
+    
+    def __init__(self, al_vencer, ruta=ARCHIVO_PROGRAMACIONES, log=None):
+        self.al_vencer = al_vencer
+        self.ruta = ruta
+        self.log = log
+        self.programaciones = {}
+        self.heap = []
+        self.condicion = threading.Condition()
+        self.lock_archivo = threading.Lock()
+        self.hilo = None
+        self.activo = False
+        self.descartadas = []
+        self.cargar()
+    
+    def cargar(self):
+        """Recupera las programaciones guardadas, recalculando las que vencieron sin ejecutarse"""
+        if not self.ruta or not os.path.exists(self.ruta):
+            return
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                guardadas = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        ahora = datetime.now()
+        for programacion in guardadas:
+            try:
+                proxima = datetime.fromisoformat(programacion['proxima'])
+                if proxima < ahora and programacion.get('cron'):
+                    programacion['proxima'] = proxima_ejecucion(programacion, ahora).isoformat()
+                elif proxima < ahora - timedelta(seconds=TOLERANCIA_ATRASO):
+                    self.descartadas.append(programacion)
+                    continue
+            except (KeyError, ValueError):
+                continue
+            self._agregar(programacion)
+        if self.descartadas:
+            self.guardar()
+    
+    def guardar(self):
+        """Escribe todas las programaciones en el archivo"""
+        if not self.ruta:
+            return
+        with self.condicion:
+            datos = self.listar()
+        temporal = self.ruta + '.tmp'
+        with self.lock_archivo:
+            try:
+                with open(temporal, 'w', encoding='utf-8') as f:
+                    json.dump(datos, f, indent=2, ensure_ascii=False)
+                os.replace(temporal, self.ruta)
+            except OSError:
+                pass  # Se vuelve a intentar en el próximo cambio
+    
+    def _agregar(self, programacion):
+        self.programaciones[programacion['id']] = programacion
+        momento = datetime.fromisoformat(programacion['proxima']).timestamp()
+        heapq.heappush(self.heap, (momento, programacion['id']))
+    
+    def programar(self, mensaje, destino=DESTINO_TODAS, cuando=None, cron=None, auto_cerrar=False):
+        """Crea una programación única (cuando, datetime) o recurrente (cron) y la devuelve"""
+        if cron:
+            cron = ExpresionCron(cron).texto
+            proxima = ExpresionCron(cron).siguiente(datetime.now())
+        elif cuando is not None:
+            proxima = cuando
+        else:
+            raise ValueError("Indica la fecha del aviso o una expresión cron")
+        
+        programacion = {
+            'id': nuevo_id(),
+            'mensaje': mensaje,
+            'destino': destino,
+            'auto_cerrar': auto_cerrar,
+            'cron': cron,
+            'proxima': proxima.isoformat(timespec='seconds'),
+            'creada': datetime.now().isoformat(timespec='seconds')
+        }
+        with self.condicion:
+            self._agregar(programacion)
+            self.condicion.notify()
+        self.guardar()
+        return programacion
+    
+    def cancelar(self, id_programacion):
+        """Elimina una programación; su entrada del heap se descarta al llegar su turno"""
+        with self.condicion:
+            eliminada = self.programaciones.pop(id_programacion, None)
+            self.condicion.notify()
+        if eliminada:
+            self.guardar()
+        return eliminada
+    
+    def listar(self):
+        """Programaciones ordenadas por próxima ejecución"""
+        with self.condicion:
+            return sorted(self.programaciones.values(), key=lambda p: p['proxima'])
+    
+    def iniciar(self):
+        """Arranca el hilo que ejecuta las programaciones vencidas"""
+        if self.activo:
+            return
+        self.activo = True
+        self.hilo = threading.Thread(target=self._ejecutar, daemon=True, name='programador-avisos')
+        self.hilo.start()
+    
+    def detener(self):
+        """Detiene el hilo; las programaciones ya se guardan con cada cambio"""
+        with self.condicion:
+            self.activo = False
+            self.condicion.notify()
+        if self.hilo:
+            self.hilo.join(timeout=2)
+    
+    def _vencidas(self):
+        """Saca del heap las programaciones vencidas; devuelve (vencidas, segundos hasta la próxima)"""
+        ahora = time.time()
+        vencidas = []
+        while self.heap and self.heap[0][0] <= ahora:
+            momento, id_programacion = heapq.heappop(self.heap)
+            programacion = self.programaciones.get(id_programacion)
+            # Entradas de programaciones canceladas o reprogramadas
+            if programacion is None or datetime.fromisoformat(programacion['proxima']).timestamp() != momento:
+                continue
+            vencidas.append(dict(programacion))
+            if programacion['cron']:
+                programacion['proxima'] = proxima_ejecucion(programacion).isoformat(timespec='seconds')
+                self._agregar(programacion)
+            else:
+                del self.programaciones[id_programacion]
+        espera = self.heap[0][0] - ahora if self.heap else None
+        return vencidas, espera
+    
+    def _ejecutar(self):
+        while True:
+            with self.condicion:
+                if not self.activo:
+                    return
+                vencidas, espera = self._vencidas()
+                if not vencidas:
+                    self.condicion.wait(ESPERA_MAXIMA if espera is None else min(espera, ESPERA_MAXIMA))
+                    continue
+            
+            for programacion in vencidas:
+                try:
+                    self.al_vencer(programacion)
+                except Exception as e:
+                    if self.log:
+                        self.log(f"❌ Error enviando el aviso programado '{programacion['mensaje']}': {e}")
+            self.guardar()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Protocolo de red del sistema de avisos - Tramas JSON con cabecera de longitud
+
+Formato de trama (versión 1):
+    'AV' (2 bytes) | versión (1 byte) | longitud del cuerpo (4 bytes, big-endian) | cuerpo JSON UTF-8
+
+Los emisores antiguos envían el JSON sin cabecera; el receptor los detecta por
+el primer byte y les responde también sin cabecera.
+
+Por multicast UDP cada datagrama lleva una trama completa, y los receptores
+confirman con otra trama por unicast a la dirección de origen. Los latidos que
+los receptores envían a las consolas también son una trama por datagrama.
+"""
+
+import asyncio
+import json
+import socket
+import struct
+import uuid
+
+MAGIA = b'AV'
+VERSION_PROTOCOLO = 1
+CABECERA = struct.Struct('!2sBI')
+MAX_TAMANO_TRAMA = 64 * 1024
+TAMANO_BUFFER_INICIAL = 4096
+PUERTO_DEFECTO = 8888
+GRUPO_MULTICAST_DEFECTO = '239.255.88.88'
+PUERTO_MULTICAST_DEFECTO = 8889
+# Puerto UDP donde las consolas de administración reciben los latidos de los receptores
+PUERTO_LATIDOS_DEFECTO = 8890
+# Un aviso por multicast debe caber en un datagrama sin fragmentar
+MAX_DATAGRAMA = 1400
+
+
+class ErrorProtocolo(Exception):
+    """Trama mal formada, demasiado grande o de una versión no soportada"""
+
+
+def nuevo_id():
+    """Identificador único de mensaje; los reintentos reutilizan el mismo"""
+    return uuid.uuid4().hex
+
+
+def codificar(mensaje):
+    """Serializa un mensaje como trama con cabecera"""
+    cuerpo = json.dumps(mensaje, ensure_ascii=False).encode('utf-8')
+    return CABECERA.pack(MAGIA, VERSION_PROTOCOLO, len(cuerpo)) + cuerpo
+
+
+def codificar_legacy(mensaje):
+    """Serializa un mensaje en el formato antiguo (JSON sin cabecera)"""
+    return json.dumps(mensaje, ensure_ascii=False).encode('utf-8')
+
+
+def validar_cabecera(cabecera, max_tamano=MAX_TAMANO_TRAMA):
+    """Valida una cabecera y devuelve la longitud del cuerpo"""
+    magia, version, longitud = CABECERA.unpack(cabecera)
+    if magia != MAGIA:
+        raise ErrorProtocolo("Cabecera de trama inválida")
+    if version != VERSION_PROTOCOLO:
+        raise ErrorProtocolo(f"Versión de protocolo no soportada: {version}")
+    if longitud > max_tamano:
+        raise ErrorProtocolo(f"Trama de {longitud} bytes supera el máximo de {max_tamano}")
+    return longitud
+
+
+def decodificar_cuerpo(cuerpo, que='La trama'):
+    """Decodifica el cuerpo JSON de una trama; debe ser un objeto (dict)"""
+    try:
+        mensaje = json.loads(bytes(cuerpo).decode('utf-8'))
+    except (UnicodeDecodeError, ValueError):
+        raise ErrorProtocolo(f"{que} tiene JSON inválido")
+    if not isinstance(mensaje, dict):
+        raise ErrorProtocolo(f"{que} no contiene un mensaje")
+    return mensaje
+
+
+def decodificar_datagrama(datos, max_tamano=MAX_DATAGRAMA):
+    """Decodifica un datagrama que contiene una trama completa"""
+    if len(datos) < CABECERA.size:
+        raise ErrorProtocolo("Datagrama demasiado corto")
+    longitud = validar_cabecera(datos[:CABECERA.size], max_tamano)
+    if len(datos) != CABECERA.size + longitud:
+        raise ErrorProtocolo("La longitud del datagrama no coincide con su cabecera")
+    return decodificar_cuerpo(datos[CABECERA.size:], 'El datagrama')
+
+
+def es_trama(datos):
+    """Indica si los primeros bytes recibidos corresponden a una trama con cabecera"""
+    # Basta el primer byte: el JSON legacy siempre empieza con '{' o espacios
+    return bytes(datos[:1]) == MAGIA[:1]
+
+
+def intentar_json(datos):
+    """Decodifica JSON legacy; devuelve None si todavía está incompleto"""
+    try:
+        mensaje = json.loads(bytes(datos).decode('utf-8'))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(mensaje, dict):
+        raise ErrorProtocolo("El mensaje legacy no contiene un mensaje")
+    return mensaje
+
+
+class LectorMensajes:
+    """Lee tramas de un socket bloqueante con recv_into sobre un buffer reutilizable"""
+    
+    def __init__(self, sock, max_tamano=MAX_TAMANO_TRAMA):
+        self.sock = sock
+        self.max_tamano = max_tamano
+        self.cabecera = bytearray(CABECERA.size)
+        self.buffer = bytearray(TAMANO_BUFFER_INICIAL)
+    
+    def _llenar(self, vista):
+        """Llena por completo la vista indicada; devuelve los bytes leídos"""
+        leidos = 0
+        while leidos < len(vista):
+            n = self.sock.recv_into(vista[leidos:])
+            if n == 0:
+                break
+            leidos += n
+        return leidos
+    
+    def recibir(self):
+        """Devuelve (mensaje, enmarcado) o (None, False) si el otro extremo cerró"""
+        vista_cabecera = memoryview(self.cabecera)
+        leidos = self.sock.recv_into(vista_cabecera)
+        if leidos == 0:
+            return None, False
+        
+        if not es_trama(vista_cabecera[:leidos]):
+            return self._recibir_legacy(leidos), False
+        
+        if self._llenar(vista_cabecera[leidos:]) + leidos < CABECERA.size:
+            raise ErrorProtocolo("Conexión cerrada a mitad de la cabecera")
+        
+        longitud = validar_cabecera(self.cabecera, self.max_tamano)
+        if longitud > len(self.buffer):
+            self.buffer = bytearray(longitud)
+        
+        vista = memoryview(self.buffer)[:longitud]
+        if self._llenar(vista) < longitud:
+            raise ErrorProtocolo("Conexión cerrada a mitad de la trama")
+        
+        return decodificar_cuerpo(vista), True
+    
+    def _recibir_legacy(self, leidos):
+        """Lee un JSON sin cabecera hasta que esté completo o se cierre la conexión"""
+        datos = bytearray(self.cabecera[:leidos])
+        while True:
+            mensaje = intentar_json(datos)
+            if mensaje is not None:
+                return mensaje
+            if len(datos) > self.max_tamano:
+                raise ErrorProtocolo("Mensaje legacy supera el tamaño máximo")
+            vista = memoryview(self.buffer)
+            n = self.sock.recv_into(vista)
+            if n == 0:
+                raise ErrorProtocolo("Mensaje legacy incompleto")
+            datos += vista[:n]
+
+
+def enviar_mensaje(sock, mensaje):
+    """Envía un mensaje enmarcado completo"""
+    sock.sendall(codificar(mensaje))
+
+
+def solicitar(ip, mensaje, puerto=PUERTO_DEFECTO, timeout=10, max_tamano=MAX_TAMANO_TRAMA, legacy=True):
+    """Envía un mensaje y devuelve la respuesta del receptor (o None si no respondió).
+    
+    Si el receptor es de una versión antigua y cierra la conexión sin responder
+    a la trama, se reintenta una vez en formato legacy, salvo con legacy=False:
+    los mensajes de control ('ping', 'status') no deben reenviarse así, porque
+    un receptor antiguo trata cualquier JSON como un aviso y lo muestra.
+    """
+    with socket.create_connection((ip, puerto), timeout=timeout) as sock:
+        enviar_mensaje(sock, mensaje)
+        respuesta, _ = LectorMensajes(sock, max_tamano).recibir()
+    
+    if respuesta is None and legacy:
+        respuesta = solicitar_legacy(ip, mensaje, puerto, timeout)
+    return respuesta
+
+
+def solicitar_legacy(ip, mensaje, puerto=PUERTO_DEFECTO, timeout=10):
+    """Envía un mensaje en formato antiguo a un receptor sin soporte de tramas"""
+    with socket.create_connection((ip, puerto), timeout=timeout) as sock:
+        sock.sendall(codificar_legacy(mensaje))
+        respuesta, _ = LectorMensajes(sock).recibir()
+    return respuesta
+
+
+async def leer_mensaje_async(reader, max_tamano=MAX_TAMANO_TRAMA):
+    """Versión asyncio de LectorMensajes.recibir: devuelve (mensaje, enmarcado)"""
+    primeros = await leer_inicio_async(reader)
+    if not primeros:
+        return None, False
+    return await completar_mensaje_async(reader, primeros, max_tamano), es_trama(primeros)
+
+
+async def leer_inicio_async(reader):
+    """Lee los primeros bytes de un mensaje, suficientes para saber su formato; b'' si se cerró"""
+    return await reader.read(CABECERA.size)
+
+
+async def completar_mensaje_async(reader, primeros, max_tamano=MAX_TAMANO_TRAMA):
+    """Lee el resto del mensaje que empieza con primeros y lo decodifica"""
+    if not es_trama(primeros):
+        datos = bytearray(primeros)
+        while True:
+            mensaje = intentar_json(datos)
+            if mensaje is not None:
+                return mensaje
+            if len(datos) > max_tamano:
+                raise ErrorProtocolo("Mensaje legacy supera el tamaño máximo")
+            bloque = await reader.read(TAMANO_BUFFER_INICIAL)
+            if not bloque:
+                raise ErrorProtocolo("Mensaje legacy incompleto")
+            datos += bloque
+    
+    longitud = await _leer_cabecera_async(reader, primeros, max_tamano)
+    return decodificar_cuerpo(await reader.readexactly(longitud))
+
+
+async def descartar_trama_async(reader, primeros, max_tamano=MAX_TAMANO_TRAMA):
+    """Consume el cuerpo de una trama sin decodificarlo, para seguir leyendo la sesión"""
+    longitud = await _leer_cabecera_async(reader, primeros, max_tamano)
+    await reader.readexactly(longitud)
+
+
+async def _leer_cabecera_async(reader, primeros, max_tamano):
+    """Completa y valida la cabecera; devuelve la longitud del cuerpo"""
+    try:
+        cabecera = primeros + await reader.readexactly(CABECERA.size - len(primeros))
+    except asyncio.IncompleteReadError:
+        raise ErrorProtocolo("Conexión cerrada a mitad de la cabecera")
+    return validar_cabecera(cabecera, max_tamano)
+
+
+def codificar_respuesta(mensaje, enmarcado):
+    """Codifica una respuesta en el mismo formato que la petición"""
+    return codificar(mensaje) if enmarcado else codificar_legacy(mensaje)
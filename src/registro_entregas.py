@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Registro de entregas de avisos - Tiempos y resultado por aviso y destino, guardado por lotes
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from envio_masivo import clasificar_error, clasificar_respuesta, _ms
+
+ARCHIVO_ENTREGAS = 'entregas_avisos.jsonl'
+TAMANO_LOTE = 50
+MAX_AVISOS_EN_MEMORIA = 2000
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por rango más cercano; None si no hay valores"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[max(1, math.ceil(p / 100 * len(ordenados))) - 1]
+
+
+def resumen_latencias(latencias, fallos=0):
+    """Cantidad de envíos y p50/p95/p99 de las latencias en ms"""
+    return {
+        'envios': len(latencias) + fallos,
+        'ok': len(latencias),
+        'p50': percentil(latencias, 50),
+        'p95': percentil(latencias, 95),
+        'p99': percentil(latencias, 99)
+    }
+
+
+class RegistroEntregas:
+    """Libro de entregas indexado por id de aviso.
+    
+    Para cada aviso guarda cuándo se encoló y, por destino, cuánto tardó la
+    conexión, cuánto la confirmación (desde el encolado) y el resultado. Los
+    registros se agregan a un archivo JSONL por lotes de tamano_lote, o al
+    llamar a guardar(); en memoria sólo se conservan los últimos avisos.
+    Si se indica estados (CacheEstadoPCs), cada envío actualiza el estado de la PC,
+    y si se indica historial (HistorialRTT), cada confirmación anota su RTT.
+    """
+    
+    def __init__(self, ruta=ARCHIVO_ENTREGAS, tamano_lote=TAMANO_LOTE, max_avisos=MAX_AVISOS_EN_MEMORIA,
+                 estados=None, historial=None):
+        self.ruta = ruta
+        self.estados = estados
+        self.historial = historial
+        self.tamano_lote = tamano_lote
+        self.max_avisos = max_avisos
+        self.avisos = OrderedDict()
+        self.lote = []
+        self.lock = threading.Lock()
+        self.lock_archivo = threading.Lock()
+        self.cargar()
+    
+    def cargar(self):
+        """Recupera del archivo los registros de los últimos avisos"""
+        if not self.ruta or not os.path.exists(self.ruta):
+            return
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                lineas = deque(f, maxlen=self.max_avisos * 10)
+        except OSError:
+            return
+        for linea in lineas:
+            try:
+                self._agregar_en_memoria(json.loads(linea))
+            except (ValueError, KeyError):
+                continue
+    
+    def _agregar_en_memoria(self, registro):
+        """Incorpora un registro de destino al aviso correspondiente (con el lock tomado)"""
+        aviso = self.avisos.get(registro['id'])
+        if aviso is None:
+            aviso = {
+                'id': registro['id'],
+                'mensaje': registro.get('mensaje', ''),
+                'difusion': registro.get('difusion', False),
+                'encolado': registro.get('encolado'),
+                'destinos': {}
+            }
+            self.avisos[registro['id']] = aviso
+            while len(self.avisos) > self.max_avisos:
+                self.avisos.popitem(last=False)
+        aviso['destinos'][registro['ip']] = registro
+    
+    def registrar(self, aviso, ip, resultado, encolado, conexion_ms=None, ack_ms=None, difusion=False):
+        """Anota el resultado de un aviso en un destino"""
+        registro = {
+            'id': aviso.get('id'),
+            'mensaje': aviso.get('mensaje', '')[:80],
+            'difusion': difusion,
+            'ip': ip,
+            'encolado': encolado,
+            'conexion_ms': conexion_ms,
+            'ack_ms': ack_ms,
+            'resultado': resultado
+        }
+        with self.lock:
+            self._agregar_en_memoria(registro)
+            self.lote.append(registro)
+            lleno = len(self.lote) >= self.tamano_lote
+        if lleno:
+            self.guardar()
+    
+    def registrar_informe(self, aviso, informe):
+        """Anota todos los destinos de un envío masivo (InformeEnvio)"""
+        encolado = time.time() - (time.monotonic() - informe.inicio)
+        for r in informe.resultados:
+            self.registrar(aviso, r['ip'], r['error'] or 'ok', encolado, r['conexion_ms'], r['ack_ms'],
+                           difusion=True)
+            # ack_ms cuenta desde el inicio del envío masivo; el RTT de la PC es su propia latencia
+            if self.historial is not None and r['error'] is None and r['canal'] == 'tcp':
+                self.historial.registrar(r['ip'], r['latencia_ms'])
+    
+    def enviar(self, gestor, ip, aviso, puerto, timeout):
+        """Envía por el gestor de sesiones registrando tiempos y resultado; devuelve la respuesta"""
+        encolado = time.time()
+        inicio = time.perf_counter()
+        tiempos = {}
+        try:
+            respuesta = gestor.solicitar(ip, aviso, puerto, timeout, tiempos)
+        except Exception as e:
+            error = clasificar_error(e)
+            if self.estados is not None:
+                self.estados.registrar_resultado(ip, error)
+            self.registrar(aviso, ip, error, encolado, _ms(tiempos.get('conexion')))
+            raise
+        error = clasificar_respuesta(respuesta)
+        if self.estados is not None:
+            self.estados.registrar_resultado(ip, error)
+        resultado = error or 'ok'
+        ack_ms = _ms(time.perf_counter() - inicio) if resultado == 'ok' else None
+        if self.historial is not None:
+            self.historial.registrar(ip, ack_ms)
+        self.registrar(aviso, ip, resultado, encolado, _ms(tiempos.get('conexion')), ack_ms)
+        return respuesta
+    
+    def guardar(self):
+        """Agrega al archivo los registros pendientes"""
+        with self.lock:
+            lote, self.lote = self.lote, []
+        if not lote or not self.ruta:
+            return
+        with self.lock_archivo:
+            try:
+                with open(self.ruta, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(r, ensure_ascii=False) + '\n' for r in lote)
+            except OSError:
+                with self.lock:
+                    self.lote[:0] = lote  # Se reintenta en el próximo guardado
+    
+    def latencias_por_pc(self):
+        """{ip: resumen_latencias} de todos los avisos en memoria"""
+        latencias = {}
+        fallos = {}
+        with self.lock:
+            for aviso in self.avisos.values():
+                for ip, registro in aviso['destinos'].items():
+                    latencias.setdefault(ip, [])
+                    if registro['resultado'] == 'ok' and registro['ack_ms'] is not None:
+                        latencias[ip].append(registro['ack_ms'])
+                    else:
+                        fallos[ip] = fallos.get(ip, 0) + 1
+        return {ip: resumen_latencias(valores, fallos.get(ip, 0)) for ip, valores in latencias.items()}
+    
+    def latencias_por_difusion(self):
+        """Resumen de latencias de cada envío masivo, del más reciente al más antiguo"""
+        difusiones = []
+        with self.lock:
+            for aviso in reversed(self.avisos.values()):
+                if not aviso['difusion']:
+                    continue
+                destinos = aviso['destinos'].values()
+                valores = [r['ack_ms'] for r in destinos if r['resultado'] == 'ok' and r['ack_ms'] is not None]
+                resumen = resumen_latencias(valores, len(destinos) - len(valores))
+                resumen.update(id=aviso['id'], mensaje=aviso['mensaje'], encolado=aviso['encolado'])
+                difusiones.append(resumen)
+        return difusiones
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Reintentos de avisos no entregados - Espera exponencial con tope y jitter completo, por destino
+"""
+
+import heapq
+import random
+import threading
+import time
+
+from protocolo import PUERTO_DEFECTO
+from envio_masivo import clasificar_error, clasificar_respuesta, ERROR_ACK_INVALIDO
+from despacho_avisos import prioridad_de_envio
+
+ESPERA_BASE_DEFECTO = 2
+ESPERA_MAXIMA_DEFECTO = 60
+MAX_INTENTOS_DEFECTO = 8
+EDAD_MAXIMA_DEFECTO = 600
+TIMEOUT_REINTENTO = 5
+
+# Si el receptor respondió con una confirmación inválida, repetir no ayuda
+ERRORES_SIN_REINTENTO = (ERROR_ACK_INVALIDO,)
+
+
+class PoliticaReintentos:
+    """Cuándo y cuántas veces se reintenta un envío fallido"""
+    
+    def __init__(self, base=ESPERA_BASE_DEFECTO, maximo=ESPERA_MAXIMA_DEFECTO,
+                 max_intentos=MAX_INTENTOS_DEFECTO, edad_maxima=EDAD_MAXIMA_DEFECTO):
+        self.base = base
+        self.maximo = maximo
+        self.max_intentos = max_intentos
+        self.edad_maxima = edad_maxima
+    
+    def espera(self, intento):
+        """Segundos antes del reintento número intento (desde 0): jitter completo sobre base * 2^intento"""
+        return random.uniform(0, min(self.maximo, self.base * 2 ** intento))
+    
+    def agotado(self, intentos, creado, ahora=None):
+        """Indica si ya no quedan intentos o el aviso superó su edad máxima"""
+        ahora = ahora if ahora is not None else time.monotonic()
+        return intentos >= self.max_intentos or ahora - creado >= self.edad_maxima
+
+
+class GestorReintentos:
+    """Reintentos pendientes de todas las PCs, atendidos por un único hilo temporizador.
+    
+    Cada envío fallido a una PC se reintenta con el mismo aviso (mismo id, así
+    que el receptor no lo muestra dos veces) hasta que llega, se agotan los
+    intentos o vence su edad máxima. El hilo sólo decide cuándo: los envíos en
+    sí pasan por la cola de despacho con la prioridad del aviso.
+    
+    enviar(ip, aviso, puerto, timeout) hace el envío; al_cambiar(reintento)
+    se llama cuando un reintento llega, se abandona o se cancela.
+    """
+    
+    def __init__(self, enviar, despacho, politica=None, al_cambiar=None):
+        self.enviar = enviar
+        self.despacho = despacho
+        self.politica = politica or PoliticaReintentos()
+        self.al_cambiar = al_cambiar
+        self.pendientes = {}
+        self.heap = []
+        self.condicion = threading.Condition()
+        self.hilo = None
+        self.activo = True
+        self.estadisticas = {'entregados': 0, 'abandonados': 0, 'cancelados': 0}
+    
+    def agregar(self, aviso, ip, error, puerto=PUERTO_DEFECTO):
+        """Programa el reintento de un envío fallido; devuelve False si el error no se reintenta"""
+        if error in ERRORES_SIN_REINTENTO:
+            return False
+        clave = (aviso.get('id'), ip)
+        with self.condicion:
+            if not self.activo or clave in self.pendientes:
+                return False
+            reintento = {
+                'clave': clave,
+                'aviso': aviso,
+                'ip': ip,
+                'puerto': puerto,
+                'intentos': 0,
+                'creado': time.monotonic(),
+                'ultimo_error': error,
+                'estado': 'pendiente'
+            }
+            self.pendientes[clave] = reintento
+            self._programar(reintento)
+            if self.hilo is None:
+                self.hilo = threading.Thread(target=self._ejecutar, daemon=True, name='reintentos-avisos')
+                self.hilo.start()
+        return True
+    
+    def _programar(self, reintento):
+        reintento['proximo'] = time.monotonic() + self.politica.espera(reintento['intentos'])
+        heapq.heappush(self.heap, (reintento['proximo'], id(reintento), reintento))
+        self.condicion.notify()
+    
+    def _terminar(self, reintento, estado):
+        """Quita el reintento de los pendientes y avisa el resultado"""
+        with self.condicion:
+            if self.pendientes.get(reintento['clave']) is not reintento:
+                return
+            del self.pendientes[reintento['clave']]
+            reintento['estado'] = estado
+            self.estadisticas[{'entregado': 'entregados', 'abandonado': 'abandonados',
+                               'cancelado': 'cancelados'}[estado]] += 1
+        if self.al_cambiar:
+            self.al_cambiar(reintento)
+    
+    def _intentar(self, reintento):
+        """Reenvía el aviso; se ejecuta en la cola de despacho"""
+        if reintento['estado'] != 'pendiente':
+            return
+        try:
+            respuesta = self.enviar(reintento['ip'], reintento['aviso'], reintento['puerto'], TIMEOUT_REINTENTO)
+            error = clasificar_respuesta(respuesta)
+        except Exception as e:
+            error = clasificar_error(e)
+        
+        if error is None:
+            self._terminar(reintento, 'entregado')
+            return
+        with self.condicion:
+            if self.pendientes.get(reintento['clave']) is not reintento:
+                return
+            reintento['intentos'] += 1
+            reintento['ultimo_error'] = error
+            agotado = (error in ERRORES_SIN_REINTENTO
+                       or self.politica.agotado(reintento['intentos'], reintento['creado']))
+            if not agotado:
+                self._programar(reintento)
+        if agotado:
+            self._terminar(reintento, 'abandonado')
+    
+    def _ejecutar(self):
+        while True:
+            with self.condicion:
+                while self.activo and (not self.heap or self.heap[0][0] > time.monotonic()):
+                    self.condicion.wait(self.heap[0][0] - time.monotonic() if self.heap else None)
+                if not self.activo:
+                    return
+                _, _, reintento = heapq.heappop(self.heap)
+                # Entradas de reintentos ya terminados o cancelados
+                if self.pendientes.get(reintento['clave']) is not reintento:
+                    continue
+            try:
+                self.despacho.enviar(prioridad_de_envio(reintento['aviso']), self._intentar, reintento)
+            except RuntimeError:
+                return  # La cola de despacho se detuvo
+    
+    def cancelar(self, clave):
+        """Cancela un reintento pendiente; su entrada del heap se descarta al llegar su turno"""
+        reintento = self.pendientes.get(clave)
+        if reintento:
+            self._terminar(reintento, 'cancelado')
+        return reintento
+    
+    def cancelar_todos(self):
+        """Cancela todos los reintentos pendientes"""
+        for reintento in self.listar():
+            self._terminar(reintento, 'cancelado')
+    
+    def listar(self):
+        """Reintentos pendientes ordenados por próximo intento"""
+        with self.condicion:
+            return sorted(self.pendientes.values(), key=lambda r: r['proximo'])
+    
+    def detener(self):
+        """Detiene el hilo; los reintentos pendientes se pierden"""
+        with self.condicion:
+            self.activo = False
+            self.condicion.notify()
@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+Motor asíncrono del servidor de avisos - Todas las conexiones en un solo hilo con asyncio
+"""
+
+import asyncio
+import queue
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from protocolo import (
+    PUERTO_DEFECTO, MAX_TAMANO_TRAMA, GRUPO_MULTICAST_DEFECTO, PUERTO_MULTICAST_DEFECTO, MAX_DATAGRAMA,
+    PUERTO_LATIDOS_DEFECTO,
+    ErrorProtocolo, es_trama, codificar, codificar_respuesta, decodificar_datagrama,
+    leer_inicio_async, completar_mensaje_async, descartar_trama_async
+)
+
+BACKLOG_DEFECTO = 128
+TIMEOUT_LECTURA = 10
+TIMEOUT_SESION = 60
+TRABAJADORES_DEFECTO = 4
+MAX_PENDIENTES_DEFECTO = 256
+DEDUP_CAPACIDAD_DEFECTO = 10000
+DEDUP_TTL_DEFECTO = 600
+LIMITE_TASA_DEFECTO = 10
+LIMITE_RAFAGA_DEFECTO = 30
+LIMITE_ORIGENES_DEFECTO = 4096
+INTERVALO_LATIDO_DEFECTO = 10
+VERSION_RECEPTOR = '1.0'
+
+# Claves de la sección 'servidor' de la configuración que acepta el constructor
+OPCIONES_CONFIGURABLES = (
+    'backlog', 'max_tamano_trama', 'timeout_sesion', 'trabajadores', 'max_pendientes',
+    'dedup_capacidad', 'dedup_ttl', 'limite_tasa', 'limite_rafaga', 'limite_origenes',
+    'multicast', 'grupo_multicast', 'puerto_multicast', 'interfaz_multicast', 'latidos', 'intervalo_latido'
+)
+
+
+class CacheIdsVistos:
+    """Ids de mensajes vistos recientemente, acotados por cantidad (LRU) y antigüedad (TTL).
+    
+    Sólo se usa desde el hilo del loop, por lo que no necesita bloqueos.
+    """
+    
+    def __init__(self, capacidad=DEDUP_CAPACIDAD_DEFECTO, ttl=DEDUP_TTL_DEFECTO):
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self.ids = OrderedDict()
+    
+    def _purgar(self, ahora):
+        """Descarta los ids más antiguos que el TTL (están al principio)"""
+        while self.ids:
+            if ahora - next(iter(self.ids.values())) <= self.ttl:
+                break
+            self.ids.popitem(last=False)
+    
+    def contiene(self, id_mensaje):
+        """Indica si el id se vio dentro del TTL"""
+        self._purgar(time.monotonic())
+        return id_mensaje in self.ids
+    
+    def registrar(self, id_mensaje):
+        """Registra el id como visto ahora, desalojando el más antiguo si hace falta"""
+        ahora = time.monotonic()
+        self.ids[id_mensaje] = ahora
+        self.ids.move_to_end(id_mensaje)
+        while len(self.ids) > self.capacidad:
+            self.ids.popitem(last=False)
+    
+    def __len__(self):
+        return len(self.ids)
+
+
+class LimitadorPorOrigen:
+    """Cubeta de fichas por dirección de origen: tasa mensajes/s con ráfagas de hasta rafaga.
+    
+    Una cubeta inactiva el tiempo suficiente para llenarse equivale a una nueva,
+    así que se descarta; además nunca se guardan más de max_origenes cubetas.
+    Con tasa 0 el límite queda desactivado. Sólo se usa desde el hilo del loop.
+    """
+    
+    def __init__(self, tasa=LIMITE_TASA_DEFECTO, rafaga=LIMITE_RAFAGA_DEFECTO,
+                 max_origenes=LIMITE_ORIGENES_DEFECTO):
+        self.tasa = tasa
+        self.rafaga = max(1, rafaga)
+        self.max_origenes = max_origenes
+        self.cubetas = OrderedDict()  # ip -> [fichas, último uso]
+    
+    def permitir(self, ip):
+        """Consume una ficha del origen; devuelve False si agotó su cupo"""
+        if not self.tasa:
+            return True
+        ahora = time.monotonic()
+        self._purgar(ahora)
+        
+        cubeta = self.cubetas.pop(ip, None)
+        if cubeta is None:
+            cubeta = [self.rafaga, ahora]
+        else:
+            cubeta[0] = min(self.rafaga, cubeta[0] + (ahora - cubeta[1]) * self.tasa)
+            cubeta[1] = ahora
+        self.cubetas[ip] = cubeta  # Al final: las más inactivas quedan al principio
+        
+        while len(self.cubetas) > self.max_origenes:
+            self.cubetas.popitem(last=False)
+        
+        if cubeta[0] < 1:
+            return False
+        cubeta[0] -= 1
+        return True
+    
+    def _purgar(self, ahora):
+        """Descarta las cubetas que ya se habrían vuelto a llenar"""
+        tiempo_llenado = self.rafaga / self.tasa
+        while self.cubetas:
+            if ahora - next(iter(self.cubetas.values()))[1] < tiempo_llenado:
+                break
+            self.cubetas.popitem(last=False)
+    
+    def __len__(self):
+        return len(self.cubetas)
+
+
+class _ProtocoloMulticast(asyncio.DatagramProtocol):
+    """Recibe los datagramas del grupo multicast y los pasa al servidor"""
+    
+    def __init__(self, servidor):
+        self.servidor = servidor
+        self.transport = None
+    
+    def connection_made(self, transport):
+        self.transport = transport
+    
+    def datagram_received(self, datos, direccion):
+        respuesta = self.servidor._atender_datagrama(datos, direccion)
+        if respuesta is not None:
+            self.transport.sendto(codificar(respuesta), direccion)
+
+
+class ServidorAvisosAsync:
+    """Servidor de avisos que atiende miles de conexiones desde un loop asyncio en su propio hilo.
+    
+    Los avisos aceptados pasan por una cola acotada a un grupo fijo de hilos
+    trabajadores; si la cola está llena el emisor recibe {"status": "busy"}.
+    Los trabajadores entregan los avisos, y el servidor sus mensajes de log, al
+    hilo de la interfaz a través de una única cola de eventos:
+    ('aviso', aviso, direccion, leido) o ('log', texto), donde leido es el
+    time.perf_counter() del momento en que se leyó el aviso del socket.
+    
+    Sin interfaz gráfica se puede pasar un sumidero, sumidero(aviso, direccion),
+    que los trabajadores llaman en lugar de encolar el aviso.
+    
+    Cada origen tiene un cupo de mensajes (LimitadorPorOrigen) que se comprueba
+    antes de decodificar el mensaje; al agotarlo recibe {"status": "rate_limited"}.
+    
+    Los mensajes de control ('ping', 'status') se responden desde el propio loop
+    a través de la tabla manejadores, sin pasar por los trabajadores ni la interfaz.
+    
+    Con multicast activo (desactivado por defecto, como en los emisores)
+    también escucha avisos enviados al grupo multicast y confirma cada uno por
+    unicast al emisor. Se une al grupo en una sola interfaz: la de
+    interfaz_multicast (IP local) o, por defecto, la que elige el sistema.
+    
+    Si se indican consolas en latidos ('ip' o 'ip:puerto'), cada intervalo_latido
+    segundos les envía un datagrama con su nombre, IP, versión y cola pendiente.
+    """
+    
+    def __init__(self, puerto=PUERTO_DEFECTO, host='0.0.0.0', cola_eventos=None, backlog=BACKLOG_DEFECTO,
+                 max_tamano_trama=MAX_TAMANO_TRAMA, timeout_sesion=TIMEOUT_SESION,
+                 trabajadores=TRABAJADORES_DEFECTO, max_pendientes=MAX_PENDIENTES_DEFECTO,
+                 sumidero=None, dedup_capacidad=DEDUP_CAPACIDAD_DEFECTO, dedup_ttl=DEDUP_TTL_DEFECTO,
+                 limite_tasa=LIMITE_TASA_DEFECTO, limite_rafaga=LIMITE_RAFAGA_DEFECTO,
+                 limite_origenes=LIMITE_ORIGENES_DEFECTO, multicast=False,
+                 grupo_multicast=GRUPO_MULTICAST_DEFECTO, puerto_multicast=PUERTO_MULTICAST_DEFECTO,
+                 interfaz_multicast='0.0.0.0',
+                 latidos=(), intervalo_latido=INTERVALO_LATIDO_DEFECTO):
+        self.puerto = puerto
+        self.host = host
+        self.backlog = backlog
+        self.max_tamano_trama = max_tamano_trama
+        self.timeout_sesion = timeout_sesion
+        self.cola_eventos = cola_eventos if cola_eventos is not None else queue.Queue()
+        self.sumidero = sumidero
+        self.ids_vistos = CacheIdsVistos(dedup_capacidad, dedup_ttl)
+        self.limitador = LimitadorPorOrigen(limite_tasa, limite_rafaga, limite_origenes)
+        self.multicast = multicast
+        self.grupo_multicast = grupo_multicast
+        self.puerto_multicast = puerto_multicast
+        self.interfaz_multicast = interfaz_multicast
+        self.transporte_multicast = None
+        self.latidos = list(latidos or ())
+        self.intervalo_latido = intervalo_latido
+        self.sockets_latido = []
+        self.proximo_latido = None
+        self.manejadores = {
+            'ping': self._responder_ping,
+            'status': self._responder_status,
+        }
+        self.num_trabajadores = max(1, trabajadores)
+        self.cola_trabajo = queue.Queue(maxsize=max_pendientes)
+        self.hilos_trabajo = []
+        self.loop = None
+        self.servidor = None
+        self.hilo = None
+        self.activo = False
+        self.conexiones = set()
+        self.estadisticas = {
+            'conexiones': 0,
+            'conexiones_activas': 0,
+            'avisos': 0,
+            'sesiones': 0,
+            'rechazados': 0,
+            'duplicados': 0,
+            'limitados': 0,
+            'controles': 0,
+            'multicast': 0,
+            'latidos': 0,
+            'errores': 0,
+            'iniciado': None
+        }
+    
+    @classmethod
+    def desde_configuracion(cls, config, **kwargs):
+        """Crea el servidor con las opciones de la sección 'servidor' de la configuración"""
+        opciones = {clave: config[clave] for clave in OPCIONES_CONFIGURABLES if clave in config}
+        opciones.update(kwargs)
+        return cls(**opciones)
+    
+    def iniciar(self):
+        """Abre el puerto y arranca el loop de eventos en un hilo aparte"""
+        # El socket se crea aquí para que los errores de bind lleguen a quien llama
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, self.puerto))
+            sock.listen(self.backlog)
+            sock.setblocking(False)
+        except Exception:
+            sock.close()
+            raise
+        
+        self._abrir_sockets_latido()
+        listo = threading.Event()
+        errores = []
+        
+        def ejecutar_loop():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.servidor = self.loop.run_until_complete(
+                    asyncio.start_server(self._manejar_cliente, sock=sock)
+                )
+            except Exception as e:
+                errores.append(e)
+                sock.close()
+                listo.set()
+                self.loop.close()
+                return
+            
+            if self.multicast:
+                self.loop.run_until_complete(self._escuchar_multicast())
+            if self.sockets_latido:
+                self.loop.call_soon(self._enviar_latidos)
+            
+            listo.set()
+            try:
+                self.loop.run_forever()
+            finally:
+                if self.proximo_latido:
+                    self.proximo_latido.cancel()
+                self.servidor.close()
+                if self.transporte_multicast:
+                    self.transporte_multicast.close()
+                # Cortar las conexiones abiertas hace que sus manejadores terminen solos
+                for writer in list(self.conexiones):
+                    writer.transport.abort()
+                pendientes = asyncio.all_tasks(self.loop)
+                if pendientes:
+                    self.loop.run_until_complete(asyncio.wait(pendientes, timeout=2))
+                for tarea in asyncio.all_tasks(self.loop):
+                    tarea.cancel()
+                self.loop.close()
+        
+        self.hilo = threading.Thread(target=ejecutar_loop, name='servidor-avisos-async', daemon=True)
+        self.hilo.start()
+        listo.wait()
+        
+        if errores:
+            for sock_latido, _ in self.sockets_latido:
+                sock_latido.close()
+            self.sockets_latido = []
+            raise errores[0]
+        
+        self.hilos_trabajo = [
+            threading.Thread(target=self._trabajador, name=f'trabajador-avisos-{i}', daemon=True)
+            for i in range(self.num_trabajadores)
+        ]
+        for hilo in self.hilos_trabajo:
+            hilo.start()
+        
+        self.activo = True
+        self.estadisticas['iniciado'] = datetime.now().isoformat()
+        self.log(f"🚀 Servidor asíncrono escuchando en {self.host}:{self.puerto}")
+    
+    def detener(self):
+        """Detiene el loop y cierra todas las conexiones"""
+        if not self.activo:
+            return
+        self.activo = False
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.hilo:
+            self.hilo.join(timeout=5)
+        
+        # Los trabajadores terminan lo pendiente y salen al recibir None
+        for _ in self.hilos_trabajo:
+            self.cola_trabajo.put(None)
+        for hilo in self.hilos_trabajo:
+            hilo.join(timeout=5)
+        self.hilos_trabajo = []
+        for sock, _ in self.sockets_latido:
+            sock.close()
+        self.sockets_latido = []
+    
+    def obtener_estadisticas(self):
+        """Devuelve una copia de las estadísticas con la profundidad actual de la cola"""
+        estadisticas = dict(self.estadisticas)
+        estadisticas['cola_pendientes'] = self.cola_trabajo.qsize()
+        estadisticas['max_pendientes'] = self.cola_trabajo.maxsize
+        estadisticas['trabajadores'] = self.num_trabajadores
+        estadisticas['ids_en_cache'] = len(self.ids_vistos)
+        estadisticas['origenes_limitador'] = len(self.limitador)
+        return estadisticas
+    
+    def _crear_socket_multicast(self):
+        """Socket UDP unido al grupo multicast en interfaz_multicast ('0.0.0.0': la que elija el sistema)"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(('', self.puerto_multicast))
+            grupo = struct.pack('4s4s', socket.inet_aton(self.grupo_multicast),
+                                socket.inet_aton(self.interfaz_multicast))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, grupo)
+            sock.setblocking(False)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+    
+    async def _escuchar_multicast(self):
+        """Abre el canal multicast; si la red no lo permite el servidor sigue sólo con TCP"""
+        try:
+            sock = self._crear_socket_multicast()
+            self.transporte_multicast, _ = await self.loop.create_datagram_endpoint(
+                lambda: _ProtocoloMulticast(self), sock=sock
+            )
+        except OSError as e:
+            self.log(f"⚠️ Multicast no disponible ({self.grupo_multicast}:{self.puerto_multicast}): {e}")
+            return
+        self.log(f"📡 Escuchando avisos multicast en {self.grupo_multicast}:{self.puerto_multicast}")
+    
+    def _atender_datagrama(self, datos, direccion):
+        """Procesa un aviso recibido por multicast y devuelve la confirmación unicast"""
+        if not self.limitador.permitir(direccion[0]):
+            self.estadisticas['limitados'] += 1
+            return {"status": "rate_limited", "mensaje": "Demasiados mensajes, reintenta más tarde"}
+        
+        try:
+            mensaje = decodificar_datagrama(datos, MAX_DATAGRAMA)
+        except ErrorProtocolo as e:
+            self.estadisticas['errores'] += 1
+            self.log(f"❌ Datagrama inválido de {direccion[0]}: {e}")
+            return None
+        
+        self.estadisticas['multicast'] += 1
+        respuesta = self._procesar_mensaje(mensaje, direccion, time.perf_counter())
+        if 'id' in mensaje:
+            respuesta['id'] = mensaje['id']
+        return respuesta
+    
+    def _abrir_sockets_latido(self):
+        """Un socket UDP conectado por consola; así se conoce la IP local de la ruta hacia ella"""
+        for destino in self.latidos:
+            host, _, puerto = str(destino).partition(':')
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                sock.connect((host, int(puerto or PUERTO_LATIDOS_DEFECTO)))
+                sock.setblocking(False)
+            except (OSError, ValueError) as e:
+                sock.close()
+                self.log(f"⚠️ Consola de latidos inválida {destino}: {e}")
+                continue
+            self.sockets_latido.append((sock, destino))
+    
+    def _enviar_latidos(self):
+        """Envía un latido a cada consola y programa el siguiente; corre en el loop"""
+        latido = {
+            'tipo': 'latido',
+            'hostname': socket.gethostname(),
+            'puerto': self.puerto,
+            'version': VERSION_RECEPTOR,
+            'cola_pendientes': self.cola_trabajo.qsize(),
+            'max_pendientes': self.cola_trabajo.maxsize,
+            'intervalo': self.intervalo_latido
+        }
+        for sock, destino in self.sockets_latido:
+            latido['ip'] = sock.getsockname()[0]
+            try:
+                sock.send(codificar(latido))
+                self.estadisticas['latidos'] += 1
+            except OSError:
+                pass  # Consola inalcanzable por ahora; el próximo latido lo vuelve a intentar
+        self.proximo_latido = self.loop.call_later(self.intervalo_latido, self._enviar_latidos)
+    
+    def log(self, texto):
+        """Envía un mensaje de log al hilo de la interfaz"""
+        self.cola_eventos.put(('log', texto))
+    
+    def _trabajador(self):
+        """Hilo del grupo fijo: saca avisos de la cola acotada y los entrega"""
+        while True:
+            tarea = self.cola_trabajo.get()
+            if tarea is None:
+                break
+            aviso, direccion, leido = tarea
+            try:
+                self._entregar(aviso, direccion, leido)
+            except Exception as e:
+                self.estadisticas['errores'] += 1
+                self.log(f"❌ Error entregando aviso de {direccion[0]}: {e}")
+    
+    def _entregar(self, aviso, direccion, leido):
+        """Entrega un aviso aceptado al sumidero o al hilo de la interfaz"""
+        if self.sumidero:
+            self.sumidero(aviso, direccion)
+        else:
+            self.cola_eventos.put(('aviso', aviso, direccion, leido))
+    
+    def _procesar_mensaje(self, mensaje, direccion, leido):
+        """Atiende el mensaje según su tipo; todo lo que no es de control es un aviso"""
+        manejador = self.manejadores.get(mensaje.get('tipo'), self._aceptar_aviso)
+        return manejador(mensaje, direccion, leido)
+    
+    def _responder_ping(self, mensaje, direccion, leido):
+        """Responde al ping con el nombre de la PC, la hora del receptor y la profundidad de su cola"""
+        self.estadisticas['controles'] += 1
+        return {
+            "status": "ok",
+            "tipo": "pong",
+            "hostname": socket.gethostname(),
+            "version": VERSION_RECEPTOR,
+            "hora": datetime.now().isoformat(),
+            "cola_pendientes": self.cola_trabajo.qsize(),
+            "max_pendientes": self.cola_trabajo.maxsize
+        }
+    
+    def _responder_status(self, mensaje, direccion, leido):
+        """Responde con las estadísticas actuales del receptor"""
+        self.estadisticas['controles'] += 1
+        return {"status": "ok", "tipo": "status", "estadisticas": self.obtener_estadisticas()}
+    
+    def _aceptar_aviso(self, aviso, direccion, leido):
+        """Encola el aviso para los trabajadores y devuelve la confirmación para el emisor"""
+        # Un reintento de un aviso ya aceptado se confirma sin volver a mostrarlo
+        id_mensaje = aviso.get('id')
+        if id_mensaje and self.ids_vistos.contiene(id_mensaje):
+            self.estadisticas['duplicados'] += 1
+            return {"status": "ok", "mensaje": "Aviso ya recibido", "duplicado": True}
+        
+        try:
+            self.cola_trabajo.put_nowait((aviso, direccion, leido))
+        except queue.Full:
+            self.estadisticas['rechazados'] += 1
+            return {"status": "busy", "mensaje": "Receptor ocupado, reintenta más tarde"}
+        
+        if id_mensaje:
+            self.ids_vistos.registrar(id_mensaje)
+        self.estadisticas['avisos'] += 1
+        return {"status": "ok", "mensaje": "Aviso recibido"}
+    
+    async def _manejar_cliente(self, reader, writer):
+        """Atiende una conexión: lee avisos, los encola y confirma cada uno.
+        
+        Las conexiones con tramas quedan abiertas como sesión hasta que el emisor
+        cierre o pasen timeout_sesion segundos sin mensajes; las legacy se cierran
+        tras la primera respuesta.
+        """
+        direccion = writer.get_extra_info('peername') or ('desconocido', 0)
+        self.estadisticas['conexiones'] += 1
+        self.estadisticas['conexiones_activas'] += 1
+        self.conexiones.add(writer)
+        mensajes = 0
+        enmarcado = True
+        
+        try:
+            while True:
+                try:
+                    primeros = await asyncio.wait_for(
+                        leer_inicio_async(reader),
+                        TIMEOUT_LECTURA if mensajes == 0 else self.timeout_sesion
+                    )
+                except asyncio.TimeoutError:
+                    if mensajes == 0:
+                        raise
+                    break  # Sesión inactiva: se cierra sin error
+                
+                if not primeros:
+                    break
+                enmarcado = es_trama(primeros)
+                mensajes += 1
+                
+                # El cupo del origen se comprueba antes de decodificar nada
+                if not self.limitador.permitir(direccion[0]):
+                    self.estadisticas['limitados'] += 1
+                    if enmarcado:
+                        await asyncio.wait_for(
+                            descartar_trama_async(reader, primeros, self.max_tamano_trama), TIMEOUT_LECTURA
+                        )
+                    respuesta = {"status": "rate_limited", "mensaje": "Demasiados mensajes, reintenta más tarde"}
+                    writer.write(codificar_respuesta(respuesta, enmarcado))
+                    await writer.drain()
+                    if not enmarcado or not self.timeout_sesion:
+                        break
+                    continue
+                
+                aviso = await asyncio.wait_for(
+                    completar_mensaje_async(reader, primeros, self.max_tamano_trama), TIMEOUT_LECTURA
+                )
+                leido = time.perf_counter()
+                
+                # Confirmar recepción en el mismo formato que usó el emisor
+                respuesta = self._procesar_mensaje(aviso, direccion, leido)
+                if 'id' in aviso:
+                    respuesta['id'] = aviso['id']
+                writer.write(codificar_respuesta(respuesta, enmarcado))
+                await writer.drain()
+                
+                if not enmarcado or not self.timeout_sesion:
+                    break
+            
+            if mensajes > 1:
+                self.estadisticas['sesiones'] += 1
+        
+        except ErrorProtocolo as e:
+            self.estadisticas['errores'] += 1
+            self.log(f"❌ Trama inválida de {direccion[0]}: {e}")
+            writer.write(codificar_respuesta({"status": "error", "mensaje": str(e)}, enmarcado))
+        except asyncio.TimeoutError:
+            self.estadisticas['errores'] += 1
+            self.log(f"⏰ Timeout esperando datos de {direccion[0]}")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # El emisor cerró la conexión a mitad de un mensaje
+        except Exception as e:
+            self.estadisticas['errores'] += 1
+            self.log(f"❌ Error manejando cliente {direccion}: {e}")
+        finally:
+            self.estadisticas['conexiones_activas'] -= 1
+            self.conexiones.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
@@ -11,6 +11,27 @@ from datetime import datetime
 import threading
 import os
 import hashlib
+import queue
+import time
+import functools
+from servidor_async import ServidorAvisosAsync
+from cliente_avisos import GestorSesiones, MAX_POR_HOST_DEFECTO, INACTIVIDAD_MAXIMA
+from registro_entregas import RegistroEntregas
+from historial_rtt import HistorialRTT, MUESTRAS_RTT_DEFECTO
+from estado_pcs import (CacheEstadoPCs, verificar_pcs, DESCONOCIDO, TTL_ONLINE_DEFECTO, TTL_OFFLINE_DEFECTO,
+                        TIMEOUT_SONDEO_DEFECTO, CONCURRENCIA_VERIFICACION_DEFECTO, TIMEOUT_VERIFICACION_DEFECTO,
+                        PLAZO_VERIFICACION_DEFECTO)
+from envio_masivo import (enviar_masivo, ips_de_destino, clasificar_error, clasificar_respuesta,
+                          CONCURRENCIA_DEFECTO, TIMEOUT_HOST_DEFECTO, TIMEOUT_GLOBAL_DEFECTO)
+from protocolo import nuevo_id, GRUPO_MULTICAST_DEFECTO, PUERTO_MULTICAST_DEFECTO, PUERTO_LATIDOS_DEFECTO
+from pantalla_avisos import ColaAvisosPantalla, TiemposPantalla
+from programador_avisos import ProgramadorAvisos, interpretar_fecha, DESTINO_TODAS
+from despacho_avisos import ColaDespacho, prioridad_de_envio
+from presencia_pcs import ReceptorLatidos
+from descubrimiento_pcs import DescubridorPCs, red_local
+from monitor_pcs import MonitorPCs, INTERVALO_MINIMO_DEFECTO, INTERVALO_MAXIMO_DEFECTO, SONDEOS_POR_SEGUNDO_DEFECTO
+from reintentos_avisos import (GestorReintentos, PoliticaReintentos, ESPERA_BASE_DEFECTO, ESPERA_MAXIMA_DEFECTO,
+                               MAX_INTENTOS_DEFECTO, EDAD_MAXIMA_DEFECTO)
 
 class SistemaAvisosConLogin:
     def __init__(self):
@@ -18,13 +39,66 @@ class SistemaAvisosConLogin:
         self.usuario_actual = None
         self.rol_actual = None
         self.servidor_activo = False
-        self.socket_servidor = None
-        self.hilo_servidor = None
+        self.servidor_async = None
+        self.cola_eventos = queue.Queue()
         self.computadoras = []
+        self.grupos = {}
         self.ips_guardadas = []
         self.usuarios = {}
+        self.config_servidor = {}
+        self.config_envio = {}
+        self.cola_pantalla = ColaAvisosPantalla()
+        self.ventana_aviso = None
+        self.ventana_aviso_visible = False
+        self.tiempos_pantalla = TiemposPantalla()
+        self.aviso_en_pantalla = None
+        self.id_cierre_aviso = None
+        self.refresco_aviso_pendiente = False
         
         self.cargar_configuracion()
+        self.sesiones = GestorSesiones(
+            activo=self.config_envio.get('sesiones_persistentes', False),
+            max_por_host=self.config_envio.get('pool_max_por_host', MAX_POR_HOST_DEFECTO),
+            inactividad=self.config_envio.get('pool_inactividad', INACTIVIDAD_MAXIMA)
+        )
+        self.estados = CacheEstadoPCs(
+            ttl_online=self.config_envio.get('ttl_online', TTL_ONLINE_DEFECTO),
+            ttl_offline=self.config_envio.get('ttl_offline', TTL_OFFLINE_DEFECTO)
+        )
+        self.historial_rtt = HistorialRTT(self.config_envio.get('muestras_rtt', MUESTRAS_RTT_DEFECTO))
+        self.entregas = RegistroEntregas(estados=self.estados, historial=self.historial_rtt)
+        # Todos los envíos salientes comparten la cola de despacho por prioridad
+        self.despacho = ColaDespacho(self.config_envio.get('concurrencia', CONCURRENCIA_DEFECTO))
+        self.reintentos = GestorReintentos(
+            functools.partial(self.entregas.enviar, self.sesiones),
+            self.despacho,
+            PoliticaReintentos(
+                base=self.config_envio.get('reintento_base', ESPERA_BASE_DEFECTO),
+                maximo=self.config_envio.get('reintento_maximo', ESPERA_MAXIMA_DEFECTO),
+                max_intentos=self.config_envio.get('reintento_intentos', MAX_INTENTOS_DEFECTO),
+                edad_maxima=self.config_envio.get('reintento_edad_maxima', EDAD_MAXIMA_DEFECTO)
+            ),
+            al_cambiar=self.al_terminar_reintento
+        )
+        self.programador = ProgramadorAvisos(self.al_vencer_programacion, log=self.log_desde_hilo)
+        self.latidos = ReceptorLatidos(
+            self.al_cambiar_presencia,
+            puerto=self.config_envio.get('puerto_latidos', PUERTO_LATIDOS_DEFECTO),
+            estados=self.estados,
+            log=self.log_desde_hilo
+        )
+        self.descubridor = DescubridorPCs()
+        self.monitor = MonitorPCs(
+            self.al_cambiar_estado_pc,
+            estados=self.estados,
+            omitir=self.latidos.tabla.presente,
+            historial=self.historial_rtt,
+            log=self.log_desde_hilo,
+            intervalo_minimo=self.config_envio.get('monitor_intervalo_minimo', INTERVALO_MINIMO_DEFECTO),
+            intervalo_maximo=self.config_envio.get('monitor_intervalo_maximo', INTERVALO_MAXIMO_DEFECTO),
+            sondeos_por_segundo=self.config_envio.get('monitor_sondeos_por_segundo', SONDEOS_POR_SEGUNDO_DEFECTO),
+            timeout=self.config_envio.get('timeout_verificacion', TIMEOUT_VERIFICACION_DEFECTO)
+        )
         self.crear_usuarios_default()
         self.mostrar_login()
         
@@ -36,7 +110,10 @@ class SistemaAvisosConLogin:
                     config = json.load(f)
                     self.ips_guardadas = config.get('ips_guardadas', [])
                     self.computadoras = config.get('computadoras', [])
+                    self.grupos = config.get('grupos', {})
                     self.usuarios = config.get('usuarios', {})
+                    self.config_servidor = config.get('servidor', {})
+                    self.config_envio = config.get('envio', {})
         except:
             self.ips_guardadas = []
             self.computadoras = []
@@ -48,7 +125,10 @@ class SistemaAvisosConLogin:
             config = {
                 'ips_guardadas': self.ips_guardadas,
                 'computadoras': self.computadoras,
-                'usuarios': self.usuarios
+                'grupos': self.grupos,
+                'usuarios': self.usuarios,
+                'servidor': self.config_servidor,
+                'envio': self.config_envio
             }
             with open('config_login.json', 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=2, ensure_ascii=False)
@@ -259,6 +339,22 @@ class SistemaAvisosConLogin:
         else:
             self.crear_pestañas_cliente()
         
+        # La ventana de avisos se construye una vez y queda oculta hasta el primer aviso
+        self.crear_ventana_aviso()
+        
+        # Eventos del servidor (avisos y logs) hacia la GUI
+        self.procesar_cola_eventos()
+        self.guardar_entregas()
+        
+        # Los avisos programados sólo se envían con una sesión de administrador abierta
+        if self.rol_actual == 'admin':
+            for programacion in self.programador.descartadas:
+                self.agregar_log_servidor(f"⚠️ Aviso programado vencido con la aplicación cerrada: {programacion['mensaje']}")
+            self.programador.iniciar()
+            if self.config_envio.get('monitor', True):
+                self.monitor.iniciar()
+            self.escuchar_latidos()
+        
         # Ejecutar
         self.ventana.protocol("WM_DELETE_WINDOW", self.al_cerrar)
         self.ventana.mainloop()
@@ -306,6 +402,9 @@ class SistemaAvisosConLogin:
         # Pestaña Gestión de IPs
         self.crear_pestaña_gestion_ips()
         
+        # Pestaña Avisos Programados
+        self.crear_pestaña_programados()
+        
         # Pestaña Gestión de Usuarios
         self.crear_pestaña_gestion_usuarios()
         
@@ -617,7 +716,7 @@ class SistemaAvisosConLogin:
         
         self.tree_computadoras = ttk.Treeview(
             tree_frame,
-            columns=('nombre', 'ip', 'estado'),
+            columns=('nombre', 'ip', 'estado', 'rtt', 'rtt_min', 'rtt_prom', 'rtt_p95', 'tendencia'),
             show='headings',
             height=12
         )
@@ -625,10 +724,18 @@ class SistemaAvisosConLogin:
         self.tree_computadoras.heading('nombre', text='💻 Nombre')
         self.tree_computadoras.heading('ip', text='🌐 IP')
         self.tree_computadoras.heading('estado', text='📡 Estado')
+        self.tree_computadoras.heading('rtt', text='⏱️ RTT ms')
+        self.tree_computadoras.heading('rtt_min', text='Mín')
+        self.tree_computadoras.heading('rtt_prom', text='Prom')
+        self.tree_computadoras.heading('rtt_p95', text='p95')
+        self.tree_computadoras.heading('tendencia', text='📈 Tendencia')
         
         self.tree_computadoras.column('nombre', width=200)
         self.tree_computadoras.column('ip', width=150)
         self.tree_computadoras.column('estado', width=100)
+        for columna in ('rtt', 'rtt_min', 'rtt_prom', 'rtt_p95'):
+            self.tree_computadoras.column(columna, width=70, anchor='e')
+        self.tree_computadoras.column('tendencia', width=140)
         
         # Scrollbar
         scrollbar_tree = tk.Scrollbar(tree_frame, orient='vertical', command=self.tree_computadoras.yview)
@@ -636,6 +743,7 @@ class SistemaAvisosConLogin:
         
         self.tree_computadoras.pack(side='left', fill='both', expand=True)
         scrollbar_tree.pack(side='right', fill='y')
+        self.actualizar_columnas_rtt()
         
         # Botones de gestión
         botones_frame = tk.Frame(lista_frame, bg='#263238')
@@ -674,9 +782,445 @@ class SistemaAvisosConLogin:
             pady=5
         ).pack(side='left', padx=5)
         
+        tk.Button(
+            botones_frame,
+            text="🔍 DESCUBRIR EN LA RED",
+            command=self.descubrir_pcs_dialog,
+            bg='#009688',
+            fg='white',
+            font=('Arial', 11, 'bold'),
+            padx=15,
+            pady=5
+        ).pack(side='left', padx=5)
+        
+        # Percentiles de latencia de entrega
+        self.crear_panel_latencias(frame_ips)
+        
+        # Reintentos en curso de los envíos fallidos
+        self.crear_panel_reintentos(frame_ips)
+        
         # Cargar datos iniciales
         self.actualizar_lista_computadoras()
     
+    def crear_panel_latencias(self, padre):
+        """Tabla con los percentiles de latencia de entrega por PC o por envío masivo"""
+        latencias_frame = tk.LabelFrame(
+            padre,
+            text="📈 LATENCIA DE ENTREGA",
+            font=('Arial', 14, 'bold'),
+            fg='#00bcd4',
+            bg='#263238',
+            bd=2
+        )
+        latencias_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        
+        controles = tk.Frame(latencias_frame, bg='#263238')
+        controles.pack(fill='x', padx=10, pady=(10, 5))
+        
+        self.combo_vista_latencias = ttk.Combobox(
+            controles,
+            values=["Por PC", "Por envío masivo"],
+            state='readonly',
+            width=20
+        )
+        self.combo_vista_latencias.current(0)
+        self.combo_vista_latencias.bind('<<ComboboxSelected>>', lambda e: self.actualizar_tabla_latencias())
+        self.combo_vista_latencias.pack(side='left', padx=5)
+        
+        tk.Button(
+            controles,
+            text="🔄 Actualizar",
+            command=self.actualizar_tabla_latencias,
+            bg='#2196f3',
+            fg='white',
+            font=('Arial', 10, 'bold'),
+            padx=10
+        ).pack(side='left', padx=5)
+        
+        self.tree_latencias = ttk.Treeview(
+            latencias_frame,
+            columns=('envios', 'ok', 'p50', 'p95', 'p99'),
+            show='tree headings',
+            height=6
+        )
+        self.tree_latencias.heading('#0', text='PC / Envío')
+        for columna, titulo in (('envios', 'Envíos'), ('ok', 'OK'), ('p50', 'p50 ms'),
+                                ('p95', 'p95 ms'), ('p99', 'p99 ms')):
+            self.tree_latencias.heading(columna, text=titulo)
+            self.tree_latencias.column(columna, width=60, anchor='center')
+        self.tree_latencias.column('#0', width=180)
+        self.tree_latencias.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        
+        self.actualizar_tabla_latencias()
+    
+    def actualizar_tabla_latencias(self):
+        """Recalcula los percentiles a partir del registro de entregas"""
+        self.tree_latencias.delete(*self.tree_latencias.get_children())
+        
+        if self.combo_vista_latencias.current() == 0:
+            nombres = {pc['ip']: pc['nombre'] for pc in self.computadoras}
+            filas = [
+                (f"{nombres.get(ip, ip)} ({ip})" if ip in nombres else ip, resumen)
+                for ip, resumen in sorted(self.entregas.latencias_por_pc().items())
+            ]
+        else:
+            filas = [
+                (f"{datetime.fromtimestamp(d['encolado']).strftime('%d/%m %H:%M:%S')} - {d['mensaje'][:30]}", d)
+                for d in self.entregas.latencias_por_difusion()
+            ]
+        
+        for etiqueta, resumen in filas:
+            self.tree_latencias.insert('', 'end', text=etiqueta, values=(
+                resumen['envios'], resumen['ok'],
+                *('-' if resumen[p] is None else f"{resumen[p]:.0f}" for p in ('p50', 'p95', 'p99'))
+            ))
+    
+    def crear_panel_reintentos(self, padre):
+        """Tabla de reintentos pendientes con opción de cancelarlos"""
+        reintentos_frame = tk.LabelFrame(
+            padre,
+            text="🔁 REINTENTOS EN CURSO",
+            font=('Arial', 14, 'bold'),
+            fg='#00bcd4',
+            bg='#263238',
+            bd=2
+        )
+        reintentos_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        
+        controles = tk.Frame(reintentos_frame, bg='#263238')
+        controles.pack(fill='x', padx=10, pady=(10, 5))
+        
+        tk.Button(
+            controles,
+            text="❌ CANCELAR REINTENTO",
+            command=self.cancelar_reintento,
+            bg='#f44336',
+            fg='white',
+            font=('Arial', 10, 'bold'),
+            padx=10
+        ).pack(side='left', padx=5)
+        
+        tk.Button(
+            controles,
+            text="🗑️ CANCELAR TODOS",
+            command=self.cancelar_todos_reintentos,
+            bg='#795548',
+            fg='white',
+            font=('Arial', 10, 'bold'),
+            padx=10
+        ).pack(side='left', padx=5)
+        
+        self.label_reintentos = tk.Label(controles, text="", bg='#263238', fg='#81c784', font=('Arial', 10))
+        self.label_reintentos.pack(side='left', padx=10)
+        
+        self.tree_reintentos = ttk.Treeview(
+            reintentos_frame,
+            columns=('ip', 'intentos', 'proximo', 'error'),
+            show='tree headings',
+            height=5
+        )
+        self.tree_reintentos.heading('#0', text='Mensaje')
+        for columna, titulo, ancho in (('ip', 'IP', 120), ('intentos', 'Intentos', 70),
+                                       ('proximo', 'Próximo', 80), ('error', 'Último error', 100)):
+            self.tree_reintentos.heading(columna, text=titulo)
+            self.tree_reintentos.column(columna, width=ancho, anchor='center')
+        self.tree_reintentos.column('#0', width=220)
+        self.tree_reintentos.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        
+        self.claves_reintentos = {}
+        self.actualizar_tabla_reintentos()
+    
+    def actualizar_tabla_reintentos(self):
+        """Refresca cada segundo los reintentos pendientes conservando la selección"""
+        seleccion = self.tree_reintentos.selection()
+        self.tree_reintentos.delete(*self.tree_reintentos.get_children())
+        self.claves_reintentos = {}
+        ahora = time.monotonic()
+        for reintento in self.reintentos.listar():
+            iid = f"{reintento['clave'][0]}@{reintento['ip']}"
+            self.claves_reintentos[iid] = reintento['clave']
+            self.tree_reintentos.insert('', 'end', iid=iid, text=reintento['aviso']['mensaje'][:50], values=(
+                reintento['ip'],
+                reintento['intentos'],
+                f"{max(0, reintento['proximo'] - ahora):.0f} s",
+                reintento['ultimo_error']
+            ))
+        self.tree_reintentos.selection_set([iid for iid in seleccion if iid in self.claves_reintentos])
+        
+        stats = self.reintentos.estadisticas
+        self.label_reintentos.config(
+            text=f"Entregados: {stats['entregados']} | Abandonados: {stats['abandonados']}"
+        )
+        self.ventana.after(1000, self.actualizar_tabla_reintentos)
+    
+    def cancelar_reintento(self):
+        """Cancela los reintentos seleccionados"""
+        seleccion = self.tree_reintentos.selection()
+        if not seleccion:
+            messagebox.showerror("Error", "Selecciona un reintento")
+            return
+        for iid in seleccion:
+            self.reintentos.cancelar(self.claves_reintentos[iid])
+    
+    def cancelar_todos_reintentos(self):
+        """Cancela todos los reintentos pendientes"""
+        if self.reintentos.listar() and messagebox.askyesno("Confirmar", "¿Cancelar todos los reintentos pendientes?"):
+            self.reintentos.cancelar_todos()
+    
+    def reintentar(self, aviso, ip, error, puerto):
+        """Deja el aviso en reintento para esa PC, en el puerto del envío fallido, si el error lo admite"""
+        if self.reintentos.agregar(aviso, ip, error, puerto):
+            self.log_desde_hilo(f"🔁 Se reintentará el envío a {ip} ({error})")
+    
+    def reintentar_fallidos(self, aviso, informe):
+        """Deja en reintento las PCs que fallaron en un envío masivo, en el mismo puerto"""
+        cantidad = sum(self.reintentos.agregar(aviso, r['ip'], r['error'], informe.puerto) for r in informe.fallidos)
+        if cantidad:
+            self.log_desde_hilo(f"🔁 {cantidad} PCs quedan en reintento")
+    
+    def al_terminar_reintento(self, reintento):
+        """Llamado cuando un reintento llega, se abandona o se cancela"""
+        ip = reintento['ip']
+        if reintento['estado'] == 'entregado':
+            self.log_desde_hilo(f"✅ Aviso entregado a {ip} tras {reintento['intentos'] + 1} reintentos")
+            self.ventana.after(0, self.sincronizar_estados_pcs)
+        elif reintento['estado'] == 'abandonado':
+            self.log_desde_hilo(f"❌ Se abandonó el envío a {ip} tras {reintento['intentos']} reintentos "
+                                f"({reintento['ultimo_error']})")
+        else:
+            self.log_desde_hilo(f"🗑️ Reintento a {ip} cancelado")
+    
+    def guardar_entregas(self):
+        """Guarda periódicamente el lote pendiente del registro de entregas"""
+        self.entregas.guardar()
+        self.ventana.after(10000, self.guardar_entregas)
+    
+    def crear_pestaña_programados(self):
+        """Pestaña de avisos programados, únicos o recurrentes"""
+        frame_programados = tk.Frame(self.notebook, bg='#1e2832')
+        self.notebook.add(frame_programados, text="⏰ Programados")
+        
+        form_frame = tk.LabelFrame(
+            frame_programados,
+            text="⏰ PROGRAMAR AVISO",
+            font=('Arial', 14, 'bold'),
+            fg='#00bcd4',
+            bg='#263238',
+            bd=2
+        )
+        form_frame.pack(fill='x', padx=20, pady=20)
+        
+        form_inner = tk.Frame(form_frame, bg='#263238')
+        form_inner.pack(fill='x', padx=15, pady=15)
+        
+        etiquetas = ("💬 Mensaje:", "🎯 Destino:", "🕐 Una vez (HH:MM o AAAA-MM-DD HH:MM):",
+                     "🔁 Repetir (cron):")
+        for fila, texto in enumerate(etiquetas):
+            tk.Label(
+                form_inner,
+                text=texto,
+                font=('Arial', 11, 'bold'),
+                fg='white',
+                bg='#263238'
+            ).grid(row=fila, column=0, sticky='w', pady=5)
+        
+        self.entry_mensaje_programado = tk.Entry(
+            form_inner,
+            font=('Arial', 11),
+            bg='#37474f',
+            fg='white',
+            insertbackground='white',
+            width=50
+        )
+        self.entry_mensaje_programado.grid(row=0, column=1, columnspan=2, sticky='w', padx=10, pady=5)
+        
+        self.combo_destino_programado = ttk.Combobox(form_inner, font=('Arial', 11), width=35, state='readonly')
+        self.combo_destino_programado.grid(row=1, column=1, sticky='w', padx=10, pady=5)
+        
+        self.entry_fecha_programada = tk.Entry(
+            form_inner,
+            font=('Arial', 11),
+            bg='#37474f',
+            fg='white',
+            insertbackground='white',
+            width=20
+        )
+        self.entry_fecha_programada.grid(row=2, column=1, sticky='w', padx=10, pady=5)
+        
+        self.entry_cron_programado = tk.Entry(
+            form_inner,
+            font=('Arial', 11),
+            bg='#37474f',
+            fg='white',
+            insertbackground='white',
+            width=20
+        )
+        self.entry_cron_programado.grid(row=3, column=1, sticky='w', padx=10, pady=5)
+        
+        tk.Label(
+            form_inner,
+            text="minuto hora día mes día-semana · Ej.: 50 17 * * 1-5 = lunes a viernes a las 17:50",
+            font=('Arial', 9),
+            fg='#ffcc80',
+            bg='#263238'
+        ).grid(row=3, column=2, sticky='w')
+        
+        self.var_auto_cerrar_programado = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            form_inner,
+            text="Cerrar automáticamente",
+            variable=self.var_auto_cerrar_programado,
+            font=('Arial', 10),
+            fg='white',
+            bg='#263238',
+            selectcolor='#37474f'
+        ).grid(row=4, column=1, sticky='w', padx=10, pady=5)
+        
+        botones_frame = tk.Frame(form_frame, bg='#263238')
+        botones_frame.pack(fill='x', padx=15, pady=(0, 15))
+        
+        tk.Button(
+            botones_frame,
+            text="⏰ PROGRAMAR",
+            command=self.programar_aviso,
+            bg='#4caf50',
+            fg='white',
+            font=('Arial', 11, 'bold'),
+            padx=15,
+            pady=5
+        ).pack(side='left', padx=5)
+        
+        tk.Button(
+            botones_frame,
+            text="❌ ELIMINAR SELECCIONADO",
+            command=self.eliminar_programacion,
+            bg='#f44336',
+            fg='white',
+            font=('Arial', 11, 'bold'),
+            padx=15,
+            pady=5
+        ).pack(side='left', padx=5)
+        
+        lista_frame = tk.LabelFrame(
+            frame_programados,
+            text="📅 AVISOS PROGRAMADOS",
+            font=('Arial', 14, 'bold'),
+            fg='#00bcd4',
+            bg='#263238',
+            bd=2
+        )
+        lista_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        
+        self.tree_programados = ttk.Treeview(
+            lista_frame,
+            columns=('proxima', 'repetir', 'destino', 'mensaje'),
+            show='headings',
+            height=10
+        )
+        for columna, titulo, ancho in (('proxima', '🕐 Próximo envío', 150), ('repetir', '🔁 Repetir', 120),
+                                       ('destino', '🎯 Destino', 180), ('mensaje', '💬 Mensaje', 400)):
+            self.tree_programados.heading(columna, text=titulo)
+            self.tree_programados.column(columna, width=ancho)
+        self.tree_programados.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        self.actualizar_destinos_programados()
+        self.actualizar_tabla_programaciones()
+    
+    def actualizar_destinos_programados(self):
+        """Opciones de destino: todas las PCs, cada grupo y cada PC"""
+        self.destinos_programados = {"📢 Todas las PCs": DESTINO_TODAS}
+        grupos = set(self.grupos) | {pc['grupo'] for pc in self.computadoras if pc.get('grupo')}
+        for grupo in sorted(grupos):
+            self.destinos_programados[f"👥 Grupo: {grupo}"] = grupo
+        for pc in self.computadoras:
+            self.destinos_programados[f"💻 {pc['nombre']} ({pc['ip']})"] = [pc['ip']]
+        self.combo_destino_programado['values'] = list(self.destinos_programados)
+        if not self.combo_destino_programado.get():
+            self.combo_destino_programado.current(0)
+    
+    def describir_destino(self, destino):
+        """Texto de un destino programado para la tabla y el log"""
+        if destino == DESTINO_TODAS:
+            return "Todas las PCs"
+        if isinstance(destino, list):
+            return ', '.join(destino)
+        return f"Grupo: {destino}"
+    
+    def programar_aviso(self):
+        """Crea una programación con los datos del formulario"""
+        mensaje = self.entry_mensaje_programado.get().strip()
+        fecha = self.entry_fecha_programada.get().strip()
+        cron = self.entry_cron_programado.get().strip()
+        if not mensaje:
+            messagebox.showerror("Error", "Escribe un mensaje")
+            return
+        if bool(fecha) == bool(cron):
+            messagebox.showerror("Error", "Indica una fecha para un aviso único o una expresión cron para repetirlo")
+            return
+        
+        destino = self.destinos_programados.get(self.combo_destino_programado.get(), DESTINO_TODAS)
+        try:
+            programacion = self.programador.programar(
+                mensaje,
+                destino,
+                cuando=interpretar_fecha(fecha) if fecha else None,
+                cron=cron or None,
+                auto_cerrar=self.var_auto_cerrar_programado.get()
+            )
+        except ValueError as e:
+            messagebox.showerror("Error", f"Fecha o expresión cron inválida:\n{e}")
+            return
+        
+        self.agregar_log_servidor(f"⏰ Aviso programado para {programacion['proxima'].replace('T', ' ')}: {mensaje}")
+        self.entry_mensaje_programado.delete(0, tk.END)
+        self.entry_fecha_programada.delete(0, tk.END)
+        self.entry_cron_programado.delete(0, tk.END)
+        self.actualizar_tabla_programaciones()
+    
+    def eliminar_programacion(self):
+        """Elimina la programación seleccionada"""
+        seleccion = self.tree_programados.selection()
+        if not seleccion:
+            messagebox.showerror("Error", "Selecciona un aviso programado")
+            return
+        
+        programacion = self.programador.cancelar(seleccion[0])
+        if programacion:
+            self.agregar_log_servidor(f"🗑️ Aviso programado eliminado: {programacion['mensaje']}")
+        self.actualizar_tabla_programaciones()
+    
+    def actualizar_tabla_programaciones(self):
+        """Muestra las programaciones en orden de próximo envío"""
+        self.tree_programados.delete(*self.tree_programados.get_children())
+        for programacion in self.programador.listar():
+            self.tree_programados.insert('', 'end', iid=programacion['id'], values=(
+                programacion['proxima'].replace('T', ' ')[:16],
+                programacion['cron'] or 'Una vez',
+                self.describir_destino(programacion['destino']),
+                programacion['mensaje']
+            ))
+    
+    def al_vencer_programacion(self, programacion):
+        """Llamado por el hilo del programador: el envío sigue en un hilo aparte"""
+        threading.Thread(target=self.enviar_programado, args=(programacion,), daemon=True).start()
+        self.ventana.after(0, self.actualizar_tabla_programaciones)
+    
+    def enviar_programado(self, programacion):
+        """Envía un aviso programado a su destino y registra el informe de entrega"""
+        try:
+            ips = ips_de_destino(programacion['destino'], self.computadoras, self.grupos)
+        except ValueError as e:
+            self.log_desde_hilo(f"❌ Aviso programado sin destino: {e}")
+            return
+        
+        aviso = self.crear_aviso(programacion['mensaje'], programacion.get('auto_cerrar', False))
+        informe = enviar_masivo(aviso, ips, self.sesiones.solicitar, prioridad=prioridad_de_envio(aviso, masivo=True),
+                                **self.opciones_envio_masivo())
+        self.entregas.registrar_informe(aviso, informe)
+        self.reintentar_fallidos(aviso, informe)
+        self.ventana.after(0, self.sincronizar_estados_pcs)
+        self.log_desde_hilo(f"⏰ Aviso programado '{programacion['mensaje']}': {informe.texto_resumen()}")
+    
     def crear_pestaña_gestion_usuarios(self):
         """Pestaña para gestionar usuarios (solo admin)"""
         frame_usuarios = tk.Frame(self.notebook, bg='#1e2832')
@@ -862,6 +1406,16 @@ class SistemaAvisosConLogin:
         )
         self.label_info_servidor.pack(padx=15, pady=15)
         
+        # Métricas de la cola de trabajo del receptor
+        self.label_metricas_servidor = tk.Label(
+            info_frame,
+            text="📊 Cola: - | Rechazados: - | Conexiones activas: -",
+            font=('Arial', 11),
+            fg='#ffcc80',
+            bg='#263238'
+        )
+        self.label_metricas_servidor.pack(padx=15, pady=(0, 15))
+        
         # Log del servidor
         log_frame = tk.LabelFrame(
             frame_servidor,
@@ -944,8 +1498,8 @@ class SistemaAvisosConLogin:
         botones_grid.pack(pady=15)
         
         mensajes_admin = [
-            {"texto": "🚨 URGENTE", "color": "#f44336"},
-            {"texto": "🔥 EMERGENCIA", "color": "#d32f2f"},
+            {"texto": "🚨 URGENTE", "color": "#f44336", "urgente": True},
+            {"texto": "🔥 EMERGENCIA", "color": "#d32f2f", "urgente": True},
             {"texto": "📋 REUNIÓN", "color": "#1976d2"},
             {"texto": "☕ DESCANSO", "color": "#388e3c"},
             {"texto": "🍽️ ALMUERZO", "color": "#f57c00"},
@@ -965,7 +1519,7 @@ class SistemaAvisosConLogin:
             btn = tk.Button(
                 botones_grid,
                 text=btn_config["texto"],
-                command=lambda msg=btn_config["texto"]: self.enviar_mensaje_admin(msg),
+                command=lambda msg=btn_config["texto"], u=btn_config.get("urgente", False): self.enviar_mensaje_admin(msg, u),
                 bg=btn_config["color"],
                 fg='white',
                 font=('Arial', 11, 'bold'),
@@ -1012,6 +1566,17 @@ class SistemaAvisosConLogin:
             selectcolor='#37474f'
         ).pack(side='left')
         
+        self.var_urgente_admin = tk.BooleanVar()
+        tk.Checkbutton(
+            opciones_frame,
+            text="🚨 Urgente",
+            variable=self.var_urgente_admin,
+            font=('Arial', 11),
+            fg='white',
+            bg='#263238',
+            selectcolor='#37474f'
+        ).pack(side='left', padx=(15, 0))
+        
         tk.Button(
             opciones_frame,
             text="📤 ENVIAR MENSAJE",
@@ -1120,6 +1685,53 @@ class SistemaAvisosConLogin:
         
         tk.Button(config_inner, text="💾 GUARDAR", command=self.guardar_configuracion_servidor, bg='#4caf50', fg='white', font=('Arial', 11, 'bold'), padx=15, pady=5).grid(row=0, column=2, padx=10, pady=5)
         
+        # Sesiones persistentes: varios avisos por conexión al mismo destino
+        self.var_sesiones = tk.BooleanVar(value=self.sesiones.activo)
+        tk.Checkbutton(
+            config_inner,
+            text="🔗 Reutilizar conexiones abiertas con las PCs (pool de conexiones)",
+            variable=self.var_sesiones,
+            command=self.cambiar_modo_sesion,
+            font=('Arial', 11),
+            fg='white',
+            bg='#263238',
+            selectcolor='#37474f'
+        ).grid(row=1, column=0, columnspan=3, sticky='w', padx=5, pady=5)
+        
+        self.var_multicast = tk.BooleanVar(value=self.config_envio.get('multicast', False))
+        tk.Checkbutton(
+            config_inner,
+            text="📡 Enviar a todas las PCs por multicast (reintento por TCP a las que no confirmen)",
+            variable=self.var_multicast,
+            command=self.cambiar_modo_multicast,
+            font=('Arial', 11),
+            fg='white',
+            bg='#263238',
+            selectcolor='#37474f'
+        ).grid(row=2, column=0, columnspan=3, sticky='w', padx=5, pady=5)
+        
+        self.var_monitor = tk.BooleanVar(value=self.config_envio.get('monitor', True))
+        tk.Checkbutton(
+            config_inner,
+            text="🩺 Vigilar el estado de las PCs en segundo plano",
+            variable=self.var_monitor,
+            command=self.cambiar_monitor,
+            font=('Arial', 11),
+            fg='white',
+            bg='#263238',
+            selectcolor='#37474f'
+        ).grid(row=3, column=0, columnspan=3, sticky='w', padx=5, pady=5)
+        
+        self.label_metricas_pool = tk.Label(config_inner, text="", font=('Arial', 11), fg='#81c784', bg='#263238')
+        self.label_metricas_pool.grid(row=4, column=0, columnspan=3, sticky='w', padx=5, pady=5)
+        self.label_metricas_despacho = tk.Label(config_inner, text="", font=('Arial', 11), fg='#81c784', bg='#263238')
+        self.label_metricas_despacho.grid(row=5, column=0, columnspan=3, sticky='w', padx=5, pady=5)
+        self.label_metricas_monitor = tk.Label(config_inner, text="", font=('Arial', 11), fg='#81c784', bg='#263238')
+        self.label_metricas_monitor.grid(row=6, column=0, columnspan=3, sticky='w', padx=5, pady=5)
+        self.label_metricas_latidos = tk.Label(config_inner, text="", font=('Arial', 11), fg='#81c784', bg='#263238')
+        self.label_metricas_latidos.grid(row=7, column=0, columnspan=3, sticky='w', padx=5, pady=5)
+        self.actualizar_metricas_pool()
+        
         # Respaldo y restauración
         respaldo_frame = tk.LabelFrame(
             frame_config,
@@ -1194,6 +1806,120 @@ class SistemaAvisosConLogin:
         
         messagebox.showinfo("Éxito", f"Computadora {nombre} agregada correctamente")
     
+    def descubrir_pcs_dialog(self):
+        """Busca receptores en una red y permite registrar varios a la vez"""
+        dialog = tk.Toplevel(self.ventana)
+        dialog.title("🔍 Descubrir PCs")
+        dialog.geometry("560x480")
+        dialog.configure(bg='#1e2832')
+        dialog.transient(self.ventana)
+        
+        controles = tk.Frame(dialog, bg='#1e2832')
+        controles.pack(fill='x', padx=20, pady=(20, 10))
+        
+        tk.Label(controles, text="Red (CIDR):", font=('Arial', 11, 'bold'),
+                fg='white', bg='#1e2832').pack(side='left')
+        
+        entry_red = tk.Entry(controles, font=('Arial', 11), width=20)
+        entry_red.pack(side='left', padx=10)
+        try:
+            entry_red.insert(0, red_local())
+        except OSError:
+            entry_red.insert(0, '192.168.1.0/24')
+        
+        boton_buscar = tk.Button(controles, text="🔍 Buscar", bg='#2196f3', fg='white',
+                                 font=('Arial', 10, 'bold'), padx=10)
+        boton_buscar.pack(side='left')
+        
+        label_resultado = tk.Label(dialog, text="", font=('Arial', 10), fg='#81c784', bg='#1e2832')
+        label_resultado.pack(anchor='w', padx=20)
+        
+        tree = ttk.Treeview(dialog, columns=('ip', 'hostname', 'estado'), show='headings', height=12)
+        for columna, titulo, ancho in (('ip', 'IP', 130), ('hostname', 'Nombre', 220), ('estado', 'Estado', 120)):
+            tree.heading(columna, text=titulo)
+            tree.column(columna, width=ancho)
+        tree.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        def mostrar(resultado, duracion):
+            registradas = {pc['ip'] for pc in self.computadoras}
+            tree.delete(*tree.get_children())
+            for datos in resultado['encontradas']:
+                nueva = datos['ip'] in resultado['nuevas']
+                estado = 'Registrada' if datos['ip'] in registradas else ('🆕 Nueva' if nueva else 'Sin registrar')
+                tree.insert('', 'end', iid=datos['ip'], values=(datos['ip'], datos['hostname'] or '-', estado))
+            # Se preseleccionan las que aún no están registradas
+            tree.selection_set([d['ip'] for d in resultado['encontradas'] if d['ip'] not in registradas])
+            label_resultado.config(
+                text=f"{len(resultado['encontradas'])} receptores en {duracion:.1f} s | "
+                     f"{len(resultado['nuevas'])} nuevos | {len(resultado['perdidas'])} ya no responden"
+            )
+            boton_buscar.config(state='normal')
+        
+        def error_red(texto):
+            messagebox.showerror("Error", f"Red inválida: {texto}", parent=dialog)
+            boton_buscar.config(state='normal')
+            label_resultado.config(text="")
+        
+        def buscar():
+            red = entry_red.get().strip()
+            boton_buscar.config(state='disabled')
+            label_resultado.config(text=f"Buscando en {red}...")
+            
+            def busqueda():
+                inicio = time.monotonic()
+                try:
+                    resultado = self.descubridor.descubrir(red)
+                except ValueError as e:
+                    self.ventana.after(0, error_red, str(e))
+                    return
+                self.ventana.after(0, mostrar, resultado, time.monotonic() - inicio)
+            
+            threading.Thread(target=busqueda, daemon=True).start()
+        
+        def registrar():
+            nombres = {pc['nombre'] for pc in self.computadoras}
+            registradas = {pc['ip'] for pc in self.computadoras}
+            agregadas = 0
+            for ip in tree.selection():
+                if ip in registradas:
+                    continue
+                datos = self.descubridor.encontradas.get(ip, {})
+                nombre = (datos.get('hostname') or f"PC {ip}").split('.')[0]
+                if nombre in nombres:
+                    nombre = f"{nombre} ({ip})"
+                nombres.add(nombre)
+                self.computadoras.append({
+                    'nombre': nombre,
+                    'ip': ip,
+                    'estado': 'online',
+                    'fecha_agregada': datetime.now().isoformat()
+                })
+                agregadas += 1
+            if not agregadas:
+                messagebox.showinfo("Descubrir PCs", "No hay PCs nuevas seleccionadas", parent=dialog)
+                return
+            
+            self.guardar_configuracion()
+            self.actualizar_lista_computadoras()
+            self.actualizar_info_cliente()
+            self.agregar_log_servidor(f"➕ {agregadas} PCs registradas desde la búsqueda en la red")
+            dialog.destroy()
+        
+        boton_buscar.config(command=buscar)
+        
+        btn_frame = tk.Frame(dialog, bg='#1e2832')
+        btn_frame.pack(fill='x', padx=20, pady=(0, 20))
+        
+        tk.Button(btn_frame, text="➕ Registrar seleccionadas", command=registrar,
+                 bg='#4caf50', fg='white', font=('Arial', 11, 'bold'),
+                 padx=20).pack(side='left')
+        
+        tk.Button(btn_frame, text="❌ Cerrar", command=dialog.destroy,
+                 bg='#f44336', fg='white', font=('Arial', 11, 'bold'),
+                 padx=20).pack(side='right')
+        
+        buscar()
+    
     def detectar_ip_auto(self):
         """Detecta IP automáticamente"""
         try:
@@ -1211,12 +1937,30 @@ class SistemaAvisosConLogin:
             self.tree_computadoras.delete(item)
         
         # Agregar computadoras
-        for pc in self.computadoras:
-            self.tree_computadoras.insert('', 'end', values=(
+        for indice, pc in enumerate(self.computadoras):
+            self.tree_computadoras.insert('', 'end', iid=str(indice), values=(
                 pc['nombre'],
                 pc['ip'],
-                pc.get('estado', 'offline')
+                pc.get('estado', 'offline'),
+                *self.historial_rtt.columnas(pc['ip'])
             ))
+        self.monitor.sincronizar({pc['ip']: pc.get('estado') == 'online' for pc in self.computadoras})
+        self.historial_rtt.olvidar({pc['ip'] for pc in self.computadoras})
+        
+        if hasattr(self, 'combo_destino_programado'):
+            self.actualizar_destinos_programados()
+    
+    def actualizar_columnas_rtt(self):
+        """Refresca cada 2 segundos el RTT actual, mínimo, promedio, p95 y la tendencia de cada PC"""
+        # La lista se destruye al cerrar sesión; el nuevo panel arranca su propio refresco
+        if not self.tree_computadoras.winfo_exists():
+            return
+        for indice, pc in enumerate(self.computadoras):
+            if self.tree_computadoras.exists(str(indice)):
+                for columna, valor in zip(('rtt', 'rtt_min', 'rtt_prom', 'rtt_p95', 'tendencia'),
+                                          self.historial_rtt.columnas(pc['ip'])):
+                    self.tree_computadoras.set(str(indice), columna, valor)
+        self.ventana.after(2000, self.actualizar_columnas_rtt)
     
     def eliminar_computadora(self):
         """Elimina computadora seleccionada"""
@@ -1240,7 +1984,7 @@ class SistemaAvisosConLogin:
     
     def actualizar_estados_pcs(self):
         """Actualiza estados de conectividad"""
-        messagebox.showinfo("Info", "Actualizando estados...")
+        self.verificar_todas_pcs()
     
     # === MÉTODOS PARA GESTIÓN DE USUARIOS ===
     
@@ -1350,10 +2094,13 @@ class SistemaAvisosConLogin:
         try:
             puerto = int(self.entry_puerto_config.get() if hasattr(self, 'entry_puerto_config') else 8888)
             
-            self.socket_servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.socket_servidor.bind(('', puerto))
-            self.socket_servidor.listen(5)
+            self.servidor_async = ServidorAvisosAsync.desde_configuracion(
+                self.config_servidor,
+                puerto=puerto,
+                host='',
+                cola_eventos=self.cola_eventos
+            )
+            self.servidor_async.iniciar()
             
             self.servidor_activo = True
             
@@ -1368,14 +2115,12 @@ class SistemaAvisosConLogin:
                 info_text = f"🟢 Estado: ACTIVO\n🌐 IP: {mi_ip}\n🔌 Puerto: {puerto}\n⏰ Iniciado: {datetime.now().strftime('%H:%M:%S')}"
                 self.label_info_servidor.config(text=info_text)
             
-            # Hilo del servidor
-            self.hilo_servidor = threading.Thread(target=self.ejecutar_servidor, daemon=True)
-            self.hilo_servidor.start()
-            
             self.agregar_log_servidor(f"✅ Servidor iniciado en puerto {puerto}")
             self.actualizar_estadisticas()
+            self.actualizar_metricas_servidor()
             
         except Exception as e:
+            self.servidor_async = None
             messagebox.showerror("Error", f"Error iniciando servidor: {e}")
             self.agregar_log_servidor(f"❌ Error iniciando servidor: {e}")
     
@@ -1384,9 +2129,9 @@ class SistemaAvisosConLogin:
         try:
             self.servidor_activo = False
             
-            if self.socket_servidor:
-                self.socket_servidor.close()
-                self.socket_servidor = None
+            if self.servidor_async:
+                self.servidor_async.detener()
+                self.servidor_async = None
             
             # Actualizar UI
             if hasattr(self, 'label_estado_servidor'):
@@ -1402,44 +2147,49 @@ class SistemaAvisosConLogin:
         except Exception as e:
             self.agregar_log_servidor(f"❌ Error deteniendo servidor: {e}")
     
-    def ejecutar_servidor(self):
-        """Ejecuta el bucle principal del servidor"""
-        while self.servidor_activo:
-            try:
-                if self.socket_servidor:
-                    cliente_socket, direccion = self.socket_servidor.accept()
-                    threading.Thread(
-                        target=self.manejar_cliente_servidor,
-                        args=(cliente_socket, direccion),
-                        daemon=True
-                    ).start()
-            except Exception as e:
-                if self.servidor_activo:
-                    self.agregar_log_servidor(f"❌ Error en servidor: {e}")
-                break
+    def actualizar_metricas_servidor(self):
+        """Muestra profundidad de cola y rechazos del receptor mientras está activo"""
+        if not self.servidor_activo or not self.servidor_async:
+            return
+        
+        if hasattr(self, 'label_metricas_servidor'):
+            stats = self.servidor_async.obtener_estadisticas()
+            self.label_metricas_servidor.config(
+                text=f"📊 Cola: {stats['cola_pendientes']}/{stats['max_pendientes']} | "
+                     f"Rechazados: {stats['rechazados']} | "
+                     f"Duplicados: {stats['duplicados']} | "
+                     f"Limitados: {stats['limitados']} | "
+                     f"Conexiones activas: {stats['conexiones_activas']} | "
+                     f"Avisos: {stats['avisos']} | "
+                     f"⏱️ Pantalla: {self.tiempos_pantalla.resumen()}"
+            )
+        self.ventana.after(1000, self.actualizar_metricas_servidor)
     
-    def manejar_cliente_servidor(self, cliente_socket, direccion):
-        """Maneja clientes del servidor"""
+    def procesar_cola_eventos(self, max_eventos=200):
+        """Procesa en el hilo de la GUI los eventos que llegan del servidor asíncrono"""
         try:
-            datos = cliente_socket.recv(1024).decode('utf-8')
-            if datos:
-                aviso = json.loads(datos)
-                mensaje = aviso.get('mensaje', 'Sin mensaje')
-                timestamp = datetime.now().strftime('%H:%M:%S')
-                
-                self.agregar_log_servidor(f"📨 [{timestamp}] Aviso de {direccion[0]}: {mensaje}")
-                
-                # Mostrar aviso en pantalla
-                self.mostrar_aviso_recibido(aviso, direccion)
-                
-                # Confirmar recepción
-                respuesta = {"status": "ok", "mensaje": "Aviso recibido"}
-                cliente_socket.send(json.dumps(respuesta).encode('utf-8'))
-                
-        except Exception as e:
-            self.agregar_log_servidor(f"❌ Error manejando cliente {direccion}: {e}")
-        finally:
-            cliente_socket.close()
+            for _ in range(max_eventos):
+                evento = self.cola_eventos.get_nowait()
+                if evento[0] == 'aviso':
+                    _, aviso, direccion, leido = evento
+                    mensaje = aviso.get('mensaje', 'Sin mensaje')
+                    timestamp = datetime.now().strftime('%H:%M:%S')
+                    
+                    self.agregar_log_servidor(f"📨 [{timestamp}] Aviso de {direccion[0]}: {mensaje}")
+                    
+                    # Mostrar aviso en pantalla
+                    self.mostrar_aviso_recibido(aviso, direccion, leido)
+                elif evento[0] == 'log':
+                    self.agregar_log_servidor(evento[1])
+        except queue.Empty:
+            pass
+        
+        if self.ventana:
+            self.ventana.after(50, self.procesar_cola_eventos)
+    
+    def log_desde_hilo(self, mensaje):
+        """Agrega un mensaje al log desde otro hilo; se escribe en el hilo de la interfaz"""
+        self.ventana.after(0, self.agregar_log_servidor, mensaje)
     
     def agregar_log_servidor(self, mensaje):
         """Agrega mensaje al log del servidor"""
@@ -1448,94 +2198,232 @@ class SistemaAvisosConLogin:
             self.text_log_servidor.insert(tk.END, f"[{timestamp}] {mensaje}\n")
             self.text_log_servidor.see(tk.END)
     
-    def mostrar_aviso_recibido(self, aviso, origen):
-        """Muestra aviso recibido en pantalla completa"""
-        def crear_ventana_aviso():
-            ventana_aviso = tk.Toplevel()
-            ventana_aviso.title("🚨 AVISO RECIBIDO 🚨")
-            ventana_aviso.attributes('-fullscreen', True)
-            ventana_aviso.attributes('-topmost', True)
-            ventana_aviso.configure(bg='red')
-            
-            frame_principal = tk.Frame(ventana_aviso, bg='red')
-            frame_principal.pack(expand=True, fill='both', padx=50, pady=50)
-            
-            titulo = tk.Label(
-                frame_principal,
-                text="🚨 AVISO IMPORTANTE 🚨",
-                font=('Arial', 48, 'bold'),
-                fg='white',
-                bg='red'
-            )
-            titulo.pack(pady=30)
-            
-            mensaje = tk.Label(
-                frame_principal,
-                text=aviso.get('mensaje', 'Aviso sin mensaje'),
-                font=('Arial', 36, 'bold'),
-                fg='yellow',
-                bg='red',
-                wraplength=900,
-                justify='center'
-            )
-            mensaje.pack(pady=30)
-            
-            info = f"📍 Enviado desde: {origen[0]}\n⏰ Hora: {datetime.now().strftime('%H:%M:%S')}"
-            info_label = tk.Label(
-                frame_principal,
-                text=info,
-                font=('Arial', 20),
-                fg='white',
-                bg='red',
-                justify='center'
-            )
-            info_label.pack(pady=20)
-            
-            def cerrar_aviso():
-                ventana_aviso.destroy()
-            
-            boton_cerrar = tk.Button(
-                frame_principal,
-                text="✅ CERRAR AVISO",
-                font=('Arial', 24, 'bold'),
-                bg='white',
-                fg='red',
-                command=cerrar_aviso,
-                padx=30,
-                pady=15
-            )
-            boton_cerrar.pack(pady=40)
-            
-            if aviso.get('auto_cerrar', False):
-                ventana_aviso.after(10000, cerrar_aviso)
-            
-            ventana_aviso.bind('<Escape>', lambda e: cerrar_aviso())
-            ventana_aviso.bind('<Return>', lambda e: cerrar_aviso())
+    def mostrar_aviso_recibido(self, aviso, origen, leido=None):
+        """Agrega el aviso a la cola de pantalla; una sola ventana muestra todos los pendientes"""
+        self.cola_pantalla.agregar(aviso, origen, leido)
+        
+        # Una ráfaga de avisos se resuelve con un único refresco de la ventana
+        if hasattr(self, 'ventana') and self.ventana and not self.refresco_aviso_pendiente:
+            self.refresco_aviso_pendiente = True
+            self.ventana.after_idle(self.actualizar_ventana_aviso)
+    
+    def crear_ventana_aviso(self):
+        """Construye la ventana de avisos en pantalla completa, oculta hasta usarla"""
+        ventana_aviso = tk.Toplevel()
+        ventana_aviso.title("🚨 AVISO RECIBIDO 🚨")
+        ventana_aviso.attributes('-fullscreen', True)
+        ventana_aviso.attributes('-topmost', True)
+        ventana_aviso.configure(bg='red')
+        ventana_aviso.protocol("WM_DELETE_WINDOW", self.confirmar_aviso)
+        
+        frame_principal = tk.Frame(ventana_aviso, bg='red')
+        frame_principal.pack(expand=True, fill='both', padx=50, pady=50)
+        
+        titulo = tk.Label(
+            frame_principal,
+            text="🚨 AVISO IMPORTANTE 🚨",
+            font=('Arial', 48, 'bold'),
+            fg='white',
+            bg='red'
+        )
+        titulo.pack(pady=30)
+        
+        self.label_mensaje_aviso = tk.Label(
+            frame_principal,
+            font=('Arial', 36, 'bold'),
+            fg='yellow',
+            bg='red',
+            wraplength=900,
+            justify='center'
+        )
+        self.label_mensaje_aviso.pack(pady=30)
+        
+        self.label_info_aviso = tk.Label(
+            frame_principal,
+            font=('Arial', 20),
+            fg='white',
+            bg='red',
+            justify='center'
+        )
+        self.label_info_aviso.pack(pady=20)
+        
+        self.label_pendientes_aviso = tk.Label(
+            frame_principal,
+            font=('Arial', 18, 'bold'),
+            fg='yellow',
+            bg='red'
+        )
+        self.label_pendientes_aviso.pack(pady=10)
+        
+        frame_botones = tk.Frame(frame_principal, bg='red')
+        frame_botones.pack(pady=40)
+        
+        self.btn_anterior_aviso = tk.Button(
+            frame_botones,
+            text="◀ ANTERIOR",
+            font=('Arial', 18, 'bold'),
+            bg='white',
+            fg='red',
+            command=self.aviso_anterior,
+            padx=20,
+            pady=15
+        )
+        self.btn_anterior_aviso.pack(side='left', padx=15)
+        
+        boton_cerrar = tk.Button(
+            frame_botones,
+            text="✅ CERRAR AVISO",
+            font=('Arial', 24, 'bold'),
+            bg='white',
+            fg='red',
+            command=self.confirmar_aviso,
+            padx=30,
+            pady=15
+        )
+        boton_cerrar.pack(side='left', padx=15)
+        
+        self.btn_todos_aviso = tk.Button(
+            frame_botones,
+            text="✅ CERRAR TODOS",
+            font=('Arial', 18, 'bold'),
+            bg='white',
+            fg='red',
+            command=self.confirmar_todos_avisos,
+            padx=20,
+            pady=15
+        )
+        self.btn_todos_aviso.pack(side='left', padx=15)
+        
+        self.btn_siguiente_aviso = tk.Button(
+            frame_botones,
+            text="SIGUIENTE ▶",
+            font=('Arial', 18, 'bold'),
+            bg='white',
+            fg='red',
+            command=self.aviso_siguiente,
+            padx=20,
+            pady=15
+        )
+        self.btn_siguiente_aviso.pack(side='left', padx=15)
+        
+        ventana_aviso.bind('<Escape>', lambda e: self.confirmar_aviso())
+        ventana_aviso.bind('<Return>', lambda e: self.confirmar_aviso())
+        ventana_aviso.bind('<Left>', lambda e: self.aviso_anterior())
+        ventana_aviso.bind('<Right>', lambda e: self.aviso_siguiente())
+        
+        # Medir cuándo se vuelve visible tras cada aviso
+        ventana_aviso.bind('<Map>', self.al_mostrar_ventana_aviso)
+        
+        ventana_aviso.withdraw()
+        self.ventana_aviso = ventana_aviso
+    
+    def mostrar_ventana_aviso(self):
+        """Hace visible la ventana de avisos ya construida"""
+        self.ventana_aviso_visible = True
+        self.ventana_aviso.deiconify()
+        self.ventana_aviso.attributes('-fullscreen', True)
+        self.ventana_aviso.lift()
+        self.ventana_aviso.focus_force()
+    
+    def al_mostrar_ventana_aviso(self, event):
+        """Registra el tiempo desde la lectura del socket hasta que el aviso se ve"""
+        if event.widget is not self.ventana_aviso:
+            return  # <Map> también llega por cada widget hijo
+        
+        def registrar():
+            entrada = self.aviso_en_pantalla
+            if entrada is not None:
+                ms = self.tiempos_pantalla.registrar(entrada.leido)
+                self.agregar_log_servidor(f"⏱️ Aviso visible {ms:.0f} ms después de leerlo del socket")
             
-            # Sonido
+            # Sonido (bloquea el loop, por eso va después de dibujar la ventana)
             try:
                 import winsound
                 winsound.Beep(1000, 500)
             except:
                 pass
-            
-            ventana_aviso.focus_force()
         
-        if hasattr(self, 'ventana') and self.ventana:
-            self.ventana.after(0, crear_ventana_aviso)
+        # Las tareas idle pendientes incluyen el redibujado de la ventana recién mapeada
+        self.ventana_aviso.after_idle(registrar)
+    
+    def actualizar_ventana_aviso(self):
+        """Muestra el aviso actual de la cola, ocultando la ventana si no queda ninguno"""
+        self.refresco_aviso_pendiente = False
+        entrada = self.cola_pantalla.actual()
+        if entrada is None:
+            self.ocultar_ventana_aviso()
+            return
+        
+        if entrada is not self.aviso_en_pantalla:
+            self.aviso_en_pantalla = entrada
+            if self.id_cierre_aviso is not None:
+                self.ventana_aviso.after_cancel(self.id_cierre_aviso)
+                self.id_cierre_aviso = None
+            self.label_mensaje_aviso.config(text=entrada.aviso.get('mensaje', 'Aviso sin mensaje'))
+            if entrada.aviso.get('auto_cerrar', False):
+                self.id_cierre_aviso = self.ventana_aviso.after(10000, self.confirmar_aviso)
+        
+        origenes = ', '.join(entrada.origenes[:5])
+        if len(entrada.origenes) > 5:
+            origenes += f" y {len(entrada.origenes) - 5} más"
+        info = f"📍 Enviado desde: {origenes}\n⏰ Hora: {entrada.recibido.strftime('%H:%M:%S')}"
+        if entrada.repeticiones > 1:
+            info += f"\n🔁 Recibido {entrada.repeticiones} veces"
+        self.label_info_aviso.config(text=info)
+        
+        posicion, total = self.cola_pantalla.posicion()
+        self.label_pendientes_aviso.config(
+            text=f"📬 Aviso {posicion} de {total} | {total - 1} más pendientes" if total > 1 else ""
+        )
+        self.btn_anterior_aviso.config(state='normal' if posicion > 1 else 'disabled')
+        self.btn_siguiente_aviso.config(state='normal' if posicion < total else 'disabled')
+        self.btn_todos_aviso.config(state='normal' if total > 1 else 'disabled')
+        
+        if not self.ventana_aviso_visible:
+            self.mostrar_ventana_aviso()
+    
+    def ocultar_ventana_aviso(self):
+        """Oculta la ventana de avisos, sin destruirla, cuando ya no queda ninguno pendiente"""
+        self.aviso_en_pantalla = None
+        if self.id_cierre_aviso is not None:
+            self.ventana_aviso.after_cancel(self.id_cierre_aviso)
+            self.id_cierre_aviso = None
+        if self.ventana_aviso_visible:
+            self.ventana_aviso_visible = False
+            self.ventana_aviso.withdraw()
+    
+    def confirmar_aviso(self):
+        """Da por leído el aviso actual y pasa al siguiente pendiente"""
+        self.cola_pantalla.confirmar_actual()
+        self.actualizar_ventana_aviso()
+    
+    def confirmar_todos_avisos(self):
+        """Da por leídos todos los avisos pendientes"""
+        self.cola_pantalla.vaciar()
+        self.actualizar_ventana_aviso()
+    
+    def aviso_anterior(self):
+        """Muestra el aviso anterior de la cola"""
+        self.cola_pantalla.anterior()
+        self.actualizar_ventana_aviso()
+    
+    def aviso_siguiente(self):
+        """Muestra el siguiente aviso de la cola"""
+        self.cola_pantalla.siguiente()
+        self.actualizar_ventana_aviso()
     
     # === MÉTODOS PARA ENVÍO ===
     
-    def enviar_mensaje_admin(self, mensaje):
+    def enviar_mensaje_admin(self, mensaje, urgente=False):
         """Envía mensaje rápido desde admin"""
         destino = self.combo_destino_admin.get()
         if destino == "Todas las PCs":
-            self.enviar_mensaje_masivo(mensaje)
+            self.enviar_mensaje_masivo(mensaje, urgente=urgente)
         else:
             # Extraer IP del formato "Nombre (IP)"
             try:
                 ip = destino.split('(')[1].split(')')[0]
-                self.enviar_aviso_a_ip(ip, mensaje)
+                self.enviar_aviso_a_ip(ip, mensaje, urgente=urgente)
             except:
                 messagebox.showerror("Error", "Selecciona un destino válido")
     
@@ -1547,70 +2435,102 @@ class SistemaAvisosConLogin:
             return
         
         auto_cerrar = self.var_auto_cerrar_admin.get()
+        urgente = self.var_urgente_admin.get()
         destino = self.combo_destino_admin.get()
         
         if destino == "Todas las PCs":
-            self.enviar_mensaje_masivo(mensaje, auto_cerrar)
+            self.enviar_mensaje_masivo(mensaje, auto_cerrar, urgente)
         else:
             try:
                 ip = destino.split('(')[1].split(')')[0]
-                self.enviar_aviso_a_ip(ip, mensaje, auto_cerrar)
+                self.enviar_aviso_a_ip(ip, mensaje, auto_cerrar, urgente)
             except:
                 messagebox.showerror("Error", "Selecciona un destino válido")
     
-    def enviar_mensaje_masivo(self, mensaje, auto_cerrar=False):
+    def enviar_mensaje_masivo(self, mensaje, auto_cerrar=False, urgente=False):
         """Envía mensaje a todas las PCs"""
         if not self.computadoras:
             messagebox.showerror("Error", "No hay computadoras registradas")
             return
         
         def envio_masivo():
-            exitos = 0
-            fallos = 0
-            
-            for pc in self.computadoras:
-                try:
-                    self.enviar_aviso_directo(pc['ip'], mensaje, auto_cerrar)
-                    exitos += 1
-                except:
-                    fallos += 1
+            aviso = self.crear_aviso(mensaje, auto_cerrar, urgente)
+            informe = enviar_masivo(
+                aviso,
+                [pc['ip'] for pc in self.computadoras],
+                self.sesiones.solicitar,
+                prioridad=prioridad_de_envio(aviso, masivo=True),
+                **self.opciones_envio_masivo()
+            )
+            self.entregas.registrar_informe(aviso, informe)
+            self.reintentar_fallidos(aviso, informe)
+            self.ventana.after(0, self.sincronizar_estados_pcs)
             
-            messagebox.showinfo("Envío Masivo", f"✅ Enviados: {exitos}\n❌ Fallos: {fallos}")
+            detalle = ''.join(f"\n   • {r['ip']}: {r['error']}" for r in informe.fallidos[:10])
+            self.ventana.after(
+                0, messagebox.showinfo,
+                "Envío Masivo",
+                f"✅ Enviados: {len(informe.exitosos)}\n❌ Fallos: {len(informe.fallidos)}{detalle}\n"
+                f"⏱️ Duración: {informe.duracion:.1f} s"
+            )
         
         threading.Thread(target=envio_masivo, daemon=True).start()
     
-    def enviar_aviso_a_ip(self, ip, mensaje, auto_cerrar=False):
+    def enviar_aviso_a_ip(self, ip, mensaje, auto_cerrar=False, urgente=False):
         """Envía aviso a IP específica"""
         def envio():
             try:
-                self.enviar_aviso_directo(ip, mensaje, auto_cerrar)
-                messagebox.showinfo("Éxito", f"¡Aviso enviado a {ip}!")
+                self.enviar_aviso_directo(ip, mensaje, auto_cerrar, urgente)
+                self.ventana.after(0, messagebox.showinfo, "Éxito", f"¡Aviso enviado a {ip}!")
             except Exception as e:
-                messagebox.showerror("Error", f"Error enviando a {ip}: {str(e)}")
+                self.ventana.after(0, messagebox.showerror, "Error", f"Error enviando a {ip}: {str(e)}")
         
         threading.Thread(target=envio, daemon=True).start()
     
-    def enviar_aviso_directo(self, ip, mensaje, auto_cerrar=False):
-        """Envía aviso directamente a una IP"""
-        puerto = 8888
-        aviso = {
+    def crear_aviso(self, mensaje, auto_cerrar=False, urgente=False):
+        """Construye el aviso con los datos del usuario actual"""
+        return {
+            'id': nuevo_id(),
             'mensaje': mensaje,
             'timestamp': datetime.now().isoformat(),
             'tipo': 'aviso_login',
             'auto_cerrar': auto_cerrar,
+            'prioridad': 'urgente' if urgente else 'normal',
             'usuario': self.usuario_actual
         }
+    
+    def opciones_envio_masivo(self):
+        """Concurrencia, plazos y multicast del envío masivo según la sección 'envio'"""
+        opciones = {
+            'concurrencia': self.config_envio.get('concurrencia', CONCURRENCIA_DEFECTO),
+            'timeout_host': self.config_envio.get('timeout_host', TIMEOUT_HOST_DEFECTO),
+            'timeout_global': self.config_envio.get('timeout_global', TIMEOUT_GLOBAL_DEFECTO),
+            'estados': self.estados,
+            'timeout_sondeo': self.config_envio.get('timeout_sondeo', TIMEOUT_SONDEO_DEFECTO),
+            'despacho': self.despacho
+        }
+        if self.config_envio.get('multicast', False):
+            opciones['multicast'] = {
+                'grupo': self.config_envio.get('grupo_multicast', GRUPO_MULTICAST_DEFECTO),
+                'puerto': self.config_envio.get('puerto_multicast', PUERTO_MULTICAST_DEFECTO),
+                'espera': self.config_envio.get('espera_multicast', 1.0)
+            }
+        return opciones
+    
+    def enviar_aviso_directo(self, ip, mensaje, auto_cerrar=False, urgente=False):
+        """Envía aviso directamente a una IP; si falla queda en reintento antes de propagar el error"""
+        puerto = 8888
+        aviso = self.crear_aviso(mensaje, auto_cerrar, urgente)
         
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.settimeout(10)
-            sock.connect((ip, puerto))
-            sock.send(json.dumps(aviso, ensure_ascii=False).encode('utf-8'))
-            
-            respuesta = sock.recv(1024).decode('utf-8')
-            respuesta_json = json.loads(respuesta)
-            
-            if respuesta_json.get('status') != 'ok':
-                raise Exception("Error en respuesta del servidor")
+        try:
+            respuesta_json = self.enviar_con_prioridad(ip, aviso, puerto, 10) or {}
+        except Exception as e:
+            self.reintentar(aviso, ip, clasificar_error(e), puerto)
+            raise
+        
+        if respuesta_json.get('status') != 'ok':
+            self.reintentar(aviso, ip, clasificar_respuesta(respuesta_json), puerto)
+            raise Exception("Error en respuesta del servidor")
     
     # === MÉTODOS AUXILIARES ===
     
@@ -1626,21 +2546,87 @@ class SistemaAvisosConLogin:
     def verificar_todas_pcs(self):
         """Verifica estado de todas las PCs"""
         def verificar():
-            for pc in self.computadoras:
-                try:
-                    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                        sock.settimeout(3)
-                        resultado = sock.connect_ex((pc['ip'], 8888))
-                        pc['estado'] = 'online' if resultado == 0 else 'offline'
-                except:
-                    pc['estado'] = 'offline'
+            inicio = time.monotonic()
+            ips = [pc['ip'] for pc in self.computadoras]
+            resultados = verificar_pcs(ips, 8888, al_resultado=self.registrar_verificacion,
+                                       **self.opciones_verificacion())
             
-            self.actualizar_lista_computadoras()
-            self.actualizar_info_cliente()
-            messagebox.showinfo("Verificación", "Estados actualizados")
+            self.ventana.after(0, self.actualizar_info_cliente)
+            online = sum(resultados.values())
+            sin_verificar = len(set(ips)) - len(resultados)
+            self.ventana.after(
+                0, messagebox.showinfo,
+                "Verificación",
+                f"Estados actualizados en {time.monotonic() - inicio:.1f} s\n"
+                f"🟢 Online: {online} | 🔴 Offline: {len(resultados) - online}"
+                + (f"\n⚠️ Sin verificar dentro del plazo: {sin_verificar}" if sin_verificar else "")
+            )
         
         threading.Thread(target=verificar, daemon=True).start()
     
+    def opciones_verificacion(self):
+        """Concurrencia, espera por PC y plazo de la verificación según la sección 'envio', e historial de RTT"""
+        return {
+            'concurrencia': self.config_envio.get('concurrencia_verificacion', CONCURRENCIA_VERIFICACION_DEFECTO),
+            'timeout': self.config_envio.get('timeout_verificacion', TIMEOUT_VERIFICACION_DEFECTO),
+            'plazo': self.config_envio.get('plazo_verificacion', PLAZO_VERIFICACION_DEFECTO),
+            'historial': self.historial_rtt
+        }
+    
+    def registrar_verificacion(self, ip, online):
+        """Anota el resultado de un sondeo; llamado desde los hilos de la verificación"""
+        self.estados.marcar(ip, online)
+        for pc in self.computadoras:
+            if pc['ip'] == ip:
+                pc['estado'] = 'online' if online else 'offline'
+        self.ventana.after(0, self.mostrar_estado_pc, ip, online)
+    
+    def al_cambiar_estado_pc(self, ip, online):
+        """Llamado por el monitor cuando una PC cambia de estado"""
+        nombre = next((pc['nombre'] for pc in self.computadoras if pc['ip'] == ip), ip)
+        self.registrar_verificacion(ip, online)
+        self.ventana.after(0, self.actualizar_info_cliente)
+        self.log_desde_hilo(f"{'🟢' if online else '🔴'} {nombre} ({ip}) ahora está {'online' if online else 'offline'}")
+    
+    def escuchar_latidos(self):
+        """Empieza a recibir los latidos de los receptores si la configuración lo permite"""
+        if not self.config_envio.get('escuchar_latidos', True):
+            return
+        try:
+            self.latidos.iniciar()
+        except OSError as e:
+            self.agregar_log_servidor(f"⚠️ No se pueden recibir latidos en el puerto UDP {self.latidos.puerto}: {e}")
+    
+    def al_cambiar_presencia(self, ip, presente, latido):
+        """Llamado por el receptor de latidos cuando una PC empieza o deja de enviarlos"""
+        pc = next((pc for pc in self.computadoras if pc['ip'] == ip), None)
+        if presente:
+            nombre = pc['nombre'] if pc else latido.get('hostname') or ip
+            registrada = "" if pc else " (no registrada)"
+            self.log_desde_hilo(f"💓 {nombre} ({ip}) envía latidos{registrada}, receptor v{latido.get('version')}")
+        else:
+            self.log_desde_hilo(f"💔 {pc['nombre'] if pc else ip} ({ip}) dejó de enviar latidos")
+        if pc and (pc.get('estado') == 'online') != presente:
+            self.registrar_verificacion(ip, presente)
+        self.ventana.after(0, self.actualizar_info_cliente)
+    
+    def mostrar_estado_pc(self, ip, online):
+        """Actualiza sólo la fila de esa PC en la lista"""
+        for indice, pc in enumerate(self.computadoras):
+            if pc['ip'] != ip:
+                continue
+            if hasattr(self, 'tree_computadoras') and self.tree_computadoras.exists(str(indice)):
+                self.tree_computadoras.set(str(indice), 'estado', pc['estado'])
+    
+    def sincronizar_estados_pcs(self):
+        """Copia a cada PC su estado vigente en la cache y refresca la lista"""
+        for pc in self.computadoras:
+            estado = self.estados.estado(pc['ip'])
+            if estado != DESCONOCIDO:
+                pc['estado'] = estado
+        if hasattr(self, 'tree_computadoras'):
+            self.actualizar_lista_computadoras()
+    
     def actualizar_estadisticas(self):
         """Actualiza estadísticas del sistema"""
         stats_text = f"""
@@ -1684,6 +2670,48 @@ class SistemaAvisosConLogin:
         except ValueError:
             messagebox.showerror("Error", "Puerto debe ser un número")
     
+    def cambiar_modo_sesion(self):
+        """Activa o desactiva el pool de conexiones de envío"""
+        activo = self.var_sesiones.get()
+        self.sesiones.activo = activo
+        if not activo:
+            self.sesiones.cerrar_todas()
+        self.config_envio['sesiones_persistentes'] = activo
+        self.guardar_configuracion()
+    
+    def actualizar_metricas_pool(self):
+        """Refresca los contadores del pool de conexiones de envío"""
+        stats = self.sesiones.obtener_estadisticas()
+        self.label_metricas_pool.config(
+            text=f"🔗 Pool: {stats['aciertos']} reutilizadas | {stats['fallos']} nuevas | "
+                 f"{stats['descartadas']} descartadas | {stats['libres']} libres | {stats['legacy']} legacy"
+        )
+        self.label_metricas_despacho.config(text=f"📬 Cola de envío: {self.despacho.texto_resumen()}")
+        self.label_metricas_monitor.config(text=f"🩺 Monitor: {self.monitor.texto_resumen()}")
+        self.label_metricas_latidos.config(text=f"💓 Latidos: {self.latidos.texto_resumen()}")
+        self.ventana.after(2000, self.actualizar_metricas_pool)
+    
+    def enviar_con_prioridad(self, ip, aviso, puerto, timeout):
+        """Envía un aviso a una PC por la cola de despacho y espera su confirmación"""
+        return self.despacho.enviar(
+            prioridad_de_envio(aviso), self.entregas.enviar, self.sesiones, ip, aviso, puerto, timeout
+        ).result()
+    
+    def cambiar_modo_multicast(self):
+        """Activa o desactiva el envío masivo por multicast"""
+        self.config_envio['multicast'] = self.var_multicast.get()
+        self.guardar_configuracion()
+    
+    def cambiar_monitor(self):
+        """Activa o desactiva el monitor de PCs en segundo plano"""
+        activo = self.var_monitor.get()
+        if activo:
+            self.monitor.iniciar()
+        else:
+            self.monitor.detener()
+        self.config_envio['monitor'] = activo
+        self.guardar_configuracion()
+    
     def crear_respaldo(self):
         """Crea respaldo del sistema"""
         try:
@@ -1719,6 +2747,13 @@ class SistemaAvisosConLogin:
         if messagebox.askyesno("Cerrar Sesión", "¿Cerrar sesión actual?"):
             if self.servidor_activo:
                 self.detener_servidor()
+            self.sesiones.cerrar_todas()
+            self.entregas.guardar()
+            self.programador.detener()
+            self.monitor.detener()
+            self.latidos.detener()
+            self.reintentos.detener()
+            self.despacho.detener()
             self.ventana.destroy()
             self.__init__()  # Reiniciar con login
     
@@ -1726,6 +2761,13 @@ class SistemaAvisosConLogin:
         """Acciones al cerrar"""
         if self.servidor_activo:
             self.detener_servidor()
+        self.sesiones.cerrar_todas()
+        self.entregas.guardar()
+        self.programador.detener()
+        self.monitor.detener()
+        self.latidos.detener()
+        self.reintentos.detener()
+        self.despacho.detener()
         self.guardar_configuracion()
         self.ventana.destroy()
 
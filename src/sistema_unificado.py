@@ -10,23 +10,108 @@ import json
 from datetime import datetime
 import threading
 import os
+import queue
+import time
+import functools
 from PIL import Image, ImageTk
+from servidor_async import ServidorAvisosAsync
+from protocolo import solicitar, nuevo_id, GRUPO_MULTICAST_DEFECTO, PUERTO_MULTICAST_DEFECTO, PUERTO_LATIDOS_DEFECTO
+from cliente_avisos import GestorSesiones, MAX_POR_HOST_DEFECTO, INACTIVIDAD_MAXIMA
+from registro_entregas import RegistroEntregas
+from historial_rtt import HistorialRTT, MUESTRAS_RTT_DEFECTO
+from estado_pcs import (CacheEstadoPCs, verificar_pcs, DESCONOCIDO, TTL_ONLINE_DEFECTO, TTL_OFFLINE_DEFECTO,
+                        TIMEOUT_SONDEO_DEFECTO, CONCURRENCIA_VERIFICACION_DEFECTO, TIMEOUT_VERIFICACION_DEFECTO,
+                        PLAZO_VERIFICACION_DEFECTO)
+from envio_masivo import (enviar_masivo, ips_de_destino, clasificar_error, clasificar_respuesta,
+                          CONCURRENCIA_DEFECTO, TIMEOUT_HOST_DEFECTO, TIMEOUT_GLOBAL_DEFECTO)
+from pantalla_avisos import ColaAvisosPantalla, TiemposPantalla
+from programador_avisos import ProgramadorAvisos, interpretar_fecha, DESTINO_TODAS
+from despacho_avisos import ColaDespacho, prioridad_de_envio
+from presencia_pcs import ReceptorLatidos
+from descubrimiento_pcs import DescubridorPCs, red_local
+from monitor_pcs import MonitorPCs, INTERVALO_MINIMO_DEFECTO, INTERVALO_MAXIMO_DEFECTO, SONDEOS_POR_SEGUNDO_DEFECTO
+from reintentos_avisos import (GestorReintentos, PoliticaReintentos, ESPERA_BASE_DEFECTO, ESPERA_MAXIMA_DEFECTO,
+                               MAX_INTENTOS_DEFECTO, EDAD_MAXIMA_DEFECTO)
 
 class SistemaAvisosUnificado:
     def __init__(self):
         self.ventana = tk.Tk()
         self.servidor_activo = False
-        self.socket_servidor = None
-        self.hilo_servidor = None
+        self.servidor_async = None
+        self.cola_eventos = queue.Queue()
         self.computadoras = []
+        self.grupos = {}
         self.ips_guardadas = []
+        self.config_servidor = {}
+        self.config_envio = {}
         self.icono_app = None
         self.icono_pequeño = None
+        self.cola_pantalla = ColaAvisosPantalla()
+        self.ventana_aviso = None
+        self.ventana_aviso_visible = False
+        self.tiempos_pantalla = TiemposPantalla()
+        self.aviso_en_pantalla = None
+        self.id_cierre_aviso = None
+        self.id_parpadeo_aviso = None
+        self.refresco_aviso_pendiente = False
         
         self.cargar_configuracion()
+        self.sesiones = GestorSesiones(
+            activo=self.config_envio.get('sesiones_persistentes', False),
+            max_por_host=self.config_envio.get('pool_max_por_host', MAX_POR_HOST_DEFECTO),
+            inactividad=self.config_envio.get('pool_inactividad', INACTIVIDAD_MAXIMA)
+        )
+        self.estados = CacheEstadoPCs(
+            ttl_online=self.config_envio.get('ttl_online', TTL_ONLINE_DEFECTO),
+            ttl_offline=self.config_envio.get('ttl_offline', TTL_OFFLINE_DEFECTO)
+        )
+        self.historial_rtt = HistorialRTT(self.config_envio.get('muestras_rtt', MUESTRAS_RTT_DEFECTO))
+        self.entregas = RegistroEntregas(estados=self.estados, historial=self.historial_rtt)
+        # Todos los envíos salientes comparten la cola de despacho por prioridad
+        self.despacho = ColaDespacho(self.config_envio.get('concurrencia', CONCURRENCIA_DEFECTO))
+        self.reintentos = GestorReintentos(
+            functools.partial(self.entregas.enviar, self.sesiones),
+            self.despacho,
+            PoliticaReintentos(
+                base=self.config_envio.get('reintento_base', ESPERA_BASE_DEFECTO),
+                maximo=self.config_envio.get('reintento_maximo', ESPERA_MAXIMA_DEFECTO),
+                max_intentos=self.config_envio.get('reintento_intentos', MAX_INTENTOS_DEFECTO),
+                edad_maxima=self.config_envio.get('reintento_edad_maxima', EDAD_MAXIMA_DEFECTO)
+            ),
+            al_cambiar=self.al_terminar_reintento
+        )
+        self.programador = ProgramadorAvisos(self.al_vencer_programacion, log=self.log_desde_hilo)
+        self.latidos = ReceptorLatidos(
+            self.al_cambiar_presencia,
+            puerto=self.config_envio.get('puerto_latidos', PUERTO_LATIDOS_DEFECTO),
+            estados=self.estados,
+            log=self.log_desde_hilo
+        )
+        self.descubridor = DescubridorPCs()
+        self.monitor = MonitorPCs(
+            self.al_cambiar_estado_pc,
+            estados=self.estados,
+            omitir=self.latidos.tabla.presente,
+            historial=self.historial_rtt,
+            log=self.log_desde_hilo,
+            intervalo_minimo=self.config_envio.get('monitor_intervalo_minimo', INTERVALO_MINIMO_DEFECTO),
+            intervalo_maximo=self.config_envio.get('monitor_intervalo_maximo', INTERVALO_MAXIMO_DEFECTO),
+            sondeos_por_segundo=self.config_envio.get('monitor_sondeos_por_segundo', SONDEOS_POR_SEGUNDO_DEFECTO),
+            timeout=self.config_envio.get('timeout_verificacion', TIMEOUT_VERIFICACION_DEFECTO)
+        )
         self.cargar_iconos()
         self.configurar_ventana()
         self.crear_interfaz()
+        # La ventana de avisos se construye una vez y queda oculta hasta el primer aviso
+        self.crear_ventana_aviso()
+        self.procesar_cola_eventos()
+        self.guardar_entregas()
+        for programacion in self.programador.descartadas:
+            self.agregar_log(f"⚠️ Aviso programado vencido con la aplicación cerrada: {programacion['mensaje']}")
+        self.programador.iniciar()
+        if self.config_envio.get('monitor', True):
+            self.monitor.iniciar()
+        self.escuchar_latidos()
         
     def cargar_configuracion(self):
         """Carga configuración guardada"""
@@ -36,6 +121,9 @@ class SistemaAvisosUnificado:
                     config = json.load(f)
                     self.ips_guardadas = config.get('ips_guardadas', ['192.168.1.100'])
                     self.computadoras = config.get('computadoras', [])
+                    self.grupos = config.get('grupos', {})
+                    self.config_servidor = config.get('servidor', {})
+                    self.config_envio = config.get('envio', {})
         except Exception as e:
             self.ips_guardadas = ['192.168.1.100', '192.168.1.101']
             self.computadoras = [
@@ -75,7 +163,10 @@ class SistemaAvisosUnificado:
         try:
             config = {
                 'ips_guardadas': self.ips_guardadas,
-                'computadoras': self.computadoras
+                'computadoras': self.computadoras,
+                'grupos': self.grupos,
+                'servidor': self.config_servidor,
+                'envio': self.config_envio
             }
             with open('config_unificado.json', 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=2, ensure_ascii=False)
@@ -128,7 +219,10 @@ class SistemaAvisosUnificado:
         # Pestaña 4: Administrador de PCs
         self.crear_pestaña_admin()
         
-        # Pestaña 5: Configuración
+        # Pestaña 5: Avisos programados
+        self.crear_pestaña_programados()
+        
+        # Pestaña 6: Configuración
         self.crear_pestaña_config()
         
         # Footer con logs
@@ -381,6 +475,16 @@ class SistemaAvisosUnificado:
         )
         self.btn_servidor_detallado.pack(side='left', padx=5)
         
+        # Métricas de la cola de trabajo del receptor
+        self.label_metricas_servidor = tk.Label(
+            config_inner,
+            text="📊 Cola: - | Rechazados: - | Conexiones activas: -",
+            font=('Arial', 11),
+            fg='#ffcc80',
+            bg='#263238'
+        )
+        self.label_metricas_servidor.pack(anchor='w', pady=(10, 0))
+        
         # Estado detallado del servidor
         estado_servidor_frame = tk.LabelFrame(
             frame_servidor,
@@ -506,28 +610,28 @@ class SistemaAvisosUnificado:
         grid_frame.pack(fill='x', padx=15, pady=15)
         
         avisos_rapidos = [
-            ("🚨 URGENTE", "¡ATENCIÓN URGENTE! Necesito ayuda inmediatamente.", '#f44336'),
-            ("🔥 EMERGENCIA", "¡EMERGENCIA! Situación crítica.", '#d32f2f'),
-            ("⚠️ ALERTA", "¡ALERTA! Requiere atención inmediata.", '#ff5722'),
-            ("✅ COMPLETADO", "Tarea completada exitosamente.", '#4caf50'),
-            ("🚀 LISTO", "Todo está listo para continuar.", '#2196f3'),
-            ("⏰ TIEMPO", "¡Se agota el tiempo! Apúrate.", '#ff9800'),
-            ("☕ CAFÉ", "¡Hora del café! ¿Te unes?", '#795548'),
-            ("🍕 ALMUERZO", "Es hora del almuerzo. ¿Vamos?", '#ff9800'),
-            ("❓ PREGUNTA", "Tengo una pregunta importante.", '#3f51b5'),
-            ("📞 LLAMADA", "Necesito hablar contigo urgente.", '#9c27b0'),
-            ("🎉 CELEBRAR", "¡Tenemos algo que celebrar!", '#e91e63'),
-            ("🏠 ME VOY", "Me voy a casa. ¡Hasta mañana!", '#607d8b'),
+            ("🚨 URGENTE", "¡ATENCIÓN URGENTE! Necesito ayuda inmediatamente.", '#f44336', True),
+            ("🔥 EMERGENCIA", "¡EMERGENCIA! Situación crítica.", '#d32f2f', True),
+            ("⚠️ ALERTA", "¡ALERTA! Requiere atención inmediata.", '#ff5722', False),
+            ("✅ COMPLETADO", "Tarea completada exitosamente.", '#4caf50', False),
+            ("🚀 LISTO", "Todo está listo para continuar.", '#2196f3', False),
+            ("⏰ TIEMPO", "¡Se agota el tiempo! Apúrate.", '#ff9800', False),
+            ("☕ CAFÉ", "¡Hora del café! ¿Te unes?", '#795548', False),
+            ("🍕 ALMUERZO", "Es hora del almuerzo. ¿Vamos?", '#ff9800', False),
+            ("❓ PREGUNTA", "Tengo una pregunta importante.", '#3f51b5', False),
+            ("📞 LLAMADA", "Necesito hablar contigo urgente.", '#9c27b0', False),
+            ("🎉 CELEBRAR", "¡Tenemos algo que celebrar!", '#e91e63', False),
+            ("🏠 ME VOY", "Me voy a casa. ¡Hasta mañana!", '#607d8b', False),
         ]
         
-        for i, (texto, mensaje, color) in enumerate(avisos_rapidos):
+        for i, (texto, mensaje, color, urgente) in enumerate(avisos_rapidos):
             row = i // 4
             col = i % 4
             
             btn = tk.Button(
                 grid_frame,
                 text=texto,
-                command=lambda m=mensaje: self.enviar_aviso_rapido(m),
+                command=lambda m=mensaje, u=urgente: self.enviar_aviso_rapido(m, u),
                 bg=color,
                 fg='white',
                 font=('Arial', 10, 'bold'),
@@ -578,6 +682,17 @@ class SistemaAvisosUnificado:
             font=('Arial', 10)
         ).pack(side='left')
         
+        self.var_urgente = tk.BooleanVar()
+        tk.Checkbutton(
+            opciones_frame,
+            text="🚨 Urgente",
+            variable=self.var_urgente,
+            bg='#263238',
+            fg='white',
+            selectcolor='#37474f',
+            font=('Arial', 10)
+        ).pack(side='left', padx=(15, 0))
+        
         tk.Button(
             opciones_frame,
             text="📤 ENVIAR MENSAJE",
@@ -590,6 +705,233 @@ class SistemaAvisosUnificado:
             cursor='hand2'
         ).pack(side='right')
     
+    def crear_pestaña_programados(self):
+        """Pestaña de avisos programados, únicos o recurrentes"""
+        frame_programados = tk.Frame(self.notebook, bg='#1e2832')
+        self.notebook.add(frame_programados, text="⏰ Programados")
+        
+        form_frame = tk.LabelFrame(
+            frame_programados,
+            text="⏰ PROGRAMAR AVISO",
+            font=('Arial', 14, 'bold'),
+            fg='#00bcd4',
+            bg='#263238',
+            bd=2
+        )
+        form_frame.pack(fill='x', padx=20, pady=20)
+        
+        form_inner = tk.Frame(form_frame, bg='#263238')
+        form_inner.pack(fill='x', padx=15, pady=15)
+        
+        etiquetas = ("💬 Mensaje:", "🎯 Destino:", "🕐 Una vez (HH:MM o AAAA-MM-DD HH:MM):",
+                     "🔁 Repetir (cron):")
+        for fila, texto in enumerate(etiquetas):
+            tk.Label(
+                form_inner,
+                text=texto,
+                font=('Arial', 11, 'bold'),
+                fg='white',
+                bg='#263238'
+            ).grid(row=fila, column=0, sticky='w', pady=5)
+        
+        self.entry_mensaje_programado = tk.Entry(
+            form_inner,
+            font=('Arial', 11),
+            bg='#37474f',
+            fg='white',
+            insertbackground='white',
+            width=50
+        )
+        self.entry_mensaje_programado.grid(row=0, column=1, columnspan=2, sticky='w', padx=10, pady=5)
+        
+        self.combo_destino_programado = ttk.Combobox(form_inner, font=('Arial', 11), width=35, state='readonly')
+        self.combo_destino_programado.grid(row=1, column=1, sticky='w', padx=10, pady=5)
+        
+        self.entry_fecha_programada = tk.Entry(
+            form_inner,
+            font=('Arial', 11),
+            bg='#37474f',
+            fg='white',
+            insertbackground='white',
+            width=20
+        )
+        self.entry_fecha_programada.grid(row=2, column=1, sticky='w', padx=10, pady=5)
+        
+        self.entry_cron_programado = tk.Entry(
+            form_inner,
+            font=('Arial', 11),
+            bg='#37474f',
+            fg='white',
+            insertbackground='white',
+            width=20
+        )
+        self.entry_cron_programado.grid(row=3, column=1, sticky='w', padx=10, pady=5)
+        
+        tk.Label(
+            form_inner,
+            text="minuto hora día mes día-semana · Ej.: 50 17 * * 1-5 = lunes a viernes a las 17:50",
+            font=('Arial', 9),
+            fg='#ffcc80',
+            bg='#263238'
+        ).grid(row=3, column=2, sticky='w')
+        
+        self.var_auto_cerrar_programado = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            form_inner,
+            text="Cerrar automáticamente",
+            variable=self.var_auto_cerrar_programado,
+            font=('Arial', 10),
+            fg='white',
+            bg='#263238',
+            selectcolor='#37474f'
+        ).grid(row=4, column=1, sticky='w', padx=10, pady=5)
+        
+        botones_frame = tk.Frame(form_frame, bg='#263238')
+        botones_frame.pack(fill='x', padx=15, pady=(0, 15))
+        
+        tk.Button(
+            botones_frame,
+            text="⏰ PROGRAMAR",
+            command=self.programar_aviso,
+            bg='#4caf50',
+            fg='white',
+            font=('Arial', 11, 'bold'),
+            padx=15,
+            pady=5
+        ).pack(side='left', padx=5)
+        
+        tk.Button(
+            botones_frame,
+            text="❌ ELIMINAR SELECCIONADO",
+            command=self.eliminar_programacion,
+            bg='#f44336',
+            fg='white',
+            font=('Arial', 11, 'bold'),
+            padx=15,
+            pady=5
+        ).pack(side='left', padx=5)
+        
+        lista_frame = tk.LabelFrame(
+            frame_programados,
+            text="📅 AVISOS PROGRAMADOS",
+            font=('Arial', 14, 'bold'),
+            fg='#00bcd4',
+            bg='#263238',
+            bd=2
+        )
+        lista_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        
+        self.tree_programados = ttk.Treeview(
+            lista_frame,
+            columns=('proxima', 'repetir', 'destino', 'mensaje'),
+            show='headings',
+            height=10
+        )
+        for columna, titulo, ancho in (('proxima', '🕐 Próximo envío', 150), ('repetir', '🔁 Repetir', 120),
+                                       ('destino', '🎯 Destino', 180), ('mensaje', '💬 Mensaje', 400)):
+            self.tree_programados.heading(columna, text=titulo)
+            self.tree_programados.column(columna, width=ancho)
+        self.tree_programados.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        self.actualizar_destinos_programados()
+        self.actualizar_tabla_programaciones()
+    
+    def actualizar_destinos_programados(self):
+        """Opciones de destino: todas las PCs, cada grupo y cada PC"""
+        self.destinos_programados = {"📢 Todas las PCs": DESTINO_TODAS}
+        grupos = set(self.grupos) | {pc['grupo'] for pc in self.computadoras if pc.get('grupo')}
+        for grupo in sorted(grupos):
+            self.destinos_programados[f"👥 Grupo: {grupo}"] = grupo
+        for pc in self.computadoras:
+            self.destinos_programados[f"💻 {pc['nombre']} ({pc['ip']})"] = [pc['ip']]
+        self.combo_destino_programado['values'] = list(self.destinos_programados)
+        if not self.combo_destino_programado.get():
+            self.combo_destino_programado.current(0)
+    
+    def describir_destino(self, destino):
+        """Texto de un destino programado para la tabla y el log"""
+        if destino == DESTINO_TODAS:
+            return "Todas las PCs"
+        if isinstance(destino, list):
+            return ', '.join(destino)
+        return f"Grupo: {destino}"
+    
+    def programar_aviso(self):
+        """Crea una programación con los datos del formulario"""
+        mensaje = self.entry_mensaje_programado.get().strip()
+        fecha = self.entry_fecha_programada.get().strip()
+        cron = self.entry_cron_programado.get().strip()
+        if not mensaje:
+            messagebox.showerror("Error", "Escribe un mensaje")
+            return
+        if bool(fecha) == bool(cron):
+            messagebox.showerror("Error", "Indica una fecha para un aviso único o una expresión cron para repetirlo")
+            return
+        
+        destino = self.destinos_programados.get(self.combo_destino_programado.get(), DESTINO_TODAS)
+        try:
+            programacion = self.programador.programar(
+                mensaje,
+                destino,
+                cuando=interpretar_fecha(fecha) if fecha else None,
+                cron=cron or None,
+                auto_cerrar=self.var_auto_cerrar_programado.get()
+            )
+        except ValueError as e:
+            messagebox.showerror("Error", f"Fecha o expresión cron inválida:\n{e}")
+            return
+        
+        self.agregar_log(f"⏰ Aviso programado para {programacion['proxima'].replace('T', ' ')}: {mensaje}")
+        self.entry_mensaje_programado.delete(0, tk.END)
+        self.entry_fecha_programada.delete(0, tk.END)
+        self.entry_cron_programado.delete(0, tk.END)
+        self.actualizar_tabla_programaciones()
+    
+    def eliminar_programacion(self):
+        """Elimina la programación seleccionada"""
+        seleccion = self.tree_programados.selection()
+        if not seleccion:
+            messagebox.showerror("Error", "Selecciona un aviso programado")
+            return
+        
+        programacion = self.programador.cancelar(seleccion[0])
+        if programacion:
+            self.agregar_log(f"🗑️ Aviso programado eliminado: {programacion['mensaje']}")
+        self.actualizar_tabla_programaciones()
+    
+    def actualizar_tabla_programaciones(self):
+        """Muestra las programaciones en orden de próximo envío"""
+        self.tree_programados.delete(*self.tree_programados.get_children())
+        for programacion in self.programador.listar():
+            self.tree_programados.insert('', 'end', iid=programacion['id'], values=(
+                programacion['proxima'].replace('T', ' ')[:16],
+                programacion['cron'] or 'Una vez',
+                self.describir_destino(programacion['destino']),
+                programacion['mensaje']
+            ))
+    
+    def al_vencer_programacion(self, programacion):
+        """Llamado por el hilo del programador: el envío sigue en un hilo aparte"""
+        threading.Thread(target=self.enviar_programado, args=(programacion,), daemon=True).start()
+        self.ventana.after(0, self.actualizar_tabla_programaciones)
+    
+    def enviar_programado(self, programacion):
+        """Envía un aviso programado a su destino y registra el informe de entrega"""
+        try:
+            ips = ips_de_destino(programacion['destino'], self.computadoras, self.grupos)
+        except ValueError as e:
+            self.log_desde_hilo(f"❌ Aviso programado sin destino: {e}")
+            return
+        
+        aviso = self.crear_aviso_admin(programacion['mensaje'])
+        aviso['auto_cerrar'] = programacion.get('auto_cerrar', False)
+        informe = enviar_masivo(aviso, ips, self.sesiones.solicitar, prioridad=prioridad_de_envio(aviso, masivo=True),
+                                **self.opciones_envio_masivo())
+        self.entregas.registrar_informe(aviso, informe)
+        self.reintentar_fallidos(aviso, informe)
+        self.ventana.after(0, self.sincronizar_estados_pcs)
+        self.log_desde_hilo(f"⏰ Aviso programado '{programacion['mensaje']}': {informe.texto_resumen()}")
+    
     def crear_pestaña_admin(self):
         """Pestaña de administración de múltiples PCs"""
         frame_admin = tk.Frame(self.notebook, bg='#1e2832')
@@ -647,13 +989,23 @@ class SistemaAvisosUnificado:
             padx=10
         ).pack(side='left', padx=5)
         
+        tk.Button(
+            controles_pc,
+            text="🔍 Descubrir",
+            command=self.descubrir_pcs_dialog,
+            bg='#009688',
+            fg='white',
+            font=('Arial', 10, 'bold'),
+            padx=10
+        ).pack(side='left', padx=5)
+        
         # TreeView de computadoras
         tree_frame = tk.Frame(pc_frame, bg='#263238')
         tree_frame.pack(fill='both', expand=True, padx=10, pady=(0, 10))
         
         self.tree_pcs = ttk.Treeview(
             tree_frame,
-            columns=('ip', 'estado'),
+            columns=('ip', 'estado', 'rtt', 'rtt_min', 'rtt_prom', 'rtt_p95', 'tendencia'),
             show='tree headings',
             height=12
         )
@@ -661,10 +1013,18 @@ class SistemaAvisosUnificado:
         self.tree_pcs.heading('#0', text='Nombre')
         self.tree_pcs.heading('ip', text='IP')
         self.tree_pcs.heading('estado', text='Estado')
+        self.tree_pcs.heading('rtt', text='RTT ms')
+        self.tree_pcs.heading('rtt_min', text='Mín')
+        self.tree_pcs.heading('rtt_prom', text='Prom')
+        self.tree_pcs.heading('rtt_p95', text='p95')
+        self.tree_pcs.heading('tendencia', text='Tendencia')
         
         self.tree_pcs.column('#0', width=150)
         self.tree_pcs.column('ip', width=120)
         self.tree_pcs.column('estado', width=80)
+        for columna in ('rtt', 'rtt_min', 'rtt_prom', 'rtt_p95'):
+            self.tree_pcs.column(columna, width=60, anchor='e')
+        self.tree_pcs.column('tendencia', width=120)
         
         scrollbar_tree = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree_pcs.yview)
         self.tree_pcs.configure(yscrollcommand=scrollbar_tree.set)
@@ -673,6 +1033,10 @@ class SistemaAvisosUnificado:
         scrollbar_tree.pack(side="right", fill="y")
         
         self.tree_pcs.bind('<<TreeviewSelect>>', self.on_select_pc)
+        self.actualizar_columnas_rtt()
+        
+        # Percentiles de latencia de entrega
+        self.crear_panel_latencias(left_admin)
         
         # Panel de acciones
         acciones_frame = tk.LabelFrame(
@@ -700,17 +1064,17 @@ class SistemaAvisosUnificado:
         
         # Botones de avisos individuales
         avisos_ind = [
-            ("🚨 URGENTE", "¡ATENCIÓN URGENTE! Necesito tu ayuda.", '#f44336'),
-            ("✅ LISTO", "Todo está listo. Puedes continuar.", '#4caf50'),
-            ("⏰ TIEMPO", "¡Se agota el tiempo! Date prisa.", '#ff9800'),
-            ("❓ PREGUNTA", "Tengo una pregunta para ti.", '#3f51b5'),
+            ("🚨 URGENTE", "¡ATENCIÓN URGENTE! Necesito tu ayuda.", '#f44336', True),
+            ("✅ LISTO", "Todo está listo. Puedes continuar.", '#4caf50', False),
+            ("⏰ TIEMPO", "¡Se agota el tiempo! Date prisa.", '#ff9800', False),
+            ("❓ PREGUNTA", "Tengo una pregunta para ti.", '#3f51b5', False),
         ]
         
-        for texto, mensaje, color in avisos_ind:
+        for texto, mensaje, color, urgente in avisos_ind:
             tk.Button(
                 acciones_inner,
                 text=texto,
-                command=lambda m=mensaje: self.enviar_a_pc_seleccionada(m),
+                command=lambda m=mensaje, u=urgente: self.enviar_a_pc_seleccionada(m, u),
                 bg=color,
                 fg='white',
                 font=('Arial', 10, 'bold'),
@@ -753,22 +1117,33 @@ class SistemaAvisosUnificado:
         
         # Botones masivos
         avisos_masivos = [
-            ("🔥 EMERGENCIA GENERAL", "¡EMERGENCIA! Todos deben prestar atención.", '#d32f2f'),
-            ("📝 REUNIÓN AHORA", "Reunión inmediata en sala principal.", '#1976d2'),
-            ("🏠 FIN DEL DÍA", "Fin de jornada laboral. ¡Hasta mañana!", '#388e3c'),
+            ("🔥 EMERGENCIA GENERAL", "¡EMERGENCIA! Todos deben prestar atención.", '#d32f2f', True),
+            ("📝 REUNIÓN AHORA", "Reunión inmediata en sala principal.", '#1976d2', False),
+            ("🏠 FIN DEL DÍA", "Fin de jornada laboral. ¡Hasta mañana!", '#388e3c', False),
         ]
         
-        for texto, mensaje, color in avisos_masivos:
+        for texto, mensaje, color, urgente in avisos_masivos:
             tk.Button(
                 masivos_inner,
                 text=texto,
-                command=lambda m=mensaje: self.enviar_a_todas_pcs(m),
+                command=lambda m=mensaje, u=urgente: self.enviar_a_todas_pcs(m, u),
                 bg=color,
                 fg='white',
                 font=('Arial', 10, 'bold'),
                 pady=5
             ).pack(fill='x', pady=2)
         
+        self.var_urgente_masivo = tk.BooleanVar()
+        tk.Checkbutton(
+            masivos_inner,
+            text="🚨 Urgente (sale antes que los envíos en curso)",
+            variable=self.var_urgente_masivo,
+            bg='#263238',
+            fg='white',
+            selectcolor='#37474f',
+            font=('Arial', 10)
+        ).pack(anchor='w', pady=(10, 0))
+        
         tk.Button(
             masivos_inner,
             text="📤 ENVIAR MENSAJE PERSONALIZADO A TODAS",
@@ -779,9 +1154,205 @@ class SistemaAvisosUnificado:
             pady=8
         ).pack(fill='x', pady=(10, 0))
         
+        # Reintentos en curso de los envíos fallidos
+        self.crear_panel_reintentos(right_admin)
+        
         # Cargar computadoras
         self.actualizar_tree_pcs()
     
+    def crear_panel_latencias(self, padre):
+        """Tabla con los percentiles de latencia de entrega por PC o por envío masivo"""
+        latencias_frame = tk.LabelFrame(
+            padre,
+            text="📈 LATENCIA DE ENTREGA",
+            font=('Arial', 12, 'bold'),
+            fg='#00bcd4',
+            bg='#263238',
+            bd=2
+        )
+        latencias_frame.pack(fill='both', expand=True, pady=(10, 0))
+        
+        controles = tk.Frame(latencias_frame, bg='#263238')
+        controles.pack(fill='x', padx=10, pady=(10, 5))
+        
+        self.combo_vista_latencias = ttk.Combobox(
+            controles,
+            values=["Por PC", "Por envío masivo"],
+            state='readonly',
+            width=20
+        )
+        self.combo_vista_latencias.current(0)
+        self.combo_vista_latencias.bind('<<ComboboxSelected>>', lambda e: self.actualizar_tabla_latencias())
+        self.combo_vista_latencias.pack(side='left', padx=5)
+        
+        tk.Button(
+            controles,
+            text="🔄 Actualizar",
+            command=self.actualizar_tabla_latencias,
+            bg='#2196f3',
+            fg='white',
+            font=('Arial', 10, 'bold'),
+            padx=10
+        ).pack(side='left', padx=5)
+        
+        self.tree_latencias = ttk.Treeview(
+            latencias_frame,
+            columns=('envios', 'ok', 'p50', 'p95', 'p99'),
+            show='tree headings',
+            height=6
+        )
+        self.tree_latencias.heading('#0', text='PC / Envío')
+        for columna, titulo in (('envios', 'Envíos'), ('ok', 'OK'), ('p50', 'p50 ms'),
+                                ('p95', 'p95 ms'), ('p99', 'p99 ms')):
+            self.tree_latencias.heading(columna, text=titulo)
+            self.tree_latencias.column(columna, width=60, anchor='center')
+        self.tree_latencias.column('#0', width=180)
+        self.tree_latencias.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        
+        self.actualizar_tabla_latencias()
+    
+    def actualizar_tabla_latencias(self):
+        """Recalcula los percentiles a partir del registro de entregas"""
+        self.tree_latencias.delete(*self.tree_latencias.get_children())
+        
+        if self.combo_vista_latencias.current() == 0:
+            nombres = {pc['ip']: pc['nombre'] for pc in self.computadoras}
+            filas = [
+                (f"{nombres.get(ip, ip)} ({ip})" if ip in nombres else ip, resumen)
+                for ip, resumen in sorted(self.entregas.latencias_por_pc().items())
+            ]
+        else:
+            filas = [
+                (f"{datetime.fromtimestamp(d['encolado']).strftime('%d/%m %H:%M:%S')} - {d['mensaje'][:30]}", d)
+                for d in self.entregas.latencias_por_difusion()
+            ]
+        
+        for etiqueta, resumen in filas:
+            self.tree_latencias.insert('', 'end', text=etiqueta, values=(
+                resumen['envios'], resumen['ok'],
+                *('-' if resumen[p] is None else f"{resumen[p]:.0f}" for p in ('p50', 'p95', 'p99'))
+            ))
+    
+    def crear_panel_reintentos(self, padre):
+        """Tabla de reintentos pendientes con opción de cancelarlos"""
+        reintentos_frame = tk.LabelFrame(
+            padre,
+            text="🔁 REINTENTOS EN CURSO",
+            font=('Arial', 12, 'bold'),
+            fg='#00bcd4',
+            bg='#263238',
+            bd=2
+        )
+        reintentos_frame.pack(fill='both', expand=True, pady=(10, 0))
+        
+        controles = tk.Frame(reintentos_frame, bg='#263238')
+        controles.pack(fill='x', padx=10, pady=(10, 5))
+        
+        tk.Button(
+            controles,
+            text="❌ Cancelar reintento",
+            command=self.cancelar_reintento,
+            bg='#f44336',
+            fg='white',
+            font=('Arial', 10, 'bold'),
+            padx=10
+        ).pack(side='left', padx=5)
+        
+        tk.Button(
+            controles,
+            text="🗑️ Cancelar todos",
+            command=self.cancelar_todos_reintentos,
+            bg='#795548',
+            fg='white',
+            font=('Arial', 10, 'bold'),
+            padx=10
+        ).pack(side='left', padx=5)
+        
+        self.label_reintentos = tk.Label(controles, text="", bg='#263238', fg='#81c784', font=('Arial', 10))
+        self.label_reintentos.pack(side='left', padx=10)
+        
+        self.tree_reintentos = ttk.Treeview(
+            reintentos_frame,
+            columns=('ip', 'intentos', 'proximo', 'error'),
+            show='tree headings',
+            height=5
+        )
+        self.tree_reintentos.heading('#0', text='Mensaje')
+        for columna, titulo, ancho in (('ip', 'IP', 110), ('intentos', 'Intentos', 60),
+                                       ('proximo', 'Próximo', 70), ('error', 'Último error', 90)):
+            self.tree_reintentos.heading(columna, text=titulo)
+            self.tree_reintentos.column(columna, width=ancho, anchor='center')
+        self.tree_reintentos.column('#0', width=160)
+        self.tree_reintentos.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        
+        self.claves_reintentos = {}
+        self.actualizar_tabla_reintentos()
+    
+    def actualizar_tabla_reintentos(self):
+        """Refresca cada segundo los reintentos pendientes conservando la selección"""
+        seleccion = self.tree_reintentos.selection()
+        self.tree_reintentos.delete(*self.tree_reintentos.get_children())
+        self.claves_reintentos = {}
+        ahora = time.monotonic()
+        for reintento in self.reintentos.listar():
+            iid = f"{reintento['clave'][0]}@{reintento['ip']}"
+            self.claves_reintentos[iid] = reintento['clave']
+            self.tree_reintentos.insert('', 'end', iid=iid, text=reintento['aviso']['mensaje'][:40], values=(
+                reintento['ip'],
+                reintento['intentos'],
+                f"{max(0, reintento['proximo'] - ahora):.0f} s",
+                reintento['ultimo_error']
+            ))
+        self.tree_reintentos.selection_set([iid for iid in seleccion if iid in self.claves_reintentos])
+        
+        stats = self.reintentos.estadisticas
+        self.label_reintentos.config(
+            text=f"Entregados: {stats['entregados']} | Abandonados: {stats['abandonados']}"
+        )
+        self.ventana.after(1000, self.actualizar_tabla_reintentos)
+    
+    def cancelar_reintento(self):
+        """Cancela los reintentos seleccionados"""
+        seleccion = self.tree_reintentos.selection()
+        if not seleccion:
+            messagebox.showerror("Error", "Selecciona un reintento")
+            return
+        for iid in seleccion:
+            self.reintentos.cancelar(self.claves_reintentos[iid])
+    
+    def cancelar_todos_reintentos(self):
+        """Cancela todos los reintentos pendientes"""
+        if self.reintentos.listar() and messagebox.askyesno("Confirmar", "¿Cancelar todos los reintentos pendientes?"):
+            self.reintentos.cancelar_todos()
+    
+    def reintentar(self, aviso, ip, error, puerto):
+        """Deja el aviso en reintento para esa PC, en el puerto del envío fallido, si el error lo admite"""
+        if self.reintentos.agregar(aviso, ip, error, puerto):
+            self.log_desde_hilo(f"🔁 Se reintentará el envío a {ip} ({error})")
+    
+    def reintentar_fallidos(self, aviso, informe):
+        """Deja en reintento las PCs que fallaron en un envío masivo, en el mismo puerto"""
+        cantidad = sum(self.reintentos.agregar(aviso, r['ip'], r['error'], informe.puerto) for r in informe.fallidos)
+        if cantidad:
+            self.log_desde_hilo(f"🔁 {cantidad} PCs quedan en reintento")
+    
+    def al_terminar_reintento(self, reintento):
+        """Llamado cuando un reintento llega, se abandona o se cancela"""
+        ip = reintento['ip']
+        if reintento['estado'] == 'entregado':
+            self.log_desde_hilo(f"✅ Aviso entregado a {ip} tras {reintento['intentos'] + 1} reintentos")
+            self.ventana.after(0, self.sincronizar_estados_pcs)
+        elif reintento['estado'] == 'abandonado':
+            self.log_desde_hilo(f"❌ Se abandonó el envío a {ip} tras {reintento['intentos']} reintentos "
+                                f"({reintento['ultimo_error']})")
+        else:
+            self.log_desde_hilo(f"🗑️ Reintento a {ip} cancelado")
+    
+    def guardar_entregas(self):
+        """Guarda periódicamente el lote pendiente del registro de entregas"""
+        self.entregas.guardar()
+        self.ventana.after(10000, self.guardar_entregas)
+    
     def crear_pestaña_config(self):
         """Pestaña de configuración"""
         frame_config = tk.Frame(self.notebook, bg='#1e2832')
@@ -798,14 +1369,146 @@ class SistemaAvisosUnificado:
         )
         general_frame.pack(fill='x', padx=20, pady=20)
         
-        # Configuraciones aquí
-        tk.Label(
-            general_frame,
-            text="Configuraciones del sistema aparecerán aquí",
-            font=('Arial', 12),
+        general_inner = tk.Frame(general_frame, bg='#263238')
+        general_inner.pack(fill='x', padx=15, pady=15)
+        
+        # Sesiones persistentes: varios avisos por conexión al mismo destino
+        self.var_sesiones = tk.BooleanVar(value=self.sesiones.activo)
+        tk.Checkbutton(
+            general_inner,
+            text="🔗 Reutilizar conexiones abiertas con las PCs destino (pool de conexiones)",
+            variable=self.var_sesiones,
+            command=self.cambiar_modo_sesion,
+            bg='#263238',
             fg='white',
-            bg='#263238'
-        ).pack(pady=20)
+            selectcolor='#37474f',
+            font=('Arial', 12)
+        ).pack(anchor='w')
+        
+        self.var_multicast = tk.BooleanVar(value=self.config_envio.get('multicast', False))
+        tk.Checkbutton(
+            general_inner,
+            text="📡 Enviar a todas las PCs por multicast (reintento por TCP a las que no confirmen)",
+            variable=self.var_multicast,
+            command=self.cambiar_modo_multicast,
+            bg='#263238',
+            fg='white',
+            selectcolor='#37474f',
+            font=('Arial', 12)
+        ).pack(anchor='w')
+        
+        self.var_monitor = tk.BooleanVar(value=self.config_envio.get('monitor', True))
+        tk.Checkbutton(
+            general_inner,
+            text="🩺 Vigilar el estado de las PCs en segundo plano",
+            variable=self.var_monitor,
+            command=self.cambiar_monitor,
+            bg='#263238',
+            fg='white',
+            selectcolor='#37474f',
+            font=('Arial', 12)
+        ).pack(anchor='w')
+        
+        self.label_metricas_pool = tk.Label(
+            general_inner,
+            text="",
+            bg='#263238',
+            fg='#81c784',
+            font=('Arial', 11)
+        )
+        self.label_metricas_pool.pack(anchor='w', pady=(10, 0))
+        
+        self.label_metricas_despacho = tk.Label(
+            general_inner,
+            text="",
+            bg='#263238',
+            fg='#81c784',
+            font=('Arial', 11)
+        )
+        self.label_metricas_despacho.pack(anchor='w')
+        
+        self.label_metricas_monitor = tk.Label(
+            general_inner,
+            text="",
+            bg='#263238',
+            fg='#81c784',
+            font=('Arial', 11)
+        )
+        self.label_metricas_monitor.pack(anchor='w')
+        
+        self.label_metricas_latidos = tk.Label(
+            general_inner,
+            text="",
+            bg='#263238',
+            fg='#81c784',
+            font=('Arial', 11)
+        )
+        self.label_metricas_latidos.pack(anchor='w')
+        self.actualizar_metricas_pool()
+    
+    def cambiar_modo_sesion(self):
+        """Activa o desactiva el pool de conexiones de envío"""
+        activo = self.var_sesiones.get()
+        self.sesiones.activo = activo
+        if not activo:
+            self.sesiones.cerrar_todas()
+        self.config_envio['sesiones_persistentes'] = activo
+        self.guardar_configuracion()
+        self.agregar_log(f"🔗 Pool de conexiones {'activado' if activo else 'desactivado'}")
+    
+    def actualizar_metricas_pool(self):
+        """Refresca los contadores del pool de conexiones de envío"""
+        stats = self.sesiones.obtener_estadisticas()
+        self.label_metricas_pool.config(
+            text=f"🔗 Pool: {stats['aciertos']} reutilizadas | {stats['fallos']} nuevas | "
+                 f"{stats['descartadas']} descartadas | {stats['libres']} libres | {stats['legacy']} legacy"
+        )
+        self.label_metricas_despacho.config(text=f"📬 Cola de envío: {self.despacho.texto_resumen()}")
+        self.label_metricas_monitor.config(text=f"🩺 Monitor: {self.monitor.texto_resumen()}")
+        self.label_metricas_latidos.config(text=f"💓 Latidos: {self.latidos.texto_resumen()}")
+        self.ventana.after(2000, self.actualizar_metricas_pool)
+    
+    def enviar_con_prioridad(self, ip, aviso, puerto, timeout):
+        """Envía un aviso a una PC por la cola de despacho y espera su confirmación"""
+        return self.despacho.enviar(
+            prioridad_de_envio(aviso), self.entregas.enviar, self.sesiones, ip, aviso, puerto, timeout
+        ).result()
+    
+    def cambiar_modo_multicast(self):
+        """Activa o desactiva el envío masivo por multicast"""
+        activo = self.var_multicast.get()
+        self.config_envio['multicast'] = activo
+        self.guardar_configuracion()
+        self.agregar_log(f"📡 Envío por multicast {'activado' if activo else 'desactivado'}")
+    
+    def cambiar_monitor(self):
+        """Activa o desactiva el monitor de PCs en segundo plano"""
+        activo = self.var_monitor.get()
+        if activo:
+            self.monitor.iniciar()
+        else:
+            self.monitor.detener()
+        self.config_envio['monitor'] = activo
+        self.guardar_configuracion()
+        self.agregar_log(f"🩺 Monitor de PCs {'activado' if activo else 'desactivado'}")
+    
+    def opciones_envio_masivo(self):
+        """Concurrencia, plazos y multicast del envío masivo según la sección 'envio'"""
+        opciones = {
+            'concurrencia': self.config_envio.get('concurrencia', CONCURRENCIA_DEFECTO),
+            'timeout_host': self.config_envio.get('timeout_host', TIMEOUT_HOST_DEFECTO),
+            'timeout_global': self.config_envio.get('timeout_global', TIMEOUT_GLOBAL_DEFECTO),
+            'estados': self.estados,
+            'timeout_sondeo': self.config_envio.get('timeout_sondeo', TIMEOUT_SONDEO_DEFECTO),
+            'despacho': self.despacho
+        }
+        if self.config_envio.get('multicast', False):
+            opciones['multicast'] = {
+                'grupo': self.config_envio.get('grupo_multicast', GRUPO_MULTICAST_DEFECTO),
+                'puerto': self.config_envio.get('puerto_multicast', PUERTO_MULTICAST_DEFECTO),
+                'espera': self.config_envio.get('espera_multicast', 1.0)
+            }
+        return opciones
     
     def crear_footer_logs(self):
         """Crea el footer con logs"""
@@ -868,14 +1571,14 @@ class SistemaAvisosUnificado:
         try:
             puerto = int(self.entry_puerto_servidor.get().strip())
             
-            self.socket_servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket_servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.socket_servidor.bind(('0.0.0.0', puerto))
-            self.socket_servidor.listen(5)
-            
+            self.servidor_async = ServidorAvisosAsync.desde_configuracion(
+                self.config_servidor,
+                puerto=puerto,
+                cola_eventos=self.cola_eventos
+            )
+            self.servidor_async.iniciar()
             self.servidor_activo = True
-            self.hilo_servidor = threading.Thread(target=self.ejecutar_servidor, daemon=True)
-            self.hilo_servidor.start()
+            self.actualizar_metricas_servidor()
             
             # Actualizar interfaz
             self.btn_servidor.config(text="🛑 DETENER SERVIDOR", bg='#f44336')
@@ -883,17 +1586,18 @@ class SistemaAvisosUnificado:
             self.label_estado_servidor.config(text=f"🟢 Servidor Activo - Puerto {puerto}", fg='#4caf50')
             
             self.agregar_log(f"🚀 Servidor iniciado en puerto {puerto}")
-            self.agregar_log_servidor(f"🚀 Servidor iniciado en 0.0.0.0:{puerto}")
             
         except Exception as e:
+            self.servidor_async = None
             messagebox.showerror("Error", f"No se pudo iniciar el servidor: {e}")
             self.agregar_log(f"❌ Error iniciando servidor: {e}")
     
     def detener_servidor(self):
         """Detiene el servidor"""
         self.servidor_activo = False
-        if self.socket_servidor:
-            self.socket_servidor.close()
+        if self.servidor_async:
+            self.servidor_async.detener()
+            self.servidor_async = None
         
         # Actualizar interfaz
         self.btn_servidor.config(text="🖥️ INICIAR SERVIDOR", bg='#4caf50')
@@ -903,243 +1607,342 @@ class SistemaAvisosUnificado:
         self.agregar_log("🛑 Servidor detenido")
         self.agregar_log_servidor("🛑 Servidor detenido")
     
-    def ejecutar_servidor(self):
-        """Ejecuta el loop del servidor"""
-        while self.servidor_activo:
-            try:
-                cliente_socket, direccion = self.socket_servidor.accept()
-                self.agregar_log(f"📡 Conexión desde: {direccion[0]}")
-                self.agregar_log_servidor(f"📡 Conexión recibida desde: {direccion}")
-                
-                # Manejar cliente en hilo separado
-                threading.Thread(
-                    target=self.manejar_cliente_servidor,
-                    args=(cliente_socket, direccion),
-                    daemon=True
-                ).start()
-                
-            except socket.error:
-                if self.servidor_activo:
-                    self.agregar_log("❌ Error en socket del servidor")
-                    self.agregar_log_servidor("❌ Error en socket del servidor")
+    def actualizar_metricas_servidor(self):
+        """Muestra profundidad de cola y rechazos del receptor mientras está activo"""
+        if not self.servidor_activo or not self.servidor_async:
+            return
+        
+        stats = self.servidor_async.obtener_estadisticas()
+        self.label_metricas_servidor.config(
+            text=f"📊 Cola: {stats['cola_pendientes']}/{stats['max_pendientes']} | "
+                 f"Rechazados: {stats['rechazados']} | "
+                 f"Duplicados: {stats['duplicados']} | "
+                 f"Limitados: {stats['limitados']} | "
+                 f"Conexiones activas: {stats['conexiones_activas']} | "
+                 f"Avisos: {stats['avisos']} | "
+                 f"⏱️ Pantalla: {self.tiempos_pantalla.resumen()}"
+        )
+        self.ventana.after(1000, self.actualizar_metricas_servidor)
     
-    def manejar_cliente_servidor(self, cliente_socket, direccion):
-        """Maneja clientes del servidor"""
+    def procesar_cola_eventos(self, max_eventos=200):
+        """Procesa en el hilo de la GUI los eventos que llegan del servidor asíncrono"""
         try:
-            datos = cliente_socket.recv(1024).decode('utf-8')
-            if datos:
-                aviso = json.loads(datos)
-                self.agregar_log(f"📨 Aviso recibido: {aviso.get('mensaje', 'Sin mensaje')}")
-                self.agregar_log_servidor(f"📨 Aviso recibido: {aviso}")
-                
-                # Mostrar aviso en pantalla
-                self.mostrar_aviso_recibido(aviso, direccion)
-                
-                # Confirmar recepción
-                respuesta = {"status": "ok", "mensaje": "Aviso recibido"}
-                cliente_socket.send(json.dumps(respuesta).encode('utf-8'))
-                
-        except Exception as e:
-            self.agregar_log(f"❌ Error manejando cliente: {e}")
-            self.agregar_log_servidor(f"❌ Error manejando cliente {direccion}: {e}")
-        finally:
-            cliente_socket.close()
-    
-    def mostrar_aviso_recibido(self, aviso, origen):
-        """Muestra el aviso recibido en una ventana mejorada con icono"""
-        def crear_ventana_aviso():
-            ventana_aviso = tk.Toplevel()
-            ventana_aviso.title("🚨 AVISO RECIBIDO 🚨")
-            ventana_aviso.attributes('-fullscreen', True)
-            ventana_aviso.attributes('-topmost', True)
-            ventana_aviso.configure(bg='#1a237e')
-            
-            # Configurar icono si está disponible
-            if self.icono_app:
-                ventana_aviso.iconphoto(False, self.icono_app)
-            
-            # Frame principal con gradiente visual
-            frame_principal = tk.Frame(ventana_aviso, bg='#1a237e')
-            frame_principal.pack(expand=True, fill='both', padx=80, pady=80)
-            
-            # Frame superior con icono y título
-            frame_header = tk.Frame(frame_principal, bg='#1a237e')
-            frame_header.pack(pady=30)
-            
-            # Icono grande en el mensaje
-            if self.icono_mensaje:
-                icono_label = tk.Label(
-                    frame_header,
-                    image=self.icono_mensaje,
-                    bg='#1a237e'
-                )
-                icono_label.pack(pady=20)
-            
-            # Título parpadeante mejorado
-            titulo = tk.Label(
+            for _ in range(max_eventos):
+                evento = self.cola_eventos.get_nowait()
+                if evento[0] == 'aviso':
+                    _, aviso, direccion, leido = evento
+                    self.agregar_log(f"📨 Aviso recibido: {aviso.get('mensaje', 'Sin mensaje')}")
+                    self.agregar_log_servidor(f"📨 Aviso recibido de {direccion[0]}: {aviso}")
+                    
+                    # Mostrar aviso en pantalla
+                    self.mostrar_aviso_recibido(aviso, direccion, leido)
+                elif evento[0] == 'log':
+                    self.agregar_log_servidor(evento[1])
+        except queue.Empty:
+            pass
+        
+        self.ventana.after(50, self.procesar_cola_eventos)
+    
+    def mostrar_aviso_recibido(self, aviso, origen, leido=None):
+        """Agrega el aviso a la cola de pantalla; una sola ventana muestra todos los pendientes"""
+        self.cola_pantalla.agregar(aviso, origen, leido)
+        
+        # Una ráfaga de avisos se resuelve con un único refresco de la ventana
+        if not self.refresco_aviso_pendiente:
+            self.refresco_aviso_pendiente = True
+            self.ventana.after_idle(self.actualizar_ventana_aviso)
+    
+    def crear_ventana_aviso(self):
+        """Construye la ventana de avisos en pantalla completa con icono, oculta hasta usarla"""
+        ventana_aviso = tk.Toplevel()
+        ventana_aviso.title("🚨 AVISO RECIBIDO 🚨")
+        ventana_aviso.attributes('-fullscreen', True)
+        ventana_aviso.attributes('-topmost', True)
+        ventana_aviso.configure(bg='#1a237e')
+        ventana_aviso.protocol("WM_DELETE_WINDOW", self.confirmar_aviso)
+        
+        # Configurar icono si está disponible
+        if self.icono_app:
+            ventana_aviso.iconphoto(False, self.icono_app)
+        
+        # Frame principal con gradiente visual
+        frame_principal = tk.Frame(ventana_aviso, bg='#1a237e')
+        frame_principal.pack(expand=True, fill='both', padx=80, pady=80)
+        
+        # Frame superior con icono y título
+        frame_header = tk.Frame(frame_principal, bg='#1a237e')
+        frame_header.pack(pady=30)
+        
+        # Icono grande en el mensaje
+        if self.icono_mensaje:
+            icono_label = tk.Label(
                 frame_header,
-                text="🚨 AVISO IMPORTANTE 🚨",
-                font=('Arial', 42, 'bold'),
-                fg='#ffeb3b',
+                image=self.icono_mensaje,
                 bg='#1a237e'
             )
-            titulo.pack(pady=20)
-            
-            # Frame para el mensaje con borde
-            frame_mensaje = tk.Frame(frame_principal, bg='#3f51b5', relief='raised', bd=3)
-            frame_mensaje.pack(pady=30, padx=50, fill='x')
-            
-            # Mensaje principal con mejor formato
-            mensaje_texto = aviso.get('mensaje', 'Aviso sin mensaje')
-            mensaje = tk.Label(
-                frame_mensaje,
-                text=mensaje_texto,
-                font=('Arial', 32, 'bold'),
-                fg='white',
-                bg='#3f51b5',
-                wraplength=1000,
-                justify='center',
-                pady=30
-            )
-            mensaje.pack(pady=20, padx=30)
-            
-            # Información adicional con mejor diseño
-            timestamp = aviso.get('timestamp', datetime.now().isoformat())
+            icono_label.pack(pady=20)
+        
+        # Título parpadeante mejorado
+        self.titulo_aviso = tk.Label(
+            frame_header,
+            text="🚨 AVISO IMPORTANTE 🚨",
+            font=('Arial', 42, 'bold'),
+            fg='#ffeb3b',
+            bg='#1a237e'
+        )
+        self.titulo_aviso.pack(pady=20)
+        
+        # Frame para el mensaje con borde
+        frame_mensaje = tk.Frame(frame_principal, bg='#3f51b5', relief='raised', bd=3)
+        frame_mensaje.pack(pady=30, padx=50, fill='x')
+        
+        # Mensaje principal con mejor formato
+        self.label_mensaje_aviso = tk.Label(
+            frame_mensaje,
+            font=('Arial', 32, 'bold'),
+            fg='white',
+            bg='#3f51b5',
+            wraplength=1000,
+            justify='center',
+            pady=30
+        )
+        self.label_mensaje_aviso.pack(pady=20, padx=30)
+        
+        # Información adicional con mejor diseño
+        frame_info = tk.Frame(frame_principal, bg='#1a237e')
+        frame_info.pack(pady=20)
+        
+        self.label_info_aviso = tk.Label(
+            frame_info,
+            font=('Arial', 18, 'bold'),
+            fg='#81c784',
+            bg='#1a237e',
+            justify='center'
+        )
+        self.label_info_aviso.pack(pady=10)
+        
+        # Avisos en cola detrás del actual
+        self.label_pendientes_aviso = tk.Label(
+            frame_info,
+            font=('Arial', 16, 'bold'),
+            fg='#ffeb3b',
+            bg='#1a237e'
+        )
+        self.label_pendientes_aviso.pack(pady=5)
+        
+        # Frame de botones mejorado
+        frame_botones = tk.Frame(frame_principal, bg='#1a237e')
+        frame_botones.pack(pady=40)
+        
+        estilo_boton = {'font': ('Arial', 16, 'bold'), 'fg': 'white', 'padx': 30, 'pady': 15,
+                        'relief': 'raised', 'bd': 3}
+        
+        self.btn_anterior_aviso = tk.Button(
+            frame_botones, text="◀ ANTERIOR", command=self.aviso_anterior, bg='#5c6bc0', **estilo_boton
+        )
+        self.btn_anterior_aviso.pack(side='left', padx=20)
+        
+        btn_cerrar = tk.Button(
+            frame_botones, text="✅ ENTENDIDO", command=self.confirmar_aviso, bg='#4caf50', **estilo_boton
+        )
+        btn_cerrar.pack(side='left', padx=20)
+        
+        btn_responder = tk.Button(
+            frame_botones, text="💬 RESPONDER", command=self.responder_aviso, bg='#2196f3', **estilo_boton
+        )
+        btn_responder.pack(side='left', padx=20)
+        
+        self.btn_todos_aviso = tk.Button(
+            frame_botones, text="✅ ENTENDIDO TODOS", command=self.confirmar_todos_avisos, bg='#388e3c',
+            **estilo_boton
+        )
+        self.btn_todos_aviso.pack(side='left', padx=20)
+        
+        self.btn_siguiente_aviso = tk.Button(
+            frame_botones, text="SIGUIENTE ▶", command=self.aviso_siguiente, bg='#5c6bc0', **estilo_boton
+        )
+        self.btn_siguiente_aviso.pack(side='left', padx=20)
+        
+        # Atajos de teclado
+        ventana_aviso.bind('<Escape>', lambda e: self.confirmar_aviso())
+        ventana_aviso.bind('<Return>', lambda e: self.confirmar_aviso())
+        ventana_aviso.bind('<space>', lambda e: self.confirmar_aviso())
+        ventana_aviso.bind('<Left>', lambda e: self.aviso_anterior())
+        ventana_aviso.bind('<Right>', lambda e: self.aviso_siguiente())
+        
+        # Efecto de pulsación en botones
+        def efecto_hover_enter(event):
+            event.widget.config(relief='sunken')
+        
+        def efecto_hover_leave(event):
+            event.widget.config(relief='raised')
+        
+        for boton in frame_botones.winfo_children():
+            boton.bind('<Enter>', efecto_hover_enter)
+            boton.bind('<Leave>', efecto_hover_leave)
+        
+        # Medir cuándo se vuelve visible tras cada aviso
+        ventana_aviso.bind('<Map>', self.al_mostrar_ventana_aviso)
+        
+        ventana_aviso.withdraw()
+        self.ventana_aviso = ventana_aviso
+    
+    def mostrar_ventana_aviso(self):
+        """Hace visible la ventana de avisos ya construida"""
+        self.ventana_aviso_visible = True
+        self.ventana_aviso.deiconify()
+        self.ventana_aviso.attributes('-fullscreen', True)
+        self.ventana_aviso.lift()
+        
+        # Un único temporizador de parpadeo por ventana, haya los avisos que haya
+        self.parpadear_titulo_aviso()
+        
+        # Focus en la ventana
+        self.ventana_aviso.focus_force()
+        self.ventana_aviso.grab_set()
+    
+    def al_mostrar_ventana_aviso(self, event):
+        """Registra el tiempo desde la lectura del socket hasta que el aviso se ve"""
+        if event.widget is not self.ventana_aviso:
+            return  # <Map> también llega por cada widget hijo
+        
+        def registrar():
+            entrada = self.aviso_en_pantalla
+            if entrada is not None:
+                ms = self.tiempos_pantalla.registrar(entrada.leido)
+                self.agregar_log_servidor(f"⏱️ Aviso visible {ms:.0f} ms después de leerlo del socket")
+            # El sonido bloquea el loop, por eso va después de dibujar la ventana
+            self.reproducir_sonido_aviso()
+        
+        # Las tareas idle pendientes incluyen el redibujado de la ventana recién mapeada
+        self.ventana_aviso.after_idle(registrar)
+    
+    def actualizar_ventana_aviso(self):
+        """Muestra el aviso actual de la cola, ocultando la ventana si no queda ninguno"""
+        self.refresco_aviso_pendiente = False
+        entrada = self.cola_pantalla.actual()
+        if entrada is None:
+            self.ocultar_ventana_aviso()
+            return
+        
+        if entrada is not self.aviso_en_pantalla:
+            self.aviso_en_pantalla = entrada
+            self.cancelar_cierre_automatico()
+            self.label_mensaje_aviso.config(text=entrada.aviso.get('mensaje', 'Aviso sin mensaje'))
+            if entrada.aviso.get('auto_cerrar', False):
+                self.cuenta_cierre_aviso(entrada, 10)
+        
+        timestamp = entrada.aviso.get('timestamp', datetime.now().isoformat())
+        try:
+            fecha_hora = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).strftime('%d/%m/%Y %H:%M:%S')
+        except:
+            fecha_hora = entrada.recibido.strftime('%d/%m/%Y %H:%M:%S')
+        
+        origenes = ', '.join(entrada.origenes[:5])
+        if len(entrada.origenes) > 5:
+            origenes += f" y {len(entrada.origenes) - 5} más"
+        info = f"📍 Enviado desde: {origenes}\n⏰ Hora: {fecha_hora}"
+        if entrada.repeticiones > 1:
+            info += f"\n🔁 Recibido {entrada.repeticiones} veces"
+        self.label_info_aviso.config(text=info)
+        
+        posicion, total = self.cola_pantalla.posicion()
+        self.label_pendientes_aviso.config(
+            text=f"📬 Aviso {posicion} de {total} | {total - 1} más pendientes" if total > 1 else ""
+        )
+        self.btn_anterior_aviso.config(state='normal' if posicion > 1 else 'disabled')
+        self.btn_siguiente_aviso.config(state='normal' if posicion < total else 'disabled')
+        self.btn_todos_aviso.config(state='normal' if total > 1 else 'disabled')
+        
+        if not self.ventana_aviso_visible:
+            self.mostrar_ventana_aviso()
+    
+    def ocultar_ventana_aviso(self):
+        """Oculta la ventana de avisos, sin destruirla, cuando ya no queda ninguno pendiente"""
+        self.cancelar_cierre_automatico()
+        self.aviso_en_pantalla = None
+        if self.ventana_aviso_visible:
+            self.ventana_aviso_visible = False
+            self.ventana_aviso.after_cancel(self.id_parpadeo_aviso)
+            self.ventana_aviso.grab_release()
+            self.ventana_aviso.withdraw()
+    
+    def confirmar_aviso(self):
+        """Da por leído el aviso actual y pasa al siguiente pendiente"""
+        self.cola_pantalla.confirmar_actual()
+        self.actualizar_ventana_aviso()
+    
+    def confirmar_todos_avisos(self):
+        """Da por leídos todos los avisos pendientes"""
+        self.cola_pantalla.vaciar()
+        self.actualizar_ventana_aviso()
+    
+    def aviso_anterior(self):
+        """Muestra el aviso anterior de la cola"""
+        self.cola_pantalla.anterior()
+        self.actualizar_ventana_aviso()
+    
+    def aviso_siguiente(self):
+        """Muestra el siguiente aviso de la cola"""
+        self.cola_pantalla.siguiente()
+        self.actualizar_ventana_aviso()
+    
+    def responder_aviso(self):
+        """Permite responder al aviso actual"""
+        entrada = self.cola_pantalla.actual()
+        if entrada is None:
+            return
+        respuesta = simpledialog.askstring(
+            "Responder Aviso", 
+            "Enviar respuesta:",
+            parent=self.ventana_aviso
+        )
+        if respuesta:
+            self.enviar_respuesta_aviso(entrada.origenes[0], respuesta)
+        if self.cola_pantalla.actual() is entrada:
+            self.confirmar_aviso()
+    
+    def cuenta_cierre_aviso(self, entrada, segundos):
+        """Cuenta regresiva del aviso con auto_cerrar; sólo corre mientras está en pantalla"""
+        if entrada is not self.aviso_en_pantalla:
+            return
+        if segundos <= 0:
+            self.id_cierre_aviso = None
+            self.confirmar_aviso()
+            return
+        self.titulo_aviso.config(text=f"🚨 AVISO IMPORTANTE 🚨\nSe cerrará en {segundos} segundos")
+        self.id_cierre_aviso = self.ventana_aviso.after(
+            1000, lambda: self.cuenta_cierre_aviso(entrada, segundos - 1)
+        )
+    
+    def cancelar_cierre_automatico(self):
+        """Detiene la cuenta regresiva del aviso que deja de mostrarse"""
+        if self.id_cierre_aviso is not None:
+            self.ventana_aviso.after_cancel(self.id_cierre_aviso)
+            self.titulo_aviso.config(text="🚨 AVISO IMPORTANTE 🚨")
+        self.id_cierre_aviso = None
+    
+    def parpadear_titulo_aviso(self):
+        """Efecto de parpadeo del título mientras la ventana de avisos está visible"""
+        if not self.ventana_aviso_visible:
+            return
+        color_actual = self.titulo_aviso.cget('fg')
+        nuevo_color = '#ffffff' if color_actual == '#ffeb3b' else '#ffeb3b'
+        self.titulo_aviso.config(fg=nuevo_color)
+        self.id_parpadeo_aviso = self.ventana_aviso.after(800, self.parpadear_titulo_aviso)
+    
+    def reproducir_sonido_aviso(self):
+        """Sonido de alerta (múltiples intentos)"""
+        try:
+            import winsound
+            # Sonido más llamativo
+            for i in range(3):
+                winsound.Beep(1000, 300)
+        except:
             try:
-                fecha_hora = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).strftime('%d/%m/%Y %H:%M:%S')
+                os.system('echo \a')  # Beep del sistema
             except:
-                fecha_hora = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-                
-            frame_info = tk.Frame(frame_principal, bg='#1a237e')
-            frame_info.pack(pady=20)
-            
-            info = f"📍 Enviado desde: {origen[0]}\n⏰ Hora: {fecha_hora}"
-            info_label = tk.Label(
-                frame_info,
-                text=info,
-                font=('Arial', 18, 'bold'),
-                fg='#81c784',
-                bg='#1a237e',
-                justify='center'
-            )
-            info_label.pack(pady=10)
-            
-            # Frame de botones mejorado
-            frame_botones = tk.Frame(frame_principal, bg='#1a237e')
-            frame_botones.pack(pady=40)
-            
-            def cerrar_aviso():
-                ventana_aviso.destroy()
-            
-            def responder_aviso():
-                # Permitir responder al aviso
-                respuesta = simpledialog.askstring(
-                    "Responder Aviso", 
-                    "Enviar respuesta:",
-                    parent=ventana_aviso
-                )
-                if respuesta:
-                    self.enviar_respuesta_aviso(origen[0], respuesta)
-                cerrar_aviso()
-            
-            # Botones con mejor diseño
-            btn_cerrar = tk.Button(
-                frame_botones,
-                text="✅ ENTENDIDO",
-                command=cerrar_aviso,
-                font=('Arial', 16, 'bold'),
-                bg='#4caf50',
-                fg='white',
-                padx=30,
-                pady=15,
-                relief='raised',
-                bd=3
-            )
-            btn_cerrar.pack(side='left', padx=20)
-            
-            btn_responder = tk.Button(
-                frame_botones,
-                text="💬 RESPONDER",
-                command=responder_aviso,
-                font=('Arial', 16, 'bold'),
-                bg='#2196f3',
-                fg='white',
-                padx=30,
-                pady=15,
-                relief='raised',
-                bd=3
-            )
-            btn_responder.pack(side='left', padx=20)
-            
-            # Auto-cerrar si está configurado
-            if aviso.get('auto_cerrar', False):
-                ventana_aviso.after(10000, cerrar_aviso)
-                
-                # Mostrar cuenta regresiva
-                def actualizar_cuenta(segundos):
-                    if segundos > 0:
-                        titulo.config(text=f"🚨 AVISO IMPORTANTE 🚨\nSe cerrará en {segundos} segundos")
-                        ventana_aviso.after(1000, lambda: actualizar_cuenta(segundos - 1))
-                    else:
-                        cerrar_aviso()
-                
-                ventana_aviso.after(1000, lambda: actualizar_cuenta(9))
-            
-            # Atajos de teclado
-            ventana_aviso.bind('<Escape>', lambda e: cerrar_aviso())
-            ventana_aviso.bind('<Return>', lambda e: cerrar_aviso())
-            ventana_aviso.bind('<space>', lambda e: cerrar_aviso())
-            
-            # Efecto de parpadeo del título mejorado
-            def parpadear():
-                try:
-                    color_actual = titulo.cget('fg')
-                    nuevo_color = '#ffffff' if color_actual == '#ffeb3b' else '#ffeb3b'
-                    titulo.config(fg=nuevo_color)
-                    ventana_aviso.after(800, parpadear)
-                except:
-                    pass
-            
-            # Iniciar parpadeo
-            parpadear()
-            
-            # Efecto de pulsación en botones
-            def efecto_hover_enter(event):
-                event.widget.config(relief='sunken')
-            
-            def efecto_hover_leave(event):
-                event.widget.config(relief='raised')
-            
-            
-            btn_cerrar.bind('<Enter>', efecto_hover_enter)
-            btn_cerrar.bind('<Leave>', efecto_hover_leave)
-            btn_responder.bind('<Enter>', efecto_hover_enter)
-            btn_responder.bind('<Leave>', efecto_hover_leave)
-            
-            # Sonido de alerta (múltiples intentos)
-            def reproducir_sonido():
-                try:
-                    import winsound
-                    # Sonido más llamativo
-                    for i in range(3):
-                        winsound.Beep(1000, 300)
-                        if i < 2:
-                            ventana_aviso.after(100, lambda: None)
-                except:
-                    try:
-                        import os
-                        os.system('echo \a')  # Beep del sistema
-                    except:
-                        pass
-            
-            reproducir_sonido()
-            
-            # Focus en la ventana
-            ventana_aviso.focus_force()
-            ventana_aviso.grab_set()
-        
-        # Ejecutar en el hilo principal de la GUI
-        self.ventana.after(0, crear_ventana_aviso)
+                pass
     
     def enviar_respuesta_aviso(self, ip_origen, respuesta):
         """Envía una respuesta al aviso recibido"""
@@ -1150,6 +1953,7 @@ class SistemaAvisosUnificado:
             self.agregar_log(f"📤 Enviando respuesta a {ip_origen}")
             
             aviso_respuesta = {
+                'id': nuevo_id(),
                 'mensaje': mensaje_respuesta,
                 'timestamp': datetime.now().isoformat(),
                 'tipo': 'respuesta_aviso',
@@ -1157,11 +1961,8 @@ class SistemaAvisosUnificado:
             }
             
             def enviar():
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                    sock.settimeout(5)
-                    sock.connect((ip_origen, puerto))
-                    sock.send(json.dumps(aviso_respuesta, ensure_ascii=False).encode('utf-8'))
-                    self.agregar_log("✅ Respuesta enviada")
+                self.enviar_con_prioridad(ip_origen, aviso_respuesta, puerto, 5)
+                self.agregar_log("✅ Respuesta enviada")
             
             threading.Thread(target=enviar, daemon=True).start()
             
@@ -1200,6 +2001,7 @@ class SistemaAvisosUnificado:
                 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
                     sock.settimeout(3)
                     resultado = sock.connect_ex((ip, puerto))
+                    self.estados.marcar(ip, resultado == 0)
                     
                     if resultado == 0:
                         self.agregar_log(f"✅ Conexión exitosa a {ip}:{puerto}")
@@ -1217,9 +2019,9 @@ class SistemaAvisosUnificado:
         
         threading.Thread(target=prueba, daemon=True).start()
     
-    def enviar_aviso_rapido(self, mensaje):
+    def enviar_aviso_rapido(self, mensaje, urgente=False):
         """Envía aviso rápido"""
-        self.enviar_aviso(mensaje, auto_cerrar=True)
+        self.enviar_aviso(mensaje, auto_cerrar=True, urgente=urgente)
     
     def enviar_mensaje_personalizado(self):
         """Envía mensaje personalizado"""
@@ -1229,7 +2031,7 @@ class SistemaAvisosUnificado:
             return
         
         auto_cerrar = self.var_auto_cerrar.get()
-        self.enviar_aviso(mensaje, auto_cerrar)
+        self.enviar_aviso(mensaje, auto_cerrar, self.var_urgente.get())
     
     def probar_conexion(self):
         """Prueba la conexión con el destino"""
@@ -1243,6 +2045,7 @@ class SistemaAvisosUnificado:
                 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
                     sock.settimeout(3)
                     resultado = sock.connect_ex((ip, puerto))
+                    self.estados.marcar(ip, resultado == 0)
                     
                     if resultado == 0:
                         self.agregar_log("✅ Conexión exitosa")
@@ -1259,65 +2062,67 @@ class SistemaAvisosUnificado:
         
         threading.Thread(target=test, daemon=True).start()
 
-    def enviar_aviso(self, mensaje, auto_cerrar=False):
+    def enviar_aviso(self, mensaje, auto_cerrar=False, urgente=False):
         """Envía aviso a PC seleccionada"""
+        # Obtener PC seleccionada del combo (en el hilo de la interfaz)
+        pc_seleccionada = self.combo_pcs_destino.get().strip()
+        if not pc_seleccionada:
+            messagebox.showerror("Error", "Selecciona una PC de la lista")
+            return
+        
+        if not mensaje:
+            messagebox.showerror("Error", "El mensaje no puede estar vacío")
+            return
+        
+        # Extraer IP de la PC seleccionada (formato: "Nombre - IP")
+        try:
+            ip = pc_seleccionada.split(" - ")[1]
+            nombre_pc = pc_seleccionada.split(" - ")[0]
+        except:
+            messagebox.showerror("Error", "Formato de PC inválido. Actualiza la lista.")
+            return
+        
+        puerto = 8888  # Puerto fijo
+        
         def envio():
+            aviso = {
+                'id': nuevo_id(),
+                'mensaje': mensaje,
+                'timestamp': datetime.now().isoformat(),
+                'tipo': 'aviso_unificado',
+                'auto_cerrar': auto_cerrar,
+                'prioridad': 'urgente' if urgente else 'normal'
+            }
             try:
-                # Obtener PC seleccionada del combo
-                pc_seleccionada = self.combo_pcs_destino.get().strip()
-                if not pc_seleccionada:
-                    messagebox.showerror("Error", "Selecciona una PC de la lista")
-                    return
-                
-                if not mensaje:
-                    messagebox.showerror("Error", "El mensaje no puede estar vacío")
-                    return
-                
-                # Extraer IP de la PC seleccionada (formato: "Nombre - IP")
-                try:
-                    ip = pc_seleccionada.split(" - ")[1]
-                    nombre_pc = pc_seleccionada.split(" - ")[0]
-                except:
-                    messagebox.showerror("Error", "Formato de PC inválido. Actualiza la lista.")
-                    return
-                
-                puerto = 8888  # Puerto fijo
+                self.log_desde_hilo(f"📤 Enviando aviso a {nombre_pc} ({ip}:{puerto})")
                 
-                self.agregar_log(f"📤 Enviando aviso a {nombre_pc} ({ip}:{puerto})")
+                respuesta_json = self.enviar_con_prioridad(ip, aviso, puerto, 10) or {}
                 
-                aviso = {
-                    'mensaje': mensaje,
-                    'timestamp': datetime.now().isoformat(),
-                    'tipo': 'aviso_unificado',
-                    'auto_cerrar': auto_cerrar
-                }
-                
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                    sock.settimeout(10)
-                    sock.connect((ip, puerto))
-                    sock.send(json.dumps(aviso, ensure_ascii=False).encode('utf-8'))
-                    
-                    respuesta = sock.recv(1024).decode('utf-8')
-                    respuesta_json = json.loads(respuesta)
-                    
-                    if respuesta_json.get('status') == 'ok':
-                        self.agregar_log(f"✅ Aviso enviado a {nombre_pc}")
-                        messagebox.showinfo("Éxito", f"¡Aviso enviado a {nombre_pc}!")
-                    else:
-                        self.agregar_log("❌ Error en respuesta del servidor")
+                if respuesta_json.get('status') == 'ok':
+                    self.log_desde_hilo(f"✅ Aviso enviado a {nombre_pc}")
+                    self.ventana.after(0, messagebox.showinfo, "Éxito", f"¡Aviso enviado a {nombre_pc}!")
+                else:
+                    self.log_desde_hilo("❌ Error en respuesta del servidor")
+                    self.reintentar(aviso, ip, clasificar_respuesta(respuesta_json), puerto)
                         
-            except socket.timeout:
-                self.agregar_log(f"❌ Timeout - No respuesta de {nombre_pc}")
-                messagebox.showerror("Error de Conexión", f"Timeout conectando a {nombre_pc}\n\n¿El servidor está funcionando en esa computadora?")
-            except ConnectionRefusedError:
-                self.agregar_log(f"❌ Conexión rechazada por {nombre_pc}")
-                messagebox.showerror("Error de Conexión", f"Conexión rechazada por {nombre_pc}\n\n¿El servidor está funcionando?")
+            except socket.timeout as e:
+                self.log_desde_hilo(f"❌ Timeout - No respuesta de {nombre_pc}")
+                self.reintentar(aviso, ip, clasificar_error(e), puerto)
+                self.ventana.after(0, messagebox.showerror, "Error de Conexión",
+                                   f"Timeout conectando a {nombre_pc}\n\n"
+                                   f"¿El servidor está funcionando en esa computadora?")
+            except ConnectionRefusedError as e:
+                self.log_desde_hilo(f"❌ Conexión rechazada por {nombre_pc}")
+                self.reintentar(aviso, ip, clasificar_error(e), puerto)
+                self.ventana.after(0, messagebox.showerror, "Error de Conexión",
+                                   f"Conexión rechazada por {nombre_pc}\n\n¿El servidor está funcionando?")
             except socket.gaierror:
-                self.agregar_log(f"❌ No se puede resolver la IP: {ip}")
-                messagebox.showerror("Error de Red", f"No se puede resolver la IP de {nombre_pc}\n\nVerifica la configuración.")
+                self.log_desde_hilo(f"❌ No se puede resolver la IP: {ip}")
+                self.ventana.after(0, messagebox.showerror, "Error de Red",
+                                   f"No se puede resolver la IP de {nombre_pc}\n\nVerifica la configuración.")
             except Exception as e:
-                self.agregar_log(f"❌ Error enviando: {e}")
-                messagebox.showerror("Error", f"Error enviando mensaje a {nombre_pc}:\n{str(e)}")
+                self.log_desde_hilo(f"❌ Error enviando: {e}")
+                self.ventana.after(0, messagebox.showerror, "Error", f"Error enviando mensaje a {nombre_pc}:\n{str(e)}")
         
         threading.Thread(target=envio, daemon=True).start()
     
@@ -1328,11 +2133,26 @@ class SistemaAvisosUnificado:
         for item in self.tree_pcs.get_children():
             self.tree_pcs.delete(item)
         
-        for pc in self.computadoras:
+        for indice, pc in enumerate(self.computadoras):
             estado_icon = '🟢' if pc['estado'] == 'online' else '🔴'
-            self.tree_pcs.insert('', 'end',
+            self.tree_pcs.insert('', 'end', iid=str(indice),
                                text=pc['nombre'],
-                               values=(pc['ip'], f"{estado_icon} {pc['estado']}"))
+                               values=(pc['ip'], f"{estado_icon} {pc['estado']}",
+                                       *self.historial_rtt.columnas(pc['ip'])))
+        self.monitor.sincronizar({pc['ip']: pc.get('estado') == 'online' for pc in self.computadoras})
+        self.historial_rtt.olvidar({pc['ip'] for pc in self.computadoras})
+        
+        if hasattr(self, 'combo_destino_programado'):
+            self.actualizar_destinos_programados()
+    
+    def actualizar_columnas_rtt(self):
+        """Refresca cada 2 segundos el RTT actual, mínimo, promedio, p95 y la tendencia de cada PC"""
+        for indice, pc in enumerate(self.computadoras):
+            if self.tree_pcs.exists(str(indice)):
+                for columna, valor in zip(('rtt', 'rtt_min', 'rtt_prom', 'rtt_p95', 'tendencia'),
+                                          self.historial_rtt.columnas(pc['ip'])):
+                    self.tree_pcs.set(str(indice), columna, valor)
+        self.ventana.after(2000, self.actualizar_columnas_rtt)
     
     def on_select_pc(self, event):
         """Maneja selección de PC"""
@@ -1385,6 +2205,116 @@ class SistemaAvisosUnificado:
             self.label_pc_seleccionada.config(text="Ninguna PC seleccionada")
             self.agregar_log(f"🗑️ PC eliminada: {nombre}")
     
+    def descubrir_pcs_dialog(self):
+        """Busca receptores en una red y permite registrar varios a la vez"""
+        dialog = tk.Toplevel(self.ventana)
+        dialog.title("🔍 Descubrir PCs")
+        dialog.geometry("560x480")
+        dialog.configure(bg='#1e2832')
+        dialog.transient(self.ventana)
+        
+        controles = tk.Frame(dialog, bg='#1e2832')
+        controles.pack(fill='x', padx=20, pady=(20, 10))
+        
+        tk.Label(controles, text="Red (CIDR):", font=('Arial', 11, 'bold'),
+                fg='white', bg='#1e2832').pack(side='left')
+        
+        entry_red = tk.Entry(controles, font=('Arial', 11), width=20)
+        entry_red.pack(side='left', padx=10)
+        try:
+            entry_red.insert(0, red_local())
+        except OSError:
+            entry_red.insert(0, '192.168.1.0/24')
+        
+        boton_buscar = tk.Button(controles, text="🔍 Buscar", bg='#2196f3', fg='white',
+                                 font=('Arial', 10, 'bold'), padx=10)
+        boton_buscar.pack(side='left')
+        
+        label_resultado = tk.Label(dialog, text="", font=('Arial', 10), fg='#81c784', bg='#1e2832')
+        label_resultado.pack(anchor='w', padx=20)
+        
+        tree = ttk.Treeview(dialog, columns=('ip', 'hostname', 'estado'), show='headings', height=12)
+        for columna, titulo, ancho in (('ip', 'IP', 130), ('hostname', 'Nombre', 220), ('estado', 'Estado', 120)):
+            tree.heading(columna, text=titulo)
+            tree.column(columna, width=ancho)
+        tree.pack(fill='both', expand=True, padx=20, pady=10)
+        
+        def mostrar(resultado, duracion):
+            registradas = {pc['ip'] for pc in self.computadoras}
+            tree.delete(*tree.get_children())
+            for datos in resultado['encontradas']:
+                nueva = datos['ip'] in resultado['nuevas']
+                estado = 'Registrada' if datos['ip'] in registradas else ('🆕 Nueva' if nueva else 'Sin registrar')
+                tree.insert('', 'end', iid=datos['ip'], values=(datos['ip'], datos['hostname'] or '-', estado))
+            # Se preseleccionan las que aún no están registradas
+            tree.selection_set([d['ip'] for d in resultado['encontradas'] if d['ip'] not in registradas])
+            label_resultado.config(
+                text=f"{len(resultado['encontradas'])} receptores en {duracion:.1f} s | "
+                     f"{len(resultado['nuevas'])} nuevos | {len(resultado['perdidas'])} ya no responden"
+            )
+            boton_buscar.config(state='normal')
+        
+        def error_red(texto):
+            messagebox.showerror("Error", f"Red inválida: {texto}", parent=dialog)
+            boton_buscar.config(state='normal')
+            label_resultado.config(text="")
+        
+        def buscar():
+            red = entry_red.get().strip()
+            boton_buscar.config(state='disabled')
+            label_resultado.config(text=f"Buscando en {red}...")
+            
+            def busqueda():
+                inicio = time.monotonic()
+                try:
+                    resultado = self.descubridor.descubrir(red)
+                except ValueError as e:
+                    self.ventana.after(0, error_red, str(e))
+                    return
+                self.ventana.after(0, mostrar, resultado, time.monotonic() - inicio)
+            
+            threading.Thread(target=busqueda, daemon=True).start()
+        
+        def registrar():
+            nombres = {pc['nombre'] for pc in self.computadoras}
+            registradas = {pc['ip'] for pc in self.computadoras}
+            agregadas = 0
+            for ip in tree.selection():
+                if ip in registradas:
+                    continue
+                datos = self.descubridor.encontradas.get(ip, {})
+                nombre = (datos.get('hostname') or f"PC {ip}").split('.')[0]
+                if nombre in nombres:
+                    nombre = f"{nombre} ({ip})"
+                nombres.add(nombre)
+                self.computadoras.append({"nombre": nombre, "ip": ip, "estado": "online"})
+                agregadas += 1
+            if not agregadas:
+                messagebox.showinfo("Descubrir PCs", "No hay PCs nuevas seleccionadas", parent=dialog)
+                return
+            
+            self.guardar_configuracion()
+            self.actualizar_tree_pcs()
+            self.actualizar_combo_pcs()
+            self.actualizar_estado_computadoras()
+            self.agregar_log(f"➕ {agregadas} PCs registradas desde la búsqueda en la red")
+            dialog.destroy()
+        
+        boton_buscar.config(command=buscar)
+        
+        btn_frame = tk.Frame(dialog, bg='#1e2832')
+        btn_frame.pack(fill='x', padx=20, pady=(0, 20))
+        
+        tk.Button(btn_frame, text="➕ Registrar seleccionadas", command=registrar,
+                 bg='#4caf50', fg='white', font=('Arial', 11, 'bold'),
+                 padx=20).pack(side='left')
+        
+        tk.Button(btn_frame, text="❌ Cerrar", command=dialog.destroy,
+                 bg='#f44336', fg='white', font=('Arial', 11, 'bold'),
+                 padx=20).pack(side='right')
+        
+        buscar()
+    
     def pc_dialog(self, pc=None, indice=None):
         """Diálogo para agregar/editar PC"""
         dialog = tk.Toplevel(self.ventana)
@@ -1450,7 +2380,7 @@ class SistemaAvisosUnificado:
                  bg='#f44336', fg='white', font=('Arial', 11, 'bold'),
                  padx=20).pack(side='right')
     
-    def enviar_a_pc_seleccionada(self, mensaje):
+    def enviar_a_pc_seleccionada(self, mensaje, urgente=False):
         """Envía aviso a PC seleccionada"""
         selection = self.tree_pcs.selection()
         if not selection:
@@ -1459,21 +2389,42 @@ class SistemaAvisosUnificado:
         
         item = self.tree_pcs.item(selection[0])
         ip = item['values'][0]
-        self.enviar_a_ip_especifica(ip, mensaje)
+        self.enviar_a_ip_especifica(ip, mensaje, urgente)
     
-    def enviar_a_todas_pcs(self, mensaje):
-        """Envía aviso a todas las PCs online"""
-        pcs_online = [pc for pc in self.computadoras if pc['estado'] == 'online']
-        
-        if not pcs_online:
-            messagebox.showwarning("Advertencia", "No hay PCs online")
+    def enviar_a_todas_pcs(self, mensaje, urgente=False):
+        """Envía aviso a todas las PCs, primero a las que se sabe online, y registra el informe"""
+        if not self.computadoras:
+            messagebox.showwarning("Advertencia", "No hay PCs registradas")
             return
         
-        for pc in pcs_online:
-            self.enviar_a_ip_especifica(pc['ip'], mensaje)
+        self.agregar_log(f"📢 Enviando aviso a {len(self.computadoras)} PCs...")
+        
+        def envio():
+            aviso = self.crear_aviso_admin(mensaje, urgente)
+            informe = enviar_masivo(
+                aviso,
+                [pc['ip'] for pc in self.computadoras],
+                self.sesiones.solicitar,
+                prioridad=prioridad_de_envio(aviso, masivo=True),
+                **self.opciones_envio_masivo()
+            )
+            for registro in informe.fallidos:
+                self.log_desde_hilo(f"❌ {registro['ip']}: {registro['error']}")
+            self.entregas.registrar_informe(aviso, informe)
+            self.reintentar_fallidos(aviso, informe)
+            self.ventana.after(0, self.sincronizar_estados_pcs)
+            carriles = informe.carriles
+            self.log_desde_hilo(f"📢 Online: {carriles['online']} | a sondear: {carriles['sondeo']} | "
+                                f"diferidas (offline): {carriles['diferido']}")
+            self.log_desde_hilo(f"📢 Envío masivo: {informe.texto_resumen()}")
+            self.ventana.after(
+                0, messagebox.showinfo,
+                "Envío Masivo",
+                f"✅ Entregados: {len(informe.exitosos)}\n❌ Fallos: {len(informe.fallidos)}\n"
+                f"⏱️ Duración: {informe.duracion:.1f} s"
+            )
         
-        self.agregar_log(f"📢 Aviso enviado a {len(pcs_online)} PCs")
-        messagebox.showinfo("Enviado", f"Aviso enviado a {len(pcs_online)} PCs")
+        threading.Thread(target=envio, daemon=True).start()
     
     def enviar_mensaje_masivo_personalizado(self):
         """Envía mensaje personalizado a todas las PCs"""
@@ -1482,26 +2433,33 @@ class SistemaAvisosUnificado:
             messagebox.showerror("Error", "Escribe un mensaje")
             return
         
-        self.enviar_a_todas_pcs(mensaje)
+        self.enviar_a_todas_pcs(mensaje, self.var_urgente_masivo.get())
+    
+    def crear_aviso_admin(self, mensaje, urgente=False):
+        """Construye el aviso que se envía desde el administrador de PCs"""
+        return {
+            'id': nuevo_id(),
+            'mensaje': mensaje,
+            'timestamp': datetime.now().isoformat(),
+            'tipo': 'aviso_admin',
+            'auto_cerrar': False,
+            'prioridad': 'urgente' if urgente else 'normal'
+        }
     
-    def enviar_a_ip_especifica(self, ip, mensaje):
+    def enviar_a_ip_especifica(self, ip, mensaje, urgente=False):
         """Envía aviso a IP específica"""
         def envio():
+            aviso = self.crear_aviso_admin(mensaje, urgente)
+            puerto = 8888
             try:
-                aviso = {
-                    'mensaje': mensaje,
-                    'timestamp': datetime.now().isoformat(),
-                    'tipo': 'aviso_admin',
-                    'auto_cerrar': False
-                }
+                respuesta = self.enviar_con_prioridad(ip, aviso, puerto, 3) or {}
+                if respuesta.get('status') != 'ok':
+                    self.log_desde_hilo(f"⚠️ {ip} no confirmó el aviso: {respuesta.get('status', 'sin respuesta')}")
+                    self.reintentar(aviso, ip, clasificar_respuesta(respuesta), puerto)
                 
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                    sock.settimeout(3)
-                    sock.connect((ip, 8888))
-                    sock.send(json.dumps(aviso, ensure_ascii=False).encode('utf-8'))
-                    
             except Exception as e:
-                self.agregar_log(f"❌ Error enviando a {ip}: {e}")
+                self.log_desde_hilo(f"❌ Error enviando a {ip}: {e}")
+                self.reintentar(aviso, ip, clasificar_error(e), puerto)
         
         threading.Thread(target=envio, daemon=True).start()
     
@@ -1523,23 +2481,86 @@ class SistemaAvisosUnificado:
     def verificar_todas_pcs(self):
         """Verifica estado de todas las PCs"""
         def verificar():
-            for pc in self.computadoras:
-                try:
-                    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                        sock.settimeout(2)
-                        resultado = sock.connect_ex((pc['ip'], 8888))
-                        pc['estado'] = 'online' if resultado == 0 else 'offline'
-                except:
-                    pc['estado'] = 'offline'
+            inicio = time.monotonic()
+            ips = [pc['ip'] for pc in self.computadoras]
+            resultados = verificar_pcs(ips, 8888, al_resultado=self.registrar_verificacion,
+                                       **self.opciones_verificacion())
             
-            self.ventana.after(0, self.actualizar_tree_pcs)
             self.ventana.after(0, self.actualizar_estado_computadoras)
             self.guardar_configuracion()
-            self.agregar_log("🔄 Verificación de PCs completada")
+            online = sum(resultados.values())
+            self.log_desde_hilo(f"🔄 Verificación de PCs completada: {online}/{len(resultados)} online "
+                                f"en {time.monotonic() - inicio:.1f} s")
+            if len(resultados) < len(set(ips)):
+                self.log_desde_hilo(f"⚠️ {len(set(ips)) - len(resultados)} PCs sin verificar dentro del plazo")
         
         threading.Thread(target=verificar, daemon=True).start()
         self.agregar_log("🔄 Verificando estado de todas las PCs...")
     
+    def sincronizar_estados_pcs(self):
+        """Copia a cada PC su estado vigente en la cache y refresca las listas"""
+        for pc in self.computadoras:
+            estado = self.estados.estado(pc['ip'])
+            if estado != DESCONOCIDO:
+                pc['estado'] = estado
+        self.actualizar_tree_pcs()
+        self.actualizar_estado_computadoras()
+    
+    def opciones_verificacion(self):
+        """Concurrencia, espera por PC y plazo de la verificación según la sección 'envio', e historial de RTT"""
+        return {
+            'concurrencia': self.config_envio.get('concurrencia_verificacion', CONCURRENCIA_VERIFICACION_DEFECTO),
+            'timeout': self.config_envio.get('timeout_verificacion', TIMEOUT_VERIFICACION_DEFECTO),
+            'plazo': self.config_envio.get('plazo_verificacion', PLAZO_VERIFICACION_DEFECTO),
+            'historial': self.historial_rtt
+        }
+    
+    def registrar_verificacion(self, ip, online):
+        """Anota el resultado de un sondeo; llamado desde los hilos de la verificación"""
+        self.estados.marcar(ip, online)
+        for pc in self.computadoras:
+            if pc['ip'] == ip:
+                pc['estado'] = 'online' if online else 'offline'
+        self.ventana.after(0, self.mostrar_estado_pc, ip, online)
+    
+    def al_cambiar_estado_pc(self, ip, online):
+        """Llamado por el monitor cuando una PC cambia de estado"""
+        nombre = next((pc['nombre'] for pc in self.computadoras if pc['ip'] == ip), ip)
+        self.registrar_verificacion(ip, online)
+        self.ventana.after(0, self.actualizar_estado_computadoras)
+        self.log_desde_hilo(f"{'🟢' if online else '🔴'} {nombre} ({ip}) ahora está {'online' if online else 'offline'}")
+    
+    def escuchar_latidos(self):
+        """Empieza a recibir los latidos de los receptores si la configuración lo permite"""
+        if not self.config_envio.get('escuchar_latidos', True):
+            return
+        try:
+            self.latidos.iniciar()
+        except OSError as e:
+            self.agregar_log(f"⚠️ No se pueden recibir latidos en el puerto UDP {self.latidos.puerto}: {e}")
+    
+    def al_cambiar_presencia(self, ip, presente, latido):
+        """Llamado por el receptor de latidos cuando una PC empieza o deja de enviarlos"""
+        pc = next((pc for pc in self.computadoras if pc['ip'] == ip), None)
+        if presente:
+            nombre = pc['nombre'] if pc else latido.get('hostname') or ip
+            registrada = "" if pc else " (no registrada)"
+            self.log_desde_hilo(f"💓 {nombre} ({ip}) envía latidos{registrada}, receptor v{latido.get('version')}")
+        else:
+            self.log_desde_hilo(f"💔 {pc['nombre'] if pc else ip} ({ip}) dejó de enviar latidos")
+        if pc and (pc.get('estado') == 'online') != presente:
+            self.registrar_verificacion(ip, presente)
+        self.ventana.after(0, self.actualizar_estado_computadoras)
+    
+    def mostrar_estado_pc(self, ip, online):
+        """Actualiza sólo la fila de esa PC en la lista"""
+        for indice, pc in enumerate(self.computadoras):
+            if pc['ip'] != ip:
+                continue
+            estado_icon = '🟢' if online else '🔴'
+            if self.tree_pcs.exists(str(indice)):
+                self.tree_pcs.set(str(indice), 'estado', f"{estado_icon} {pc['estado']}")
+    
     def actualizar_estado_computadoras(self):
         """Actualiza lista de estado en centro de control"""
         self.listbox_estado.delete(0, tk.END)
@@ -1548,6 +2569,10 @@ class SistemaAvisosUnificado:
             estado_icon = '🟢' if pc['estado'] == 'online' else '🔴'
             self.listbox_estado.insert(tk.END, f"{estado_icon} {pc['nombre']} - {pc['ip']} ({pc['estado']})")
     
+    def log_desde_hilo(self, mensaje):
+        """Agrega un mensaje al log desde otro hilo; se escribe en el hilo de la interfaz"""
+        self.ventana.after(0, self.agregar_log, mensaje)
+    
     def agregar_log(self, mensaje):
         """Agrega mensaje al log principal"""
         # Verificar si el widget de logs existe
@@ -1637,22 +2662,24 @@ class SistemaAvisosUnificado:
                 
                 self.agregar_log(f"🔍 Probando conexión a {nombre_pc} ({ip}:{puerto})")
                 
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                    sock.settimeout(5)
-                    sock.connect((ip, puerto))
-                    
-                    # Enviar ping
-                    ping = {'tipo': 'ping', 'timestamp': datetime.now().isoformat()}
-                    sock.send(json.dumps(ping).encode('utf-8'))
-                    
-                    respuesta = sock.recv(1024).decode('utf-8')
-                    respuesta_json = json.loads(respuesta)
-                    
-                    if respuesta_json.get('status') == 'ok':
-                        self.agregar_log(f"✅ Conexión exitosa con {nombre_pc}")
-                        messagebox.showinfo("Éxito", f"Conexión exitosa con {nombre_pc}")
-                    else:
-                        self.agregar_log(f"❌ Respuesta inesperada de {nombre_pc}")
+                # Enviar ping
+                ping = {'tipo': 'ping', 'timestamp': datetime.now().isoformat()}
+                try:
+                    respuesta_json = solicitar(ip, ping, puerto, timeout=5, legacy=False) or {}
+                except OSError:
+                    self.estados.marcar(ip, False)
+                    raise
+                self.estados.marcar(ip, True)
+                
+                if respuesta_json.get('status') == 'ok':
+                    pendientes = respuesta_json.get('cola_pendientes', '?')
+                    self.agregar_log(f"✅ Conexión exitosa con {nombre_pc} (avisos en cola: {pendientes})")
+                    messagebox.showinfo("Éxito", f"Conexión exitosa con {nombre_pc}")
+                elif not respuesta_json:
+                    self.agregar_log(f"⚠️ {nombre_pc} acepta conexiones pero no responde al ping "
+                                     f"(receptor de una versión anterior)")
+                else:
+                    self.agregar_log(f"❌ Respuesta inesperada de {nombre_pc}")
                         
             except Exception as e:
                 self.agregar_log(f"❌ Error probando conexión: {e}")
@@ -1755,18 +2782,16 @@ class SistemaAvisosUnificado:
             # 4. Verificar computadoras configuradas
             agregar_resultado("4. 💻 VERIFICACIÓN DE COMPUTADORAS CONFIGURADAS")
             if self.computadoras:
-                for i, pc in enumerate(self.computadoras, 1):
-                    agregar_resultado(f"   Probando PC {i}: {pc['nombre']} ({pc['ip']})")
-                    try:
-                        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                            sock.settimeout(3)
-                            resultado = sock.connect_ex((pc['ip'], 8888))
-                            if resultado == 0:
-                                agregar_resultado(f"   ✅ {pc['nombre']}: ONLINE - Puede recibir avisos")
-                            else:
-                                agregar_resultado(f"   ❌ {pc['nombre']}: OFFLINE - No responde")
-                    except Exception as e:
-                        agregar_resultado(f"   ❌ {pc['nombre']}: Error - {e}")
+                agregar_resultado(f"   Probando {len(self.computadoras)} PCs a la vez...")
+                resultados = verificar_pcs([pc['ip'] for pc in self.computadoras], 8888,
+                                           **self.opciones_verificacion())
+                for pc in self.computadoras:
+                    if resultados.get(pc['ip']):
+                        agregar_resultado(f"   ✅ {pc['nombre']} ({pc['ip']}): ONLINE - Puede recibir avisos")
+                    elif pc['ip'] in resultados:
+                        agregar_resultado(f"   ❌ {pc['nombre']} ({pc['ip']}): OFFLINE - No responde")
+                    else:
+                        agregar_resultado(f"   ⚠️ {pc['nombre']} ({pc['ip']}): sin verificar dentro del plazo")
             else:
                 agregar_resultado("   ⚠️ No hay computadoras configuradas")
                 agregar_resultado("   💡 Agrega computadoras en la pestaña 'Admin PCs'")
@@ -1776,18 +2801,15 @@ class SistemaAvisosUnificado:
             # 5. Verificar IPs guardadas
             agregar_resultado("5. 📋 IPS GUARDADAS PARA ENVÍO")
             if self.ips_guardadas:
-                for i, ip in enumerate(self.ips_guardadas, 1):
-                    agregar_resultado(f"   Probando IP {i}: {ip}")
-                    try:
-                        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                            sock.settimeout(2)
-                            resultado = sock.connect_ex((ip, 8888))
-                            if resultado == 0:
-                                agregar_resultado(f"   ✅ {ip}: RESPONDE")
-                            else:
-                                agregar_resultado(f"   ❌ {ip}: NO RESPONDE")
-                    except Exception as e:
-                        agregar_resultado(f"   ❌ {ip}: Error - {e}")
+                agregar_resultado(f"   Probando {len(self.ips_guardadas)} IPs a la vez...")
+                resultados = verificar_pcs(self.ips_guardadas, 8888, **self.opciones_verificacion())
+                for ip in self.ips_guardadas:
+                    if resultados.get(ip):
+                        agregar_resultado(f"   ✅ {ip}: RESPONDE")
+                    elif ip in resultados:
+                        agregar_resultado(f"   ❌ {ip}: NO RESPONDE")
+                    else:
+                        agregar_resultado(f"   ⚠️ {ip}: sin verificar dentro del plazo")
             else:
                 agregar_resultado("   ⚠️ No hay IPs guardadas")
             
@@ -1861,6 +2883,13 @@ class SistemaAvisosUnificado:
         """Acciones al cerrar"""
         if self.servidor_activo:
             self.detener_servidor()
+        self.sesiones.cerrar_todas()
+        self.entregas.guardar()
+        self.programador.detener()
+        self.monitor.detener()
+        self.latidos.detener()
+        self.reintentos.detener()
+        self.despacho.detener()
         self.guardar_configuracion()
         self.ventana.destroy()
     
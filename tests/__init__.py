@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del sistema están en src/ y se importan sin paquete, como en las apps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
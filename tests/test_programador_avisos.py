@@ -0,0 +1,62 @@
+import unittest
+from datetime import datetime
+
+from programador_avisos import ExpresionCron, interpretar_fecha
+
+
+class PruebasExpresionCron(unittest.TestCase):
+    
+    def test_cada_minuto_empieza_en_el_minuto_siguiente(self):
+        desde = datetime(2024, 5, 10, 8, 30, 45)
+        self.assertEqual(ExpresionCron('* * * * *').siguiente(desde), datetime(2024, 5, 10, 8, 31))
+    
+    def test_hora_fija_pasa_al_dia_siguiente(self):
+        cron = ExpresionCron('0 9 * * *')
+        self.assertEqual(cron.siguiente(datetime(2024, 5, 10, 8, 59)), datetime(2024, 5, 10, 9, 0))
+        self.assertEqual(cron.siguiente(datetime(2024, 5, 10, 9, 0)), datetime(2024, 5, 11, 9, 0))
+    
+    def test_pasos_y_rangos(self):
+        cron = ExpresionCron('*/15 8-9 * * *')
+        self.assertEqual(cron.siguiente(datetime(2024, 5, 10, 8, 16)), datetime(2024, 5, 10, 8, 30))
+        self.assertEqual(cron.siguiente(datetime(2024, 5, 10, 9, 45)), datetime(2024, 5, 11, 8, 0))
+    
+    def test_dia_de_la_semana_domingo_como_0_y_7(self):
+        # 2024-05-10 es viernes; el domingo siguiente es el 12
+        for texto in ('0 12 * * 0', '0 12 * * 7'):
+            with self.subTest(texto=texto):
+                self.assertEqual(ExpresionCron(texto).siguiente(datetime(2024, 5, 10)), datetime(2024, 5, 12, 12, 0))
+    
+    def test_dia_del_mes_o_de_la_semana(self):
+        # Con ambos campos restringidos basta con que se cumpla uno (lunes 13 o día 20)
+        cron = ExpresionCron('0 0 20 * 1')
+        self.assertEqual(cron.siguiente(datetime(2024, 5, 10)), datetime(2024, 5, 13, 0, 0))
+        self.assertEqual(cron.siguiente(datetime(2024, 5, 19, 12)), datetime(2024, 5, 20, 0, 0))
+    
+    def test_salta_meses_y_anios(self):
+        self.assertEqual(ExpresionCron('30 6 1 1 *').siguiente(datetime(2024, 5, 10)), datetime(2025, 1, 1, 6, 30))
+        self.assertEqual(ExpresionCron('0 0 29 2 *').siguiente(datetime(2024, 3, 1)), datetime(2028, 2, 29, 0, 0))
+    
+    def test_nunca_se_cumple(self):
+        with self.assertRaises(ValueError):
+            ExpresionCron('0 0 31 2 *').siguiente(datetime(2024, 1, 1))
+    
+    def test_expresiones_invalidas(self):
+        for texto in ('* * * *', '60 * * * *', '* 24 * * *', '5-1 * * * *', '*/0 * * * *', 'a * * * *'):
+            with self.subTest(texto=texto):
+                with self.assertRaises(ValueError):
+                    ExpresionCron(texto)
+
+
+class PruebasInterpretarFecha(unittest.TestCase):
+    
+    def test_hora_de_hoy_o_de_manana(self):
+        ahora = datetime(2024, 5, 10, 12, 0)
+        self.assertEqual(interpretar_fecha('13:30', ahora), datetime(2024, 5, 10, 13, 30))
+        self.assertEqual(interpretar_fecha('11:00', ahora), datetime(2024, 5, 11, 11, 0))
+    
+    def test_fecha_completa(self):
+        self.assertEqual(interpretar_fecha('2024-12-24 20:00'), datetime(2024, 12, 24, 20, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
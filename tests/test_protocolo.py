@@ -0,0 +1,123 @@
+import json
+import socket
+import threading
+import unittest
+
+from protocolo import (
+    CABECERA, ErrorProtocolo, LectorMensajes, codificar, codificar_legacy,
+    decodificar_cuerpo, decodificar_datagrama, solicitar
+)
+
+
+class LectorSobreBytes:
+    """Socket mínimo que entrega bytes fijos a recv_into en trozos de tamaño acotado"""
+    
+    def __init__(self, datos, trozo=3):
+        self.datos = memoryview(datos)
+        self.trozo = trozo
+    
+    def recv_into(self, vista):
+        n = min(len(vista), self.trozo, len(self.datos))
+        vista[:n] = self.datos[:n]
+        self.datos = self.datos[n:]
+        return n
+
+
+class PruebasTramas(unittest.TestCase):
+    
+    def test_ida_y_vuelta_enmarcada(self):
+        mensaje = {'tipo': 'aviso', 'mensaje': 'Reunión a las 10 ✅'}
+        recibido, enmarcado = LectorMensajes(LectorSobreBytes(codificar(mensaje))).recibir()
+        self.assertEqual(recibido, mensaje)
+        self.assertTrue(enmarcado)
+    
+    def test_legacy_se_reconoce_sin_cabecera(self):
+        mensaje = {'tipo': 'aviso', 'mensaje': 'hola'}
+        recibido, enmarcado = LectorMensajes(LectorSobreBytes(codificar_legacy(mensaje))).recibir()
+        self.assertEqual(recibido, mensaje)
+        self.assertFalse(enmarcado)
+    
+    def test_cierre_sin_datos(self):
+        self.assertEqual(LectorMensajes(LectorSobreBytes(b'')).recibir(), (None, False))
+    
+    def test_trama_demasiado_grande(self):
+        trama = codificar({'mensaje': 'x' * 100})
+        with self.assertRaises(ErrorProtocolo):
+            LectorMensajes(LectorSobreBytes(trama), max_tamano=50).recibir()
+    
+    def test_version_no_soportada(self):
+        trama = bytearray(codificar({'mensaje': 'x'}))
+        trama[2] = 99
+        with self.assertRaises(ErrorProtocolo):
+            LectorMensajes(LectorSobreBytes(bytes(trama))).recibir()
+    
+    def test_trama_cortada(self):
+        with self.assertRaises(ErrorProtocolo):
+            LectorMensajes(LectorSobreBytes(codificar({'mensaje': 'hola'})[:-2])).recibir()
+    
+    def test_cuerpo_invalido(self):
+        for cuerpo in (b'\xff\xfe', b'{no es json', b'[1, 2]', b'"texto"'):
+            with self.subTest(cuerpo=cuerpo):
+                with self.assertRaises(ErrorProtocolo):
+                    decodificar_cuerpo(cuerpo)
+    
+    def test_datagrama(self):
+        mensaje = {'tipo': 'latido', 'nombre': 'PC1'}
+        self.assertEqual(decodificar_datagrama(codificar(mensaje)), mensaje)
+        with self.assertRaises(ErrorProtocolo):
+            decodificar_datagrama(codificar(mensaje) + b' ')
+        with self.assertRaises(ErrorProtocolo):
+            decodificar_datagrama(codificar(mensaje)[:CABECERA.size - 1])
+
+
+class ReceptorAntiguo:
+    """Receptor de una versión anterior: sólo entiende JSON sin cabecera y cierra ante una trama"""
+    
+    def __init__(self):
+        self.sock = socket.create_server(('127.0.0.1', 0))
+        self.puerto = self.sock.getsockname()[1]
+        self.recibidos = []
+        self.hilo = threading.Thread(target=self._atender, daemon=True)
+        self.hilo.start()
+    
+    def _atender(self):
+        while True:
+            try:
+                conexion, _ = self.sock.accept()
+            except OSError:
+                return
+            with conexion:
+                datos = conexion.recv(65536)
+                self.recibidos.append(datos)
+                try:
+                    mensaje = json.loads(datos.decode('utf-8'))
+                except ValueError:
+                    continue
+                conexion.sendall(codificar_legacy({'status': 'ok', 'id': mensaje.get('id')}))
+    
+    def cerrar(self):
+        self.sock.close()
+        self.hilo.join(2)
+
+
+class PruebasSolicitarLegacy(unittest.TestCase):
+    
+    def setUp(self):
+        self.receptor = ReceptorAntiguo()
+        self.addCleanup(self.receptor.cerrar)
+    
+    def test_reintenta_en_formato_legacy(self):
+        respuesta = solicitar('127.0.0.1', {'id': 'a1', 'mensaje': 'hola'}, self.receptor.puerto, timeout=2)
+        self.assertEqual(respuesta, {'status': 'ok', 'id': 'a1'})
+        self.assertEqual(len(self.receptor.recibidos), 2)
+        self.assertTrue(self.receptor.recibidos[0].startswith(b'AV'))
+        self.assertTrue(self.receptor.recibidos[1].startswith(b'{'))
+    
+    def test_sin_legacy_no_se_reenvia(self):
+        respuesta = solicitar('127.0.0.1', {'tipo': 'ping'}, self.receptor.puerto, timeout=2, legacy=False)
+        self.assertIsNone(respuesta)
+        self.assertEqual(len(self.receptor.recibidos), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from registro_entregas import percentil, resumen_latencias
+
+
+class PruebasPercentil(unittest.TestCase):
+    
+    def test_sin_valores(self):
+        self.assertIsNone(percentil([], 95))
+    
+    def test_rango_mas_cercano(self):
+        valores = list(range(1, 101))
+        self.assertEqual(percentil(valores, 50), 50)
+        self.assertEqual(percentil(valores, 95), 95)
+        self.assertEqual(percentil(valores, 99), 99)
+        self.assertEqual(percentil(valores, 100), 100)
+    
+    def test_extremos_y_desorden(self):
+        valores = [30.5, 10.0, 20.0]
+        self.assertEqual(percentil(valores, 0), 10.0)
+        self.assertEqual(percentil(valores, 50), 20.0)
+        self.assertEqual(percentil(valores, 99), 30.5)
+        self.assertEqual(valores, [30.5, 10.0, 20.0])
+    
+    def test_un_valor(self):
+        for p in (0, 50, 100):
+            self.assertEqual(percentil([7], p), 7)
+    
+    def test_resumen_cuenta_fallos(self):
+        resumen = resumen_latencias([1, 2, 3, 4], fallos=2)
+        self.assertEqual(resumen['envios'], 6)
+        self.assertEqual(resumen['ok'], 4)
+        self.assertEqual(resumen['p50'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from unittest import mock
+
+from reintentos_avisos import PoliticaReintentos
+
+
+class PruebasPoliticaReintentos(unittest.TestCase):
+    
+    def test_espera_dentro_del_tope_exponencial(self):
+        politica = PoliticaReintentos(base=2, maximo=60)
+        for intento, tope in ((0, 2), (1, 4), (3, 16), (5, 60), (20, 60)):
+            with self.subTest(intento=intento):
+                for _ in range(50):
+                    self.assertTrue(0 <= politica.espera(intento) <= tope)
+    
+    def test_jitter_completo(self):
+        politica = PoliticaReintentos(base=2, maximo=60)
+        with mock.patch('reintentos_avisos.random.uniform', side_effect=lambda a, b: b):
+            self.assertEqual([politica.espera(i) for i in range(7)], [2, 4, 8, 16, 32, 60, 60])
+        with mock.patch('reintentos_avisos.random.uniform', side_effect=lambda a, b: a):
+            self.assertEqual(politica.espera(4), 0)
+    
+    def test_agotado_por_intentos(self):
+        politica = PoliticaReintentos(max_intentos=3, edad_maxima=600)
+        self.assertFalse(politica.agotado(2, creado=100, ahora=110))
+        self.assertTrue(politica.agotado(3, creado=100, ahora=110))
+    
+    def test_agotado_por_edad(self):
+        politica = PoliticaReintentos(max_intentos=8, edad_maxima=600)
+        self.assertFalse(politica.agotado(0, creado=100, ahora=699))
+        self.assertTrue(politica.agotado(0, creado=100, ahora=700))
+
+
+if __name__ == '__main__':
+    unittest.main()
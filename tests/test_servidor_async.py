@@ -0,0 +1,105 @@
+import unittest
+from unittest import mock
+
+from servidor_async import CacheIdsVistos, LimitadorPorOrigen
+
+
+class Reloj:
+    """Reemplazo de time.monotonic que sólo avanza cuando la prueba lo indica"""
+    
+    def __init__(self, ahora=1000.0):
+        self.ahora = ahora
+    
+    def __call__(self):
+        return self.ahora
+
+
+class PruebaConReloj(unittest.TestCase):
+    
+    def setUp(self):
+        self.reloj = Reloj()
+        parche = mock.patch('servidor_async.time.monotonic', self.reloj)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+
+class PruebasCacheIdsVistos(PruebaConReloj):
+    
+    def test_registra_y_reconoce(self):
+        cache = CacheIdsVistos(capacidad=10, ttl=60)
+        self.assertFalse(cache.contiene('a'))
+        cache.registrar('a')
+        self.assertTrue(cache.contiene('a'))
+    
+    def test_capacidad_desaloja_el_mas_antiguo(self):
+        cache = CacheIdsVistos(capacidad=2, ttl=60)
+        for id_mensaje in ('a', 'b', 'c'):
+            cache.registrar(id_mensaje)
+            self.reloj.ahora += 1
+        self.assertEqual(len(cache), 2)
+        self.assertFalse(cache.contiene('a'))
+        self.assertTrue(cache.contiene('b'))
+        self.assertTrue(cache.contiene('c'))
+    
+    def test_volver_a_registrar_lo_hace_reciente(self):
+        cache = CacheIdsVistos(capacidad=2, ttl=60)
+        cache.registrar('a')
+        cache.registrar('b')
+        cache.registrar('a')
+        cache.registrar('c')
+        self.assertTrue(cache.contiene('a'))
+        self.assertFalse(cache.contiene('b'))
+    
+    def test_ttl(self):
+        cache = CacheIdsVistos(capacidad=10, ttl=60)
+        cache.registrar('a')
+        self.reloj.ahora += 30
+        cache.registrar('b')
+        self.reloj.ahora += 30
+        self.assertTrue(cache.contiene('a'))
+        self.reloj.ahora += 1
+        self.assertFalse(cache.contiene('a'))
+        self.assertTrue(cache.contiene('b'))
+        self.assertEqual(len(cache), 1)
+
+
+class PruebasLimitadorPorOrigen(PruebaConReloj):
+    
+    def test_rafaga_y_luego_tasa(self):
+        limitador = LimitadorPorOrigen(tasa=2, rafaga=3)
+        self.assertEqual([limitador.permitir('10.0.0.1') for _ in range(4)], [True, True, True, False])
+        self.reloj.ahora += 0.5
+        self.assertTrue(limitador.permitir('10.0.0.1'))
+        self.assertFalse(limitador.permitir('10.0.0.1'))
+    
+    def test_la_cubeta_no_supera_la_rafaga(self):
+        limitador = LimitadorPorOrigen(tasa=4, rafaga=2)
+        limitador.permitir('10.0.0.1')
+        self.reloj.ahora += 0.25
+        limitador.permitir('10.0.0.1')
+        self.reloj.ahora += 0.375
+        self.assertEqual([limitador.permitir('10.0.0.1') for _ in range(3)], [True, True, False])
+    
+    def test_origenes_independientes(self):
+        limitador = LimitadorPorOrigen(tasa=1, rafaga=1)
+        self.assertTrue(limitador.permitir('10.0.0.1'))
+        self.assertFalse(limitador.permitir('10.0.0.1'))
+        self.assertTrue(limitador.permitir('10.0.0.2'))
+    
+    def test_tasa_cero_desactiva(self):
+        limitador = LimitadorPorOrigen(tasa=0, rafaga=1)
+        self.assertTrue(all(limitador.permitir('10.0.0.1') for _ in range(100)))
+        self.assertEqual(len(limitador), 0)
+    
+    def test_descarta_cubetas_llenas_y_acota_origenes(self):
+        limitador = LimitadorPorOrigen(tasa=1, rafaga=2, max_origenes=3)
+        for i in range(5):
+            limitador.permitir(f'10.0.0.{i}')
+        self.assertEqual(len(limitador), 3)
+        self.reloj.ahora += 2
+        limitador.permitir('10.0.0.9')
+        self.assertEqual(len(limitador), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
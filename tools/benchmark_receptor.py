@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark del receptor - Avisos por segundo del receptor antiguo (un hilo por conexión) frente a ServidorAvisosAsync
+
+Uso (desde la raíz del repositorio):
+    python tools/benchmark_receptor.py --clientes 64 --avisos 150
+
+Cada cliente envía sus avisos de a uno, abriendo una conexión por aviso, como
+los emisores de las apps. Todo ocurre en loopback y sin interfaz gráfica: se
+mide sólo la red y el protocolo, no la ventana del aviso.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from protocolo import nuevo_id, solicitar, solicitar_legacy
+from servidor_async import ServidorAvisosAsync
+
+
+class ReceptorHiloPorConexion:
+    """El bucle de recepción original de las apps: listen(5), un hilo por conexión y recv(1024)"""
+    
+    def __init__(self, puerto):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('127.0.0.1', puerto))
+        self.sock.listen(5)
+        self.activo = True
+        self.hilo = threading.Thread(target=self._aceptar, daemon=True)
+    
+    def iniciar(self):
+        self.hilo.start()
+    
+    def _aceptar(self):
+        while self.activo:
+            try:
+                cliente, _ = self.sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._atender, args=(cliente,), daemon=True).start()
+    
+    def _atender(self, cliente):
+        try:
+            datos = cliente.recv(1024).decode('utf-8')
+            if datos:
+                json.loads(datos)
+                cliente.send(json.dumps({"status": "ok", "mensaje": "Aviso recibido"}).encode('utf-8'))
+        except Exception:
+            pass
+        finally:
+            cliente.close()
+    
+    def detener(self):
+        self.activo = False
+        self.sock.close()
+
+
+def medir(enviar, clientes, avisos):
+    """Lanza clientes hilos que envían avisos cada uno; devuelve (avisos/s, fallos, segundos)"""
+    fallos = [0]
+    lock = threading.Lock()
+    
+    def cliente(numero):
+        for i in range(avisos):
+            aviso = {'id': nuevo_id(), 'tipo': 'aviso', 'mensaje': f'Aviso {i} del cliente {numero}'}
+            try:
+                respuesta = enviar(aviso)
+                ok = (respuesta or {}).get('status') == 'ok'
+            except OSError:
+                ok = False
+            if not ok:
+                with lock:
+                    fallos[0] += 1
+    
+    hilos = [threading.Thread(target=cliente, args=(n,)) for n in range(clientes)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+    return (clientes * avisos - fallos[0]) / duracion, fallos[0], duracion
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara el receptor por hilos con el receptor asyncio")
+    parser.add_argument('--clientes', type=int, default=64, help="Clientes simultáneos (por defecto 64)")
+    parser.add_argument('--avisos', type=int, default=150, help="Avisos por cliente (por defecto 150)")
+    parser.add_argument('--puerto', type=int, default=18888, help="Puerto local de prueba (por defecto 18888)")
+    parser.add_argument('--timeout', type=float, default=5, help="Timeout por envío en segundos (por defecto 5)")
+    args = parser.parse_args(argv)
+    if args.clientes <= 0 or args.avisos <= 0 or args.timeout <= 0:
+        parser.error("--clientes, --avisos y --timeout deben ser mayores que 0")
+    
+    total = args.clientes * args.avisos
+    print(f"{args.clientes} clientes x {args.avisos} avisos = {total} avisos, una conexión por aviso")
+    
+    receptor = ReceptorHiloPorConexion(args.puerto)
+    receptor.iniciar()
+    try:
+        tasa, fallos, duracion = medir(
+            lambda aviso: solicitar_legacy('127.0.0.1', aviso, args.puerto, args.timeout),
+            args.clientes, args.avisos)
+    finally:
+        receptor.detener()
+    print(f"hilo por conexión: {tasa:8.0f} avisos/s  {fallos} fallidos  ({duracion:.1f} s)")
+    
+    # Sin límite por origen: todos los clientes comparten 127.0.0.1
+    servidor = ServidorAvisosAsync(puerto=args.puerto + 1, host='127.0.0.1', limite_tasa=0,
+                                   sumidero=lambda aviso, direccion: None)
+    servidor.iniciar()
+    try:
+        tasa, fallos, duracion = medir(
+            lambda aviso: solicitar('127.0.0.1', aviso, args.puerto + 1, args.timeout, legacy=False),
+            args.clientes, args.avisos)
+    finally:
+        servidor.detener()
+    print(f"asyncio:           {tasa:8.0f} avisos/s  {fallos} fallidos  ({duracion:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()